@@ -19,7 +19,8 @@ from .version import __version__
 from .template import Template
 from .event import EDXMLEvent, EventElement, ParsedEvent
 from .writer import EDXMLWriter
-from .parser import EDXMLParserBase, EDXMLPullParser, EDXMLPushParser, EDXMLOntologyPullParser, EDXMLOntologyPushParser
+from .parser import EDXMLParserBase, EDXMLPullParser, EDXMLParallelPullParser, EDXMLPushParser, \
+    EDXMLOntologyPullParser, EDXMLOntologyPushParser
 from .filter import EDXMLFilterBase, EDXMLPullFilter, EDXMLPushFilter
 from .event_collection import EventCollection
 
@@ -28,6 +29,6 @@ from . import transcode
 
 
 __all__ = ['EDXMLEvent', 'EventElement', 'ParsedEvent', 'EventCollection', 'EDXMLWriter',
-           'EDXMLParserBase', 'EDXMLPullParser', 'EDXMLPushParser',
+           'EDXMLParserBase', 'EDXMLPullParser', 'EDXMLParallelPullParser', 'EDXMLPushParser',
            'EDXMLOntologyPullParser', 'EDXMLOntologyPushParser',
            'EDXMLFilterBase', 'EDXMLPullFilter', 'EDXMLPushFilter', 'ontology', 'transcode', 'Template', '__version__']
@@ -23,3 +23,19 @@ def configure_logger(args):
             logger.setLevel(logging.INFO)
         if args.verbose > 1:
             logger.setLevel(logging.DEBUG)
+
+
+class FlushingInput(object):
+    """
+    Wraps an input file, invoking a callback before each read. This
+    allows utilities that process events in batches to output their
+    results before blocking on a slow input stream.
+    """
+
+    def __init__(self, input_file, callback):
+        self.input_file = input_file
+        self.callback = callback
+
+    def read(self, size=-1):
+        self.callback()
+        return self.input_file.read(size)
@@ -20,19 +20,58 @@ import argparse
 import hashlib
 import sys
 
-from edxml.cli import configure_logger
+from edxml.cli import configure_logger, FlushingInput
+from edxml.event_collection import EventCollection
 from edxml.parser import EDXMLPullParser
 
 
 class EDXMLEventHasher(EDXMLPullParser):
 
-    def __init__(self, hash_function):
+    def __init__(self, hash_function, threads=1, batch_size=1000):
         super().__init__()
         self.hash_function = hash_function
+        self.threads = threads
+        self.batch_size = batch_size
+        self.__batch = []
+
+    def parse(self, input_file, foreign_element_tags=()):
+        if not isinstance(input_file, str):
+            # Reading from an input stream may block until more input
+            # becomes available. Before reading, we output the hashes
+            # of the events parsed so far. That way, a slow input stream
+            # does not hold back the hashes of events that already arrived.
+            input_file = FlushingInput(input_file, self._flush_output)
+        return super().parse(input_file, foreign_element_tags)
 
     def _parsed_event(self, event):
-        event_type = self.get_ontology().get_event_type(event.get_type_name())
-        print(event.compute_sticky_hash(event_type, hash_function=self.hash_function))
+        # We collect events in batches, which allows
+        # us to compute the hashes more efficiently.
+        self.__batch.append(event)
+        if len(self.__batch) >= self.batch_size:
+            self._flush_batch()
+
+    def _finish_pending_events(self):
+        # The ontology is about to change, which
+        # may affect the hashes of buffered events.
+        self._flush_batch()
+        super()._finish_pending_events()
+
+    def _flush_output(self):
+        if self.__batch:
+            self._flush_batch()
+            sys.stdout.flush()
+
+    def _flush_batch(self):
+        hashes = EventCollection(self.__batch, ontology=self.get_ontology()).compute_sticky_hashes(
+            hash_function=self.hash_function, threads=self.threads
+        )
+        if hashes:
+            print('\n'.join(hashes))
+        self.__batch = []
+
+    def _close(self):
+        self._flush_batch()
+        return super()._close()
 
 
 def main():
@@ -53,6 +92,12 @@ def main():
         '--sha256', action='store_true', help='Output SHA256 hashes in stead of SHA1.'
     )
 
+    parser.add_argument(
+        '--threads', type=int, default=1,
+        help='Number of threads used for computing hashes. Using multiple threads is only beneficial '
+             'for events containing large amounts of hashed object values.'
+    )
+
     parser.add_argument(
         '--verbose', '-v', action='count', help='Increments the output verbosity of logging messages on standard error.'
     )
@@ -68,7 +113,9 @@ def main():
     event_input = args.file or sys.stdin.buffer
 
     try:
-        EDXMLEventHasher(hash_function=hashlib.sha256 if args.sha256 else hashlib.sha1).parse(event_input)
+        with EDXMLEventHasher(
+                hash_function=hashlib.sha256 if args.sha256 else hashlib.sha1, threads=args.threads) as hasher:
+            hasher.parse(event_input)
     except KeyboardInterrupt:
         sys.exit()
 
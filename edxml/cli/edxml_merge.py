@@ -20,49 +20,262 @@
 #  input events.
 #
 #  Note that, unless buffering is used, this script needs to store one event for each
-#  sticky hash of the input events in RAM. For large event streams that contain events
-#  with many sticky hashes, it will eventually run out of memory.
+#  sticky hash of the input events. By default these events are kept in RAM. For large
+#  event streams that contain events with many sticky hashes, it will eventually run out
+#  of memory. Setting a memory limit makes the script spill events into temporary files
+#  on disk, partitioned by sticky hash, which are merged one by one after reading the input.
 
 import argparse
+import struct
 import sys
+import tempfile
 import time
 from typing import Dict, List # noqa
 
-from edxml import EDXMLEvent # noqa
+from lxml import etree
+
+from edxml import EDXMLEvent, ParsedEvent # noqa
 from edxml.cli import configure_logger
+from edxml.event_collection import EventCollection
 from edxml.filter import EDXMLPullFilter, EDXMLPushFilter
 from edxml.error import EDXMLValidationError
 from edxml.logger import log
+from edxml.parser import EDXMLParserBase
+
+# Rough estimate of the memory footprint of an event that is kept
+# in memory, based on the size of the serialized event. The numbers
+# are derived from measuring lxml trees of typical events.
+EVENT_MEMORY_OVERHEAD = 1024
+EVENT_MEMORY_FACTOR = 6
+
+
+class _CountingInput(object):
+    # Wraps the input file, counting the bytes read by the parser.
+
+    def __init__(self, input_file):
+        self.input_file = input_file
+        self.num_bytes = 0
+
+    def read(self, size=-1):
+        data = self.input_file.read(size)
+        self.num_bytes += len(data)
+        return data
+
+
+def _create_event_parser():
+    lookup = etree.ElementNamespaceClassLookup()
+    lookup.get_namespace('http://edxml.org/edxml')['event'] = ParsedEvent
+    parser = etree.XMLParser(**EDXMLParserBase._LXML_PARSER_OPTIONS)
+    parser.set_element_class_lookup(lookup)
+    return parser
+
+
+def _estimate_memory_usage(event_size, merged=False):
+    # When an event is merged into an event that is kept in memory,
+    # the merged event may grow by as much as the size of the event
+    # that is merged into it. Note that merging events having many
+    # sticky hashes may keep growing their merged event.
+    if merged:
+        return EVENT_MEMORY_FACTOR * event_size
+    return EVENT_MEMORY_OVERHEAD + EVENT_MEMORY_FACTOR * event_size
+
+
+def _write_record(file, event_hash, event_data):
+    event_hash = event_hash.encode()
+    file.write(struct.pack('>HI', len(event_hash), len(event_data)))
+    file.write(event_hash)
+    file.write(event_data)
+
+
+def _read_records(file):
+    file.seek(0)
+    while True:
+        header = file.read(6)
+        if not header:
+            return
+        hash_length, data_length = struct.unpack('>HI', header)
+        yield file.read(hash_length).decode(), file.read(data_length)
 
 
 class EDXMLEventMerger(EDXMLPullFilter):
 
-    def __init__(self):
+    def __init__(self, batch_size=1000, max_memory=None, num_partitions=16):
+        """
+
+        Creates a new event merger. When a memory limit is set,
+        the merger estimates the memory used by the events that it keeps.
+        As soon as the limit is exceeded, these events are written into
+        temporary files on disk, distributing them over the specified
+        number of partitions based on their sticky hashes. Colliding events
+        always end up in the same partition. After reading all input, the
+        partitions are merged one by one. Partitions that do not fit into
+        memory are recursively partitioned further.
+
+        Note that spilling events to disk changes the order of the events
+        in the output.
+
+        Args:
+          batch_size (int): Number of events to hash at once
+          max_memory (Optional[int]): Memory limit in bytes
+          num_partitions (int): Number of partitions
+        """
         super().__init__(sys.stdout.buffer)
         self.hash_buffer = {}
         self.num_merged = 0
         self.num_processed = 0
+        self.batch_size = batch_size
+        self.max_memory = max_memory
+        self.num_partitions = num_partitions
+        self.__batch = []
+        self.__memory_usage = 0
+        self.__partitions = None
+        self.__event_parser = None
+        self.__input = None                 # type: _CountingInput
+        self.__input_position = 0
+
+    def parse(self, input_file, foreign_element_tags=()):
+        if self.max_memory is None:
+            return super().parse(input_file, foreign_element_tags)
+
+        # We estimate the memory usage of the events
+        # from the amount of input data that we read.
+        if isinstance(input_file, str):
+            with open(input_file, 'rb') as file:
+                return self.parse(file, foreign_element_tags)
+
+        self.__input = _CountingInput(input_file)
+        self.__input_position = 0
+        return super().parse(self.__input, foreign_element_tags)
 
     def _parsed_event(self, event):
-        event_type = self.get_ontology().get_event_type(event.get_type_name())
-        event_hash = event.compute_sticky_hash(event_type)
-
-        if event_hash in self.hash_buffer:
-            event_type = self.get_ontology().get_event_type(event.get_type_name())
-            event = event_type.merge_events([self.hash_buffer[event_hash], event])
-            self.num_merged += 1
-
         # Note that we copy the event here. The reason for doing
         # this is that the parser will dereference the event after
         # this method exits. As a result, each event will have
         # its own explicit namespace. Storing a copy prevents this.
-        self.hash_buffer[event_hash] = event.copy()
-
-        self.num_processed += 1
+        self.__batch.append(event.copy())
+
+        # We collect events in batches, which allows
+        # us to compute the hashes more efficiently.
+        if len(self.__batch) >= self.batch_size:
+            self._merge_batch()
+
+    def _finish_pending_events(self):
+        # The ontology is about to change, which
+        # may affect the hashes of buffered events.
+        self._merge_batch()
+        super()._finish_pending_events()
+
+    def _merge_batch(self):
+        if not self.__batch:
+            return
+
+        event_size = 0
+        if self.__input is not None:
+            # The size of the events in the batch is estimated
+            # from the amount of input data read while parsing them.
+            event_size = (self.__input.num_bytes - self.__input_position) / len(self.__batch)
+            self.__input_position = self.__input.num_bytes
+
+        batch = EventCollection(self.__batch, ontology=self.get_ontology())
+        for event, event_hash in zip(batch, batch.compute_sticky_hashes()):
+            merged = event_hash in self.hash_buffer
+            if merged:
+                event_type = self.get_ontology().get_event_type(event.get_type_name())
+                self.hash_buffer[event_hash] = event_type.merge_events([self.hash_buffer[event_hash], event])
+                self.num_merged += 1
+            else:
+                self.hash_buffer[event_hash] = event
+            self.num_processed += 1
+
+            if self.max_memory is not None:
+                self.__memory_usage += _estimate_memory_usage(event_size, merged)
+                if self.__memory_usage > self.max_memory:
+                    self._spill()
+
+        self.__batch = []
+
+    def _get_partition(self, event_hash, depth):
+        # Each partitioning depth uses a different
+        # part of the hash to pick a partition.
+        return int(event_hash[depth * 2:depth * 2 + 2] or '0', 16) % self.num_partitions
+
+    def _write_partitions(self, partitions, events, depth):
+        for event_hash, event in events:
+            _write_record(partitions[self._get_partition(event_hash, depth)], event_hash, etree.tostring(event))
+
+    def _spill(self):
+        """
+
+        Writes the events that are kept in memory into
+        the partitions on disk.
+
+        """
+        if self.__partitions is None:
+            log.info('Memory limit exceeded, spilling events to disk.')
+            self.__partitions = [tempfile.TemporaryFile() for _ in range(self.num_partitions)]
+
+        self._write_partitions(self.__partitions, self.hash_buffer.items(), depth=0)
+        self.hash_buffer = {}
+        self.__memory_usage = 0
+
+    def _merge_partition(self, partition, depth):
+        """
+
+        Merges the events in specified partition file and writes
+        them into the output. When the partition does not fit into
+        memory, it is partitioned further.
+
+        Args:
+          partition: The partition file
+          depth (int): The partitioning depth of the partition
+
+        """
+        if self.__event_parser is None:
+            self.__event_parser = _create_event_parser()
+
+        merged = {}
+        memory_usage = 0
+        sub_partitions = None
+
+        for event_hash, event_data in _read_records(partition):
+            event = etree.fromstring(event_data, self.__event_parser)
+            is_merged = event_hash in merged
+            if is_merged:
+                event_type = self.get_ontology().get_event_type(event.get_type_name())
+                merged[event_hash] = event_type.merge_events([merged[event_hash], event])
+                self.num_merged += 1
+            else:
+                merged[event_hash] = event
+
+            memory_usage += _estimate_memory_usage(len(event_data), is_merged)
+            if memory_usage > self.max_memory and (depth + 1) * 2 < len(event_hash):
+                if sub_partitions is None:
+                    sub_partitions = [tempfile.TemporaryFile() for _ in range(self.num_partitions)]
+                self._write_partitions(sub_partitions, merged.items(), depth)
+                merged = {}
+                memory_usage = 0
+
+        partition.close()
+
+        if sub_partitions is None:
+            for event in merged.values():
+                EDXMLPullFilter._parsed_event(self, event)
+            return
+
+        self._write_partitions(sub_partitions, merged.items(), depth)
+        for sub_partition in sub_partitions:
+            self._merge_partition(sub_partition, depth + 1)
 
     def _close(self):
-        for event_hash, event in self.hash_buffer.items():
-            EDXMLPullFilter._parsed_event(self, event)
+        self._merge_batch()
+        if self.__partitions is None:
+            for event_hash, event in self.hash_buffer.items():
+                EDXMLPullFilter._parsed_event(self, event)
+        else:
+            self._spill()
+            partitions, self.__partitions = self.__partitions, None
+            for partition in partitions:
+                self._merge_partition(partition, depth=1)
         super()._close()
         log.info(f"Processed {self.num_processed} events, merged {self.num_merged}.")
 
@@ -76,41 +289,44 @@ class BufferingEDXMLEventMerger(EDXMLPushFilter):
         self.__max_latency = latency
         self.__max_buffer_size = event_buffer_size
         self.__last_output_time = time.time()
-        self.__hash_buffer = {}  # type: Dict[str, List[EDXMLEvent]]
+        self.__events = []  # type: List[EDXMLEvent]
         self.__num_merged = 0
         self.__num_processed = 0
 
     def _parsed_event(self, event):
-        event_type = self.get_ontology().get_event_type(event.get_type_name())
-        event_hash = event.compute_sticky_hash(event_type)
-
         # Note that we copy the event here. The reason for doing
         # that is that the parser will dereference the event after
         # this method exists. As a result, each event will have
         # its own explicit namespace. Storing a copy prevents this.
-        event = event.copy()
-
-        if event_hash in self.__hash_buffer:
-            # This hash is in our buffer, which means
-            # we have a collision. Add the event for
-            # merging later.
-            self.__hash_buffer[event_hash].append(event)
-            self.__num_merged += 1
-        else:
-            # We have a new hash, add it to
-            # the buffer.
-            self.__hash_buffer[event_hash] = [event]
+        self.__events.append(event.copy())
 
         self.__num_processed += 1
         self.__buffer_size += 1
         if self.__buffer_size >= self.__max_buffer_size:
             self._flush_buffer()
 
-        if self.__buffer_size > 0 and 0 < self.__max_latency <= (time.time() - self.__last_output_time):
+        if self.__buffer_size > 0 and 0 < (self.__max_latency or 0) <= (time.time() - self.__last_output_time):
             self._flush_buffer()
 
+    def _finish_pending_events(self):
+        # The ontology is about to change, which
+        # may affect the hashes of buffered events.
+        self._flush_buffer()
+        super()._finish_pending_events()
+
     def _flush_buffer(self):
-        for event_hash, events in self.__hash_buffer.items():
+        # The hashes of the buffered events are computed in
+        # one go, grouping colliding events for merging.
+        events = EventCollection(self.__events, ontology=self.get_ontology())
+        hash_buffer = {}  # type: Dict[str, List[EDXMLEvent]]
+        for event, event_hash in zip(events, events.compute_sticky_hashes()):
+            if event_hash in hash_buffer:
+                hash_buffer[event_hash].append(event)
+                self.__num_merged += 1
+            else:
+                hash_buffer[event_hash] = [event]
+
+        for event_hash, events in hash_buffer.items():
             if len(events) > 0:
                 if len(events) > 1:
                     output_event = self.get_ontology().get_event_type(events[0].get_type_name()).merge_events(events)
@@ -120,9 +336,10 @@ class BufferingEDXMLEventMerger(EDXMLPushFilter):
 
         self.__buffer_size = 0
         self.__last_output_time = time.time()
-        self.__hash_buffer = {}
+        self.__events = []
 
     def _close(self):
+        self._flush_buffer()
         super()._close()
         log.info(f"Processed {self.__num_processed} events, merged {self.__num_merged}.")
 
@@ -165,6 +382,19 @@ def main():
              'events may be significantly reduced.'
     )
 
+    parser.add_argument(
+        '-m',
+        '--max-memory',
+        type=float,
+        help='By default, unbuffered merging keeps one event for each distinct sticky hash in memory. '
+             'Setting this option to a number of megabytes limits the amount of memory used for '
+             'storing events. When the limit is exceeded, events are stored in temporary files, '
+             'which are merged after reading all input. Note that this changes the order of the '
+             'output events. The location of the temporary files can be set using the TMPDIR '
+             'environment variable. This option cannot be combined with --buffer, because the '
+             'memory usage of buffered merging is limited by the buffer size.'
+    )
+
     parser.add_argument(
         '--verbose', '-v', action='count', help='Increments the output verbosity of logging messages on standard error.'
     )
@@ -175,6 +405,9 @@ def main():
 
     args = parser.parse_args()
 
+    if args.max_memory and args.buffer and args.buffer > 1:
+        parser.error("The --max-memory option cannot be combined with --buffer.")
+
     configure_logger(args)
 
     if not args.file:
@@ -193,7 +426,8 @@ def main():
                     break
                 merger.feed(line)
     else:
-        with EDXMLEventMerger() as merger:
+        max_memory = int(args.max_memory * 1024 * 1024) if args.max_memory else None
+        with EDXMLEventMerger(max_memory=max_memory) as merger:
             merger.parse(args.file)
 
 
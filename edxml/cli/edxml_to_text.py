@@ -19,22 +19,58 @@
 import argparse
 import sys
 
-from edxml.cli import configure_logger
+from edxml.cli import configure_logger, FlushingInput
+from edxml.event_collection import EventCollection
 from edxml.parser import EDXMLPullParser
 
 
 class EDXMLEventPrinter(EDXMLPullParser):
 
-    def __init__(self, print_summaries=False, print_colorized=False):
+    def __init__(self, print_summaries=False, print_colorized=False, batch_size=1000):
         super().__init__()
         self.__print_summaries = print_summaries
         self.__colorize = print_colorized
+        self.batch_size = batch_size
+        self.__batch = []
+
+    def parse(self, input_file, foreign_element_tags=()):
+        if not isinstance(input_file, str):
+            # Reading from an input stream may block until more input
+            # becomes available. Before reading, we output the strings
+            # of the events parsed so far. That way, a slow input stream
+            # does not hold back the strings of events that already arrived.
+            input_file = FlushingInput(input_file, self._flush_output)
+        return super().parse(input_file, foreign_element_tags)
 
     def _parsed_event(self, event):
-
-        print(self.get_ontology().get_event_type(event.get_type_name()).evaluate_template(
-            event, which='summary' if self.__print_summaries else 'story', colorize=self.__colorize
-        ))
+        # We collect events in batches, which allows
+        # us to evaluate the templates more efficiently.
+        self.__batch.append(event)
+        if len(self.__batch) >= self.batch_size:
+            self._flush_batch()
+
+    def _finish_pending_events(self):
+        # The ontology is about to change, which may
+        # affect the templates of buffered events.
+        self._flush_batch()
+        super()._finish_pending_events()
+
+    def _flush_output(self):
+        if self.__batch:
+            self._flush_batch()
+            sys.stdout.flush()
+
+    def _flush_batch(self):
+        strings = EventCollection(self.__batch, ontology=self.get_ontology()).evaluate_templates(
+            which='summary' if self.__print_summaries else 'story', colorize=self.__colorize
+        )
+        if strings:
+            print('\n'.join(strings))
+        self.__batch = []
+
+    def _close(self):
+        self._flush_batch()
+        return super()._close()
 
 
 def main():
@@ -80,7 +116,8 @@ def main():
     input = open(args.file, 'rb') if args.file else sys.stdin.buffer
 
     try:
-        EDXMLEventPrinter(print_summaries=args.short, print_colorized=args.colored).parse(input)
+        with EDXMLEventPrinter(print_summaries=args.short, print_colorized=args.colored) as printer:
+            printer.parse(input)
     except KeyboardInterrupt:
         pass
 
@@ -21,7 +21,7 @@ import argparse
 import sys
 
 from edxml.cli import configure_logger
-from edxml.parser import EDXMLPullParser
+from edxml.parser import EDXMLPullParser, EDXMLParallelPullParser
 from edxml.error import EDXMLValidationError
 
 
@@ -41,6 +41,14 @@ def main():
              'file in stead.'
     )
 
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        help='Validates events using the specified number of worker processes. By default, all events are '
+             'validated by a single process.'
+    )
+
     parser.add_argument(
         '--verbose', '-v', action='count', help='Increments the output verbosity of logging messages on standard error.'
     )
@@ -59,7 +67,7 @@ def main():
         args.file = [sys.stdin.buffer]
 
     try:
-        with EDXMLPullParser() as parser:
+        with (EDXMLParallelPullParser(workers=args.workers) if args.workers else EDXMLPullParser()) as parser:
             for file in args.file:
                 parser.parse(file).close()
     except KeyboardInterrupt:
@@ -11,7 +11,6 @@
 #                                                                                        =
 # ========================================================================================
 
-import codecs
 import re
 import hashlib
 import sys
@@ -208,6 +207,83 @@ class PropertyObjectSet(set, MutableSet):
         pass
 
 
+class ParsedPropertySet(MutableMapping):
+    """
+    Lazy property set of a parsed event. Rather than decoding all
+    properties up front, the object values of a property are read from
+    the properties element when the property is first accessed. Only
+    the properties that are actually accessed allocate an object set.
+    """
+
+    __slots__ = ('_element', '_object_sets', '_update_property')
+
+    def __init__(self, properties_element, update_property):
+        self._element = properties_element
+        self._object_sets = {}
+        self._update_property = update_property
+
+    def __property_names(self):
+        return dict.fromkeys(element.tag[24:] for element in self._element)
+
+    def replace_object_set(self, property_name, object_set):
+        self._object_sets[property_name] = object_set
+
+    def items(self):
+        return [(property_name, self[property_name]) for property_name in self.__property_names()]
+
+    def keys(self):
+        return list(self.__property_names())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __iter__(self):
+        return iter(self.__property_names())
+
+    def __len__(self):
+        return len(self.__property_names())
+
+    def __eq__(self, other):
+        return dict(other) == dict(self.items())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __contains__(self, item):
+        if not isinstance(item, str):
+            return False
+        return self._element.find('{http://edxml.org/edxml}' + item) is not None
+
+    def __getitem__(self, item):
+        try:
+            return self._object_sets[item]
+        except KeyError:
+            if not isinstance(item, str):
+                raise TypeError('Property name is not a string: ' + repr(item))
+            object_set = PropertyObjectSet(
+                item,
+                {element.text for element in self._element.iterchildren('{http://edxml.org/edxml}' + item)},
+                self._update_property
+            )
+            self._object_sets[item] = object_set
+            return object_set
+
+    def __setitem__(self, key, value):
+        object_set = PropertyObjectSet(key, value, self._update_property)
+        self._update_property(key, object_set)
+        self._object_sets[key] = object_set
+
+    def __delitem__(self, key):
+        self._object_sets.pop(key, None)
+        self._update_property(key, ())
+
+    def __deepcopy__(self, memodict=None):
+        return PropertySet(dict(self.items()), update_property=self._update_property)
+
+    def copy(self):
+        return PropertySet(dict(self.items()))
+
+
 class AttachmentValueDict(dict):
     def __init__(self, attachment_name, value={}, update=None):
         if not isinstance(value, dict):
@@ -857,26 +933,7 @@ class EDXMLEvent(MutableMapping):
           str: String representation of the hash.
 
         """
-
-        object_separator = b'\xff\xff\xff\xff'
-
-        objects = self.get_properties()
-        hash_properties = event_type.get_hashed_properties()
-
-        object_strings = set(('%s:%s' % (p, v)).encode() for p in objects if p in hash_properties for v in objects[p])
-
-        # Now we compute the SHA1 hash value of the byte
-        # string representation of the event, and output in hex
-
-        return codecs.encode(hash_function(
-            (
-                b'%s\n%s\n%s' % (
-                    self.get_source_uri().encode(),
-                    self.get_type_name().encode(),
-                    object_separator.join(sorted(object_strings))
-                )
-            )
-        ).digest(), encoding).decode()
+        return event_type.compute_sticky_hashes([self], hash_function, encoding)[0]
 
     def is_valid(self, ontology):
         """
@@ -920,6 +977,7 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         props = self.find('{http://edxml.org/edxml}properties')
         for element in props.findall('{http://edxml.org/edxml}' + key):
             props.remove(element)
+        self._modified = True
         try:
             del self._properties
         except AttributeError:
@@ -928,14 +986,10 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
     def __setitem__(self, key, value):
         object_set = PropertyObjectSet(key, value, update=self.__update_property)
         self.__update_property(key, object_set)
-        try:
-            self._properties.replace_object_set(key, object_set)
-        except AttributeError:
-            properties = self.get_properties()
-            properties[key] = object_set
-            self._properties = PropertySet(properties, update_property=self.__update_property)
+        self.get_properties().replace_object_set(key, object_set)
 
     def __update_property(self, key, value):
+        self._modified = True
         props = self.find('{http://edxml.org/edxml}properties')
         for existing_value in props.findall('{http://edxml.org/edxml}' + key):
             props.remove(existing_value)
@@ -946,6 +1000,7 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
                 props[-1].text = self._normalize_object_value(key, v)
 
     def __update_attachment(self, attachment_name, attachment_id, value):
+        self._modified = True
         attachments_element = self.find('{http://edxml.org/edxml}attachments')
         if attachments_element is None:
             attachments_element = etree.SubElement(self, '{http://edxml.org/edxml}attachments')
@@ -1003,6 +1058,7 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         Returns:
           ParsedEvent:
         """
+        self._modified = True
         try:
             del self._properties
         except AttributeError:
@@ -1018,7 +1074,24 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         Returns:
            ParsedEvent:
         """
-        return deepcopy(self)
+        copied = deepcopy(self)
+        if self.is_modified():
+            copied._modified = True
+        return copied
+
+    def is_modified(self):
+        """
+
+        Returns True when the event was modified after it was parsed.
+        Note that modifications are only detected when these are made
+        using the methods of this class. When the lxml Element is modified
+        directly, the event is considered to be modified only after calling
+        the flush() method.
+
+        Returns:
+          bool:
+        """
+        return getattr(self, '_modified', False)
 
     @classmethod
     def create(cls, properties=None, event_type_name=None, source_uri=None, parents=None, attachments=None):
@@ -1062,17 +1135,9 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         try:
             return self._properties
         except AttributeError:
-            properties = OrderedDict()
-            for element in self.find('{http://edxml.org/edxml}properties'):
-                tag = element.tag[24:]
-                if tag not in properties:
-                    properties[tag] = set()
-                properties[tag].add(element.text)
-
-            self._properties = PropertySet(
-                properties, update_property=self.__update_property
+            self._properties = ParsedPropertySet(
+                self.find('{http://edxml.org/edxml}properties'), update_property=self.__update_property
             )
-
             return self._properties
 
     def get_attachments(self):
@@ -1150,6 +1215,7 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         """
         properties_element = self.find('{http://edxml.org/edxml}properties')
         properties_element.clear()
+        self._modified = True
 
         self._properties = PropertySet(
                 properties, update_property=self.__update_property
@@ -1187,6 +1253,7 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
         except AttributeError:
             self._attachments = AttachmentSet({name: attachment}, update_attachment=self.__update_attachment)
 
+        self._modified = True
         return self
 
     def add_parents(self, parent_hashes):
@@ -1224,11 +1291,13 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
                 del self.attrib['parents']
         else:
             self.attrib['parents'] = ','.join(set(parent_hashes))
+        self._modified = True
         return self
 
     def set_foreign_attributes(self, attribs):
         for key, value in attribs.items():
             self.attrib[key] = value
+        self._modified = True
 
     def get_type_name(self):
         return self.attrib['event-type']
@@ -1238,9 +1307,11 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
 
     def set_type(self, event_type_name):
         self.attrib['event-type'] = event_type_name
+        self._modified = True
 
     def set_source(self, source_uri):
         self.attrib['source-uri'] = source_uri
+        self._modified = True
 
 
 class EventElement(EDXMLEvent):
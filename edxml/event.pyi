@@ -22,6 +22,26 @@ class PropertySet(OrderedDict):
     def replace_object_set(self, property_name, object_set) -> None: ...
 
 
+class ParsedPropertySet(MutableMapping):
+    __slots__ = ('_element', '_object_sets', '_update_property')
+
+    def __init__(self, properties_element: etree.Element, update_property) -> None:
+        self._element = ...  # type: etree.Element
+        self._object_sets = ...  # type: Dict[str, PropertyObjectSet]
+
+    def __property_names(self) -> Dict[str, None]: ...
+
+    def _update_property(self, property_name: str, values): ...
+
+    def replace_object_set(self, property_name, object_set) -> None: ...
+
+    def items(self) -> List[tuple]: ...
+
+    def keys(self) -> List[str]: ...
+
+    def copy(self) -> PropertySet: ...
+
+
 class AttachmentSet(OrderedDict):
     def __init__(self, attachments: Dict[str, Dict[str, str]] = None, update_attachment=None):
         super().__init__()
@@ -137,6 +157,8 @@ class ParsedEvent(EDXMLEvent, etree.ElementBase):
 
     def copy(self) -> 'ParsedEvent': ...
 
+    def is_modified(self) -> bool: ...
+
     def _sort(self): ...
 
     def get_type_name(self) -> str: ...
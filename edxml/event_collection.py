@@ -11,11 +11,13 @@
 #                                                                                        =
 # ========================================================================================
 
+import hashlib
 from io import BytesIO
 from collections import defaultdict
 from typing import Dict, List # noqa
 
 from edxml import EDXMLWriter, EDXMLPullParser, EDXMLEvent
+from edxml.error import EDXMLValidationError
 from edxml.ontology import Ontology
 
 
@@ -54,6 +56,73 @@ class EventCollection(List[EDXMLEvent]):
     def add_foreign_element(self, element):
         self._foreign_elements.append(element)
 
+    def compute_sticky_hashes(self, hash_function=hashlib.sha1, encoding='hex', threads=1):
+        """
+        Computes the sticky hashes of all events in the collection. The
+        hashes are computed in batches of events of the same event type.
+        Refer to the compute_sticky_hashes() method of the EventType class
+        for details.
+
+        Args:
+          hash_function (callable): The hashlib hash function to use
+          encoding (str): Desired output encoding
+          threads (int): Number of hashing threads
+
+        Returns:
+            List[str]: The hashes, in the same order as the events
+        """
+        return self._map_by_event_type(
+            lambda event_type, events: event_type.compute_sticky_hashes(events, hash_function, encoding, threads)
+        )
+
+    def evaluate_templates(self, which='story', capitalize=True, colorize=False):
+        """
+        Evaluates the event story or summary templates for all events
+        in the collection. The templates are evaluated in batches of
+        events of the same event type. Refer to the evaluate_templates()
+        method of the EventType class for details.
+
+        Args:
+          which (str): which template to evaluate
+          capitalize (bool): Capitalize output or not
+          colorize (bool): Colorize output or not
+
+        Returns:
+            List[str]: The evaluated templates, in the same order as the events
+        """
+        return self._map_by_event_type(
+            lambda event_type, events: event_type.evaluate_templates(events, which, capitalize, colorize)
+        )
+
+    def _map_by_event_type(self, function):
+        """
+        Groups the events in the collection by event type and calls
+        the specified function for each group. The function is called
+        with the event type and a list of events of that type and must
+        return a list containing one result for each event.
+
+        Args:
+          function (Callable[[edxml.ontology.EventType, List[EDXMLEvent]], List]): The function
+
+        Returns:
+            List: The results, in the same order as the events
+        """
+        indices_by_type = defaultdict(list)  # type: Dict[str, List[int]]
+        for index, event in enumerate(self):  # type: int, EDXMLEvent
+            indices_by_type[event.get_type_name()].append(index)
+
+        results = [None] * len(self)
+        for event_type_name, indices in indices_by_type.items():
+            event_type = self._ontology.get_event_type(event_type_name)
+            if event_type is None:
+                raise EDXMLValidationError(
+                    'The collection contains an event of type "%s", which is not defined in its ontology.' %
+                    event_type_name
+                )
+            for index, result in zip(indices, function(event_type, [self[index] for index in indices])):
+                results[index] = result
+        return results
+
     def create_dict_by_hash(self):
         """
         Creates a dictionary mapping sticky hashes to event collections
@@ -64,9 +133,8 @@ class EventCollection(List[EDXMLEvent]):
             Dict[str, EventCollection]
         """
         hash_dict = defaultdict(EventCollection)  # type: Dict[str, EventCollection]
-        for event in self:  # type: EDXMLEvent
-            event_type = self._ontology.get_event_type(event.get_type_name())
-            hash_dict[event.compute_sticky_hash(event_type)].append(event)
+        for event, event_hash in zip(self, self.compute_sticky_hashes()):
+            hash_dict[event_hash].append(event)
         return hash_dict
 
     def is_equivalent_of(self, other):
@@ -148,11 +216,6 @@ class EventCollection(List[EDXMLEvent]):
             edxml.EventCollection
 
         """
-        hash_dict = defaultdict(list)  # type: Dict[str, List[EDXMLEvent]]
-        for event in self:  # type: EDXMLEvent
-            event_type = self._ontology.get_event_type(event.get_type_name())
-            hash_dict[event.compute_sticky_hash(event_type)].append(event)
-
         result = EventCollection(ontology=self._ontology)
         for events in self.create_dict_by_hash().values():
             if len(events) < 2:
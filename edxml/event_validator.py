@@ -10,8 +10,10 @@
 #                         https://opensource.org/licenses/MIT                            =
 #                                                                                        =
 # ========================================================================================
+from time import perf_counter
+
 from lxml import etree
-from typing import Dict, Optional # noqa
+from typing import Any, Dict, List, Optional, Tuple # noqa
 
 import edxml
 from edxml.error import EDXMLEventValidationError
@@ -35,14 +37,34 @@ class EventValidatorError:
 class EventValidator:
     """
     Class for validating EDXML events.
+
+    By default, events are first checked using validators that are compiled
+    from the event type definitions. Only events that these validators cannot
+    vouch for are validated using RelaxNG schemas, which also yields the details
+    of any validation errors. Either way, the validator accepts and rejects
+    exactly the same events. Setting compiled to False makes the validator
+    use RelaxNG schemas exclusively.
+
+    Schemas and compiled validators are cached per event type. When the
+    ontology changes, only those cache entries are rebuilt that belong to
+    event types that were changed or that refer to object types that were
+    changed.
+
+    Args:
+        ontology (edxml.ontology.Ontology): The ontology defining the events
+        compiled (bool): Use compiled validators yes / no
     """
 
-    def __init__(self, ontology):
+    def __init__(self, ontology, compiled=True):
         self.__ontology = ontology  # type: edxml.ontology.Ontology
-        self.__ontology_version = 0
+        self.__compiled = compiled
+
+        # Cache entries, keyed by event type name and namespacing.
+        self.__cache = {}  # type: Dict[Tuple[str, bool], Dict[str, Any]]
 
-        self.__event_type_schema_cache = {}     # type: Dict[str, etree.RelaxNG]
-        self.__event_type_schema_cache_ns = {}  # type: Dict[str, etree.RelaxNG]
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__compile_time = 0.0
 
         self.__last_error = None  # type: Optional[EventValidatorError]
 
@@ -63,6 +85,13 @@ class EventValidator:
         """
         event_element = event_element if event_element is not None else event.get_element()
         event_type_name = event.get_type_name()
+        namespaced = isinstance(event, edxml.event.ParsedEvent)
+
+        if self.__compiled:
+            validator = self._get_event_type_validator(event_type_name, namespaced)
+            if validator is not None and validator(event_element):
+                return
+
         # Parsed events inherit the global namespace from the
         # EDXML data stream that they originate from. Unfortunately,
         # the lxml XML generator (specifically etree.xmlfile) is not
@@ -70,7 +99,7 @@ class EventValidator:
         # an output stream that already has a global namespace. So,
         # for this specific case, we must write explicitly namespaced
         # events and use a separate validation schema.
-        schema = self._get_event_type_schema(event_type_name, namespaced=isinstance(event, edxml.event.ParsedEvent))
+        schema = self._get_event_type_schema(event_type_name, namespaced)
 
         if not schema.validate(event_element):
             # Event does not validate.
@@ -97,6 +126,53 @@ class EventValidator:
         else:
             return True
 
+    def find_invalid_events(self, events, event_elements=None):
+        """
+
+        Validates given events, returning the positions of any invalid events
+        in the input. This is more efficient than validating the events one
+        by one. The events are grouped by event type and each group is validated
+        in a single pass. Only groups that fail to validate are validated one
+        event at a time to find the offending events. If you happen to have the
+        XML representations of the events at hand you can pass them along for
+        improved efficiency.
+
+        Note that, unlike the validate() method, this method does not update
+        the last error of the validator.
+
+        Args:
+            events (List[edxml.EDXMLEvent]): The events that will be validated
+            event_elements (List[lxml.etree._Element]): The XML representations of the events
+
+        Returns:
+            List[int]: Positions of invalid events
+        """
+        if event_elements is None:
+            event_elements = [event.get_element() for event in events]
+
+        groups = {}  # type: Dict[Tuple[str, bool], List[int]]
+        for position, event in enumerate(events):
+            key = (event.get_type_name(), isinstance(event, edxml.event.ParsedEvent))
+            groups.setdefault(key, []).append(position)
+
+        invalid = []
+        for (event_type_name, namespaced), positions in groups.items():
+            if self.__compiled:
+                validator = self._get_event_type_validator(event_type_name, namespaced)
+                if validator is not None:
+                    positions = [position for position in positions if not validator(event_elements[position])]
+                    if not positions:
+                        continue
+
+            if not self._validate_event_group([event_elements[position] for position in positions],
+                                              event_type_name, namespaced):
+                invalid.extend(
+                    position for position in positions
+                    if not self._get_event_type_schema(event_type_name, namespaced).validate(event_elements[position])
+                )
+
+        return sorted(invalid)
+
     def get_last_error(self):
         """
 
@@ -107,19 +183,123 @@ class EventValidator:
         """
         return self.__last_error
 
+    def get_cache_statistics(self):
+        """
+
+        Returns statistics about the cache of RelaxNG schemas and
+        compiled validators. The statistics are returned as a dictionary
+        containing the number of cache hits ('hits'), the number of cache
+        misses ('misses') and the total time spent generating and compiling
+        schemas and validators in seconds ('compile_time').
+
+        Returns:
+            Dict[str, Union[int, float]]:
+        """
+        return {'hits': self.__cache_hits, 'misses': self.__cache_misses, 'compile_time': self.__compile_time}
+
+    def _get_object_types(self, event_type):
+        return [self.__ontology.get_object_type(event_property.get_object_type_name())
+                for event_property in event_type.get_properties().values()]
+
+    def _get_cache_key(self, event_type):
+        # The key contains the change counts of the event type and of
+        # the object types of its properties. We use object identities
+        # rather than names to detect event types or object types being
+        # replaced by other instances.
+        return tuple(
+            (id(element), element.get_change_count())
+            for element in [event_type] + self._get_object_types(event_type)
+        )
+
+    def _get_cache_entry(self, event_type_name, namespaced):
+        ontology_version = self.__ontology.get_version()
+        event_type = self.__ontology.get_event_type(event_type_name)
+
+        entry = self.__cache.get((event_type_name, namespaced))
+        if entry is not None and entry['event_type'] is event_type:
+            if entry['ontology_version'] == ontology_version:
+                # Nothing changed since we last checked.
+                return entry
+            key = self._get_cache_key(event_type)
+            if entry['key'] == key:
+                # Ontology changed, but not in a way that affects the event type.
+                entry['ontology_version'] = ontology_version
+                return entry
+        else:
+            key = self._get_cache_key(event_type)
+
+        # Note that the entry holds references to the object types to
+        # prevent their identities from being reused by other instances.
+        entry = {
+            'event_type': event_type,
+            'object_types': self._get_object_types(event_type),
+            'key': key,
+            'ontology_version': ontology_version,
+        }
+        self.__cache[(event_type_name, namespaced)] = entry
+        return entry
+
+    def _get_event_type_validator(self, event_type_name, namespaced):
+        entry = self._get_cache_entry(event_type_name, namespaced)
+
+        if 'validator' in entry:
+            self.__cache_hits += 1
+        else:
+            self.__cache_misses += 1
+            start = perf_counter()
+            entry['validator'] = entry['event_type'].generate_validator(self.__ontology, namespaced)
+            self.__compile_time += perf_counter() - start
+
+        return entry['validator']
+
     def _get_event_type_schema(self, event_type_name, namespaced):
-        if self.__ontology.get_version() > self.__ontology_version:
-            # Ontology was updated, clear cache.
-            self.__event_type_schema_cache = {}
-            self.__event_type_schema_cache_ns = {}
-
-        schema_cache = self.__event_type_schema_cache_ns if namespaced else self.__event_type_schema_cache
-        if event_type_name not in schema_cache:
-            schema_cache[event_type_name] = etree.RelaxNG(
-                self.__ontology.get_event_type(event_type_name).generate_relax_ng(self.__ontology, namespaced)
-            )
+        entry = self._get_cache_entry(event_type_name, namespaced)
 
-        return schema_cache[event_type_name]
+        if 'schema' in entry:
+            self.__cache_hits += 1
+        else:
+            self.__cache_misses += 1
+            start = perf_counter()
+            entry['schema'] = etree.RelaxNG(entry['event_type'].generate_relax_ng(self.__ontology, namespaced))
+            self.__compile_time += perf_counter() - start
+
+        return entry['schema']
+
+    def _get_event_type_group_schema(self, event_type_name, namespaced):
+        entry = self._get_cache_entry(event_type_name, namespaced)
+
+        if 'group_schema' in entry:
+            self.__cache_hits += 1
+        else:
+            self.__cache_misses += 1
+            start = perf_counter()
+            # We take the event type schema and wrap the event
+            # pattern into an element containing one or more events.
+            schema = entry['event_type'].generate_relax_ng(self.__ontology, namespaced)
+            start_pattern = schema.getroot().find('{http://relaxng.org/ns/structure/1.0}start')
+            group = etree.SubElement(start_pattern, '{http://relaxng.org/ns/structure/1.0}element', name='events')
+            etree.SubElement(group, '{http://relaxng.org/ns/structure/1.0}oneOrMore').append(start_pattern[0])
+            entry['group_schema'] = etree.RelaxNG(etree.fromstring(etree.tostring(schema)))
+            self.__compile_time += perf_counter() - start
+
+        return entry['group_schema']
+
+    def _validate_event_group(self, event_elements, event_type_name, namespaced):
+        schema = self._get_event_type_group_schema(event_type_name, namespaced)
+
+        # Elements that are part of some tree cannot be moved into the
+        # group container, so these must be validated one by one.
+        if any(element.getparent() is not None for element in event_elements):
+            return False
+
+        container = etree.Element('events')
+        for element in event_elements:
+            container.append(element)
+        try:
+            return schema.validate(container)
+        finally:
+            for element in event_elements:
+                container.remove(element)
 
     def _generate_event_validation_exception(self, event, event_element, schema):
 
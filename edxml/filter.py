@@ -19,6 +19,8 @@ the output. By overriding various callbacks, the data can be modified before
 it is written, using an :class:`edxml.ontology.Ontology` instance to interpret it.
 
 """
+from lxml import etree
+
 from .parser import EDXMLParserBase, EDXMLPushParser, EDXMLPullParser
 from edxml.writer import EDXMLWriter
 
@@ -35,6 +37,8 @@ class EDXMLFilterBase(EDXMLParserBase):
         super().__init__(validate)
         self._writer = self._writer = EDXMLWriter(output, validate)  # type: EDXMLWriter
         """EDXML Writer"""
+        self.__validate = validate
+        self.__altered_event_types = set()
 
     def _close(self):
         self._writer.close()
@@ -55,6 +59,33 @@ class EDXMLFilterBase(EDXMLParserBase):
         super()._parsed_ontology(parsed_ontology)
         self._writer.add_ontology(filtered_ontology or parsed_ontology)
 
+        if filtered_ontology is not None and filtered_ontology is not parsed_ontology:
+            self.__find_altered_event_types(parsed_ontology, filtered_ontology)
+
+    def __find_altered_event_types(self, parsed_ontology, filtered_ontology):
+        """
+
+        Finds the event types for which the filtered ontology implies
+        a different event structure than the parsed ontology. Events
+        of these types are validated by the writer, even when they
+        are not modified by the filter. Note that an event type remains
+        altered once it is found to be altered, since the ontology of
+        the writer is the result of all ontologies that it received.
+
+        Args:
+          parsed_ontology (edxml.ontology.Ontology): The input ontology
+          filtered_ontology (edxml.ontology.Ontology): The output ontology
+
+        """
+        for event_type_name, event_type in filtered_ontology.get_event_types().items():
+            if event_type_name in self.__altered_event_types:
+                continue
+            parsed_event_type = parsed_ontology.get_event_type(event_type_name)
+            if parsed_event_type is None or \
+                    etree.tostring(event_type.generate_relax_ng(filtered_ontology)) != \
+                    etree.tostring(parsed_event_type.generate_relax_ng(parsed_ontology)):
+                self.__altered_event_types.add(event_type_name)
+
     def _parsed_event(self, event):
         """
 
@@ -70,7 +101,24 @@ class EDXMLFilterBase(EDXMLParserBase):
 
         """
         super()._parsed_event(event)
-        self._writer.add_event(event)
+        self._writer.add_event(event, validate=not self._is_passthrough_event(event))
+
+    def _is_passthrough_event(self, event):
+        """
+
+        Returns True when the event can be written into the
+        output without validating it again. That is the case
+        for unmodified events that were validated by the
+        parser using an identical event type definition.
+
+        Args:
+          event (edxml.ParsedEvent): The event
+
+        Returns:
+          bool:
+        """
+        return self.__validate and not event.is_modified() and \
+            event.get_type_name() not in self.__altered_event_types
 
 
 class EDXMLPullFilter(EDXMLPullParser, EDXMLFilterBase):
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from typing import Set
+
 from edxml import EDXMLWriter, ParsedEvent
 from edxml.ontology import Ontology
 from edxml.parser import EDXMLParserBase, EDXMLPullParser, EDXMLPushParser
@@ -9,11 +11,17 @@ class EDXMLFilterBase(EDXMLParserBase):
     def __init__(self, output, validate=True) -> None:
 
         self._writer = ...      # type: EDXMLWriter
+        self.__validate = ...   # type: bool
+        self.__altered_event_types = ...  # type: Set[str]
 
     def _parsed_ontology(self, parsed_ontology: Ontology, filtered_ontology: Ontology=None) -> None: ...
 
+    def __find_altered_event_types(self, parsed_ontology: Ontology, filtered_ontology: Ontology) -> None: ...
+
     def _parsed_event(self, event: ParsedEvent) -> None: ...
 
+    def _is_passthrough_event(self, event: ParsedEvent) -> bool: ...
+
 
 class EDXMLPullFilter(EDXMLPullParser, EDXMLFilterBase):
     def __init__(self, output, validate=True) -> None: ...
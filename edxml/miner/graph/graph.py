@@ -11,9 +11,11 @@
 #                                                                                        =
 # ========================================================================================
 
+import heapq
 from collections import defaultdict
 from functools import reduce
-from typing import Dict, Set, Iterable # noqa
+from itertools import count
+from typing import Dict, Set, Iterable, List, Optional, Tuple # noqa
 
 from edxml.ontology import Ontology
 from edxml.miner.node import Node, EventObjectHub, EventObjectNode
@@ -34,6 +36,15 @@ class ConceptInstanceGraph(object):
         self._object_type_value_nodes = defaultdict(lambda: defaultdict(set))  # type: Dict[str, Dict[str, Set[Node]]]
         self._hubs_by_object_type_value = defaultdict(dict)  # type: Dict[str, Dict]
         self._seed = None
+        # Heap of candidate seeds, ordered by ascending taint, descending
+        # confidence and then by the order in which the nodes were added.
+        # It is built lazily and kept up to date as node taints change.
+        self._seed_index = None  # type: Optional[List[Tuple[float, float, int, EventObjectNode]]]
+        self._seed_ranks = {}  # type: Dict[str, int]
+        # Nodes that may have been visited, assigned a depth or
+        # assigned edge roles while mining the current seed. Only
+        # these nodes need to be cleared before mining the next seed.
+        self._touched_nodes = set()  # type: Set[Node]
 
     def add(self, node):
         """
@@ -54,6 +65,9 @@ class ConceptInstanceGraph(object):
         # Add object value to index. We use the index to efficiently
         # construct concept graphs.
         self._object_type_value_nodes[node.object_type_name][node.value].add(node)
+        if self._seed_index is not None and isinstance(node, EventObjectNode):
+            self._seed_ranks[node.id] = len(self._seed_ranks)
+            self._index_seed(node)
         # Also add children to index
         for edge in node.get_inferences():
             if not isinstance(edge.target, EventObjectHub):
@@ -136,20 +150,39 @@ class ConceptInstanceGraph(object):
             Optional[EventObjectNode]:
 
         """
-        # We sort the nodes by taint (ascending) and confidence (descending) and pick
+        # We order the nodes by taint (ascending) and confidence (descending) and pick
         # the first one as optimal concept seed. This selection method ensures that we pick
         # a seed that is not close to any previously selected seeds and is a strong identifier
-        # for a new concept.
-        seeds = sorted(
-            (node for node in self._nodes.values() if isinstance(node, EventObjectNode) and node.taint <= max_taint),
-            key=lambda node: (1.0 - node.taint, node.concept_association.get_confidence()),
-            reverse=True
-        )
+        # for a new concept. The ordering is maintained in a heap that is updated as node
+        # taints change. Heap entries that no longer match the taint of their node are skipped.
+        if self._seed_index is None:
+            self._build_seed_index()
+
+        while self._seed_index:
+            taint, _, _, node = self._seed_index[0]
+            if taint != node.taint:
+                heapq.heappop(self._seed_index)
+                continue
+            if taint > max_taint:
+                return None
+            return node
+
+        return None
 
-        if not seeds:
-            return None
+    def _build_seed_index(self):
+        self._seed_index = []
+        self._seed_ranks = {}
+        for node in self._nodes.values():
+            if isinstance(node, EventObjectNode):
+                self._seed_ranks[node.id] = len(self._seed_ranks)
+                self._index_seed(node)
 
-        return seeds[0]
+    def _index_seed(self, node):
+        if self._seed_index is not None:
+            heapq.heappush(
+                self._seed_index,
+                (node.taint, -node.concept_association.get_confidence(), self._seed_ranks[node.id], node)
+            )
 
     def extract_result_set(self, min_confidence=0.1):
         """
@@ -215,6 +248,7 @@ class ConceptInstanceGraph(object):
             return
 
         origin.visited = True
+        self._touched_nodes.add(origin)
 
         shared_value_nodes = self._object_type_value_nodes[origin.object_type_name][origin.value]
 
@@ -257,12 +291,14 @@ class ConceptInstanceGraph(object):
 
         """
 
-        self._clear_visited_status()
-        self._clear_edge_roles()
+        self._clear_touched_nodes()
         self._ensure_hubs(seed, seed, min_confidence=min_confidence, max_depth=max_depth)
-        self._reason_from(seed, min_confidence=min_confidence, max_depth=max_depth)
-        self._update_seed_taints()
-        seed.taint = 1.0
+        reasoned_nodes = self._reason_from(seed, min_confidence=min_confidence, max_depth=max_depth)
+        self._touched_nodes.update(reasoned_nodes)
+        self._update_seed_taints(reasoned_nodes)
+        if seed.taint != 1.0:
+            seed.taint = 1.0
+            self._index_seed(seed)
         self._seed = seed
 
     def _reason_from(self, seed, min_confidence=0.1, max_depth=10):
@@ -280,9 +316,14 @@ class ConceptInstanceGraph(object):
             min_confidence (float): Confidence cutoff
             max_depth (int): Max recursion depth
 
+        Returns:
+            Set[Node]: The nodes that were assigned a confidence
+
         """
 
-        for node in self._get_nodes():
+        # Nodes that were not touched since the touched nodes were
+        # last cleared are still in their initial state.
+        for node in self._touched_nodes:
             node.depth = 0
             node.visited = False
 
@@ -292,7 +333,21 @@ class ConceptInstanceGraph(object):
         seed.concept_name_equivalents[seed.concept_name] = {seed.id: 1.0}
 
         node = seed
-        nodes_unvisited_touched = set()
+        reasoned_nodes = {seed}
+
+        # Priority queue of touched, unvisited nodes, ordered by descending
+        # confidence. Considering only the touched nodes is an optimization.
+        # Nodes are considered untouched as long as we have not assigned it
+        # a confidence yet, which implies that their confidence is zero. We
+        # ignore these nodes assuming that a single concept instance will be
+        # small compared to the full graph, allowing us to ignore a large part
+        # of the graph. Rather than updating the position of a node in the queue
+        # when its confidence increases, we add the node again. Queue entries
+        # that no longer match the confidence of their node are skipped. Nodes
+        # having equal confidences come out of the queue ordered by depth and
+        # then in the order in which they were touched.
+        nodes_unvisited_touched = []
+        sequence = count()
 
         # TODO: While reasoning we may discover other concepts that the concept instance
         #       might be an instance of. These are accumulated in the seed. This means we
@@ -316,31 +371,28 @@ class ConceptInstanceGraph(object):
                     # will configure the edge as the reason for including the target
                     # node in the concept instance, replacing any previously used edge.
                     edge.reason(seed, confidence)
+                    reasoned_nodes.add(edge.target)
                     edge.target.depth = edge.source.depth + 1
-                    if not edge.target.visited:
-                        nodes_unvisited_touched.add(edge.target)
+                    heapq.heappush(
+                        nodes_unvisited_touched, (-confidence, edge.target.depth, next(sequence), edge.target)
+                    )
 
             node.visited = True
-            try:
-                nodes_unvisited_touched.remove(node)
-            except KeyError:
-                pass
-
-            # In order to find the closest unvisited node to process next, we sort the set of
-            # unvisited, touched nodes by their confidence. Considering only the touched nodes
-            # is an optimization. Nodes are considered untouched as long as we have not assigned it
-            # a confidence yet, which implies that their confidence is zero. Below, we ignore these
-            # nodes assuming that a single concept instance will be small compared to the full graph,
-            # allowing us to ignore a large part of the graph.
-            sorted_nodes = sorted(nodes_unvisited_touched, key=lambda n: n.seed_confidences[seed.id], reverse=True)
-
-            if sorted_nodes:
-                node = sorted_nodes[0]
-            else:
-                node = None
 
-    def _update_seed_taints(self):
-        for node in self._nodes.values():
+            # Find the closest unvisited node to process next.
+            node = None
+            while nodes_unvisited_touched:
+                confidence, _, _, candidate = heapq.heappop(nodes_unvisited_touched)
+                if not candidate.visited and -confidence == candidate.seed_confidences[seed.id]:
+                    node = candidate
+                    break
+
+        return reasoned_nodes
+
+    def _update_seed_taints(self, nodes):
+        # Only nodes that were assigned a confidence while reasoning
+        # can have their taint changed, so we only visit those.
+        for node in nodes:
             if not isinstance(node, EventObjectNode):
                 # We only want event objects to get
                 # tainted, not shared object hubs.
@@ -353,13 +405,17 @@ class ConceptInstanceGraph(object):
                 new_taint = list(confidences)[0]
             else:
                 new_taint = 1.0 - reduce(lambda x, y: (1.0 - x) * (1.0 - y), confidences)
-            node.taint = max(node.taint, new_taint)
+            if new_taint > node.taint:
+                node.taint = new_taint
+                self._index_seed(node)
 
     def reset(self):
         """
         Clears artifacts of previous concept mining from the graph
         """
         self._seed = None
+        self._seed_index = None
+        self._touched_nodes = set()
         self._hubs_by_object_type_value = defaultdict(dict)
 
         for node in list(self._nodes.values()):
@@ -371,13 +427,15 @@ class ConceptInstanceGraph(object):
     def _get_nodes(self) -> Iterable[Node]:
         return self._nodes.values()
 
-    def _clear_visited_status(self):
-        for node in self._nodes.values():
+    def _clear_touched_nodes(self):
+        # Clears the visited status, depth and edge roles of the nodes
+        # touched while mining the previous seed. Other nodes are still
+        # in their initial state, so there is no need to visit them.
+        for node in self._touched_nodes:
             node.visited = False
-
-    def _clear_edge_roles(self):
-        for node in self._nodes.values():
+            node.depth = 0
             node.clear_edge_roles()
+        self._touched_nodes = set()
 
     def update_ontology(self, ontology):
         self._ontology.update(ontology)
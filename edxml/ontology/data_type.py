@@ -25,6 +25,7 @@ from dateutil.parser import parse
 from lxml import etree
 from lxml.builder import ElementMaker
 from edxml.error import EDXMLEventValidationError, EDXMLOntologyValidationError
+from edxml.ontology.util import translate_xsd_pattern
 
 
 class DataType(object):
@@ -45,6 +46,19 @@ class DataType(object):
     # Expression used for matching valid EDXML datetime values
     DATETIME_PATTERN = r'(([2-9][0-9]{3})|(1(([6-9]\d{2})|(5((9\d)|(8[3-9]))))))-\d{2}-\d{2}T(([01]\d)|(2[0-3])).{13}Z'
 
+    _DATETIME_VALUE_PATTERN = re.compile('^' + DATETIME_PATTERN + '$')
+    # Expression matching datetime strings that are formatted like
+    # normalized EDXML datetime values already.
+    _DATETIME_NORMALIZED_PATTERN = re.compile(r'[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{6}Z')
+    # Value ranges of integer data types, unsigned and signed
+    INTEGER_RANGES = {
+        'tinyint': ((0, 2 ** 8 - 1), (-2 ** 7, 2 ** 7 - 1)),
+        'smallint': ((0, 2 ** 16 - 1), (-2 ** 15, 2 ** 15 - 1)),
+        'mediumint': ((0, 2 ** 24 - 1), (-2 ** 23 + 1, 2 ** 23 - 1)),
+        'int': ((0, 2 ** 32 - 1), (-2 ** 31, 2 ** 31 - 1)),
+        'bigint': ((0, 2 ** 64 - 1), (-2 ** 63, 2 ** 63 - 1)),
+    }
+
     FAMILY_DATETIME = 'datetime'
     FAMILY_SEQUENCE = 'sequence'
     FAMILY_NUMBER = 'number'
@@ -59,10 +73,48 @@ class DataType(object):
     FAMILY_IP = 'ip'
     FAMILY_FILE = 'file'
 
+    # Dispatch tables mapping data type families to the methods
+    # that validate and normalize object values of that family.
+    _VALUE_VALIDATORS = {
+        'datetime': '_validate_value_datetime',
+        'sequence': '_validate_value_sequence',
+        'number': '_validate_value_number',
+        'hex': '_validate_value_hex',
+        'uuid': '_validate_value_uuid',
+        'geo': '_validate_value_geo',
+        'string': '_validate_value_string',
+        'uri': '_validate_value_uri',
+        'base64': '_validate_value_base64',
+        'file': '_validate_value_file',
+        'ip': '_validate_value_ip',
+        'boolean': '_validate_value_boolean',
+        'enum': '_validate_value_enum',
+    }
+
+    _NORMALIZERS = {
+        'datetime': '_normalize_datetime',
+        'number': '_normalize_number',
+        'hex': '_normalize_hex',
+        'uri': '_normalize_uri',
+        'ip': '_normalize_ip',
+        'geo': '_normalize_geo',
+        'string': '_normalize_string',
+        'base64': '_normalize_base64',
+        'boolean': '_normalize_boolean',
+    }
+
     def __init__(self, data_type):
 
         self.type = data_type
 
+        self.__compiled_type = None
+        self.__split = None
+        self.__value_validator = None
+        self.__normalizer = None
+        self.__enum_choices = None
+        self.__normalized_checker = None
+        self.__normalized_checker_type = None
+
     def __str__(self):
         return self.type
 
@@ -782,12 +834,225 @@ class DataType(object):
         else:
             raise TypeError('Unknown EDXML data type: "%s"' % self.type)
 
+    def _generate_validator_pattern(self, pattern):
+        translated = translate_xsd_pattern(pattern)
+        if translated is None:
+            return None
+
+        compiled = re.compile(translated)
+
+        def validator(value):
+            return compiled.fullmatch(value) is not None
+
+        return validator
+
+    def _generate_validator_datetime(self):
+        # Unlike the pattern in the schema, the expression below
+        # assures that the value is a valid xsd:dateTime. The
+        # pattern from the schema adds its restrictions on top.
+        structure = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{6}Z')
+        restriction = re.compile(translate_xsd_pattern(self.DATETIME_PATTERN))
+
+        def validator(value):
+            if structure.fullmatch(value) is None or restriction.fullmatch(value) is None:
+                return False
+            try:
+                datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                         int(value[11:13]), int(value[14:16]), int(value[17:19]))
+            except ValueError:
+                return False
+            return True
+
+        return validator
+
+    def _generate_validator_sequence(self):
+        pattern = re.compile(r'[1-9][0-9]{0,19}|0')
+
+        def validator(value):
+            return pattern.fullmatch(value) is not None and int(value) < 2 ** 64
+
+        return validator
+
+    def _generate_validator_number(self):
+        split_data_type = self.type.split(':')
+
+        if split_data_type[1] in self.INTEGER_RANGES:
+            signed = len(split_data_type) > 2 and split_data_type[2] == 'signed'
+            minimum, maximum = self.INTEGER_RANGES[split_data_type[1]][signed]
+            pattern = re.compile(r'-?[1-9][0-9]{0,19}|0' if signed else r'[1-9][0-9]{0,19}|0')
+
+            def validator(value):
+                return pattern.fullmatch(value) is not None and minimum <= int(value) <= maximum
+
+            return validator
+
+        elif split_data_type[1] in ('float', 'double'):
+            signed = len(split_data_type) > 2 and split_data_type[2] == 'signed'
+            # We only accept magnitudes that are well within the range of
+            # the data type and mantissas that do not exceed its precision.
+            smallest, largest = (1e-30, 1e30) if split_data_type[1] == 'float' else (1e-300, 1e300)
+            pattern = re.compile(
+                r'%s[0-9]{1,17}(\.[0-9]{1,17})?(E[+-][0-9]{1,3})?' % ('-?' if signed else '')
+            )
+
+            def validator(value):
+                if pattern.fullmatch(value) is None:
+                    return False
+                magnitude = abs(float(value))
+                return magnitude == 0 or smallest <= magnitude <= largest
+
+            return validator
+
+        elif split_data_type[1] in ('decimal', 'currency'):
+            if split_data_type[1] == 'decimal':
+                digits, fractional = int(split_data_type[2]), int(split_data_type[3])
+                signed = len(split_data_type) > 4
+            else:
+                digits, fractional, signed = 19, 4, True
+
+            pattern = re.compile(r'%s(0|[1-9][0-9]*)\.[0-9]{%d}' % ('-?' if signed else '', fractional))
+            # Numbers having more digits than this may not be
+            # handled by the decimal implementation of the schema
+            # validator, so we leave these for the schema to check.
+            max_integral_digits = min(digits, 18) - fractional
+
+            def validator(value):
+                match = pattern.fullmatch(value)
+                if match is None or len(match.group(1)) > max_integral_digits:
+                    return False
+                # Zero must not be signed.
+                return value[0] != '-' or value.strip('-0.') != ''
+
+            return validator
+
+        else:
+            raise TypeError('Unknown data type: ' + split_data_type[0])
+
+    def _generate_validator_uri(self):
+        # Any URI is valid, but the schema validator may reject values that
+        # it fails to parse as an URI. We only accept values having a simple
+        # structure, like absolute URIs with a plain authority or file paths.
+        pattern = re.compile(
+            r'([a-z][a-z0-9+.-]*://[A-Za-z0-9.-]+(:[0-9]{1,5})?)?(/[A-Za-z0-9._~-]*)*'
+            r'|[A-Za-z0-9._~-]+(/[A-Za-z0-9._~-]*)*'
+        )
+
+        def validator(value):
+            return pattern.fullmatch(value) is not None
+
+        return validator
+
+    def _generate_validator_string(self, regexp):
+        split_data_type = self.type.split(':')
+
+        length = int(split_data_type[1])
+        case = split_data_type[2]
+
+        if case == 'mc':
+            if len(split_data_type) > 3 and 'u' in split_data_type[3]:
+                characters = None
+            else:
+                characters = re.compile('[\x00-\xff]*')
+        elif case == 'lc':
+            # Latin-1 characters that are not upper case letters.
+            characters = re.compile('[\x00-\x40\x5b-\xbf\xd7\xdf-\xff]*')
+        else:
+            # Latin-1 characters that are not lower case letters. Ordinal
+            # indicators are excluded because older Unicode versions
+            # classify these as lower case letters.
+            characters = re.compile('[\x00-\x60\x7b-\xa9\xab-\xb4\xb6-\xb9\xbb-\xde\xf7]*')
+
+        hard_pattern = None
+        if regexp is not None:
+            translated = translate_xsd_pattern(regexp)
+            if translated is None:
+                return None
+            hard_pattern = re.compile(translated)
+
+        def validator(value):
+            if value == '' or 0 < length < len(value):
+                return False
+            if characters is not None and characters.fullmatch(value) is None:
+                return False
+            return hard_pattern is None or hard_pattern.fullmatch(value) is not None
+
+        return validator
+
+    def _generate_validator_base64(self):
+        maximum = int(self.type.split(':')[1])
+        # Only accept the canonical lexical representation.
+        pattern = re.compile(
+            r'([A-Za-z0-9+/]{4})*([A-Za-z0-9+/]{2}[AEIMQUYcgkosw048]=|[A-Za-z0-9+/][AQgw]==)?'
+        )
+
+        def validator(value):
+            if pattern.fullmatch(value) is None:
+                return False
+            return 0 < len(value) // 4 * 3 - value.count('=') <= maximum
+
+        return validator
+
+    def _generate_validator_enum(self):
+        return frozenset(self.type.split(':')[1:]).__contains__
+
+    def generate_validator(self, regexp):
+        """
+
+        Returns a function that takes an object value as its sole argument and
+        returns True when it can establish that the value is valid according to
+        the RelaxNG schema generated by the generate_relaxng() method. A return
+        value of False means that the value may or may not be valid, which means
+        that it should be validated using the RelaxNG schema. For data types that
+        cannot be checked in this way, None is returned.
+
+        Args:
+          regexp (Optional[str]): Regular expression that string values must match
+
+        Returns:
+          Optional[Callable[[str], bool]]: The validator
+        """
+
+        data_type_family = self.get_family()
+
+        if data_type_family == 'datetime':
+            return self._generate_validator_datetime()
+        elif data_type_family == 'sequence':
+            return self._generate_validator_sequence()
+        elif data_type_family == 'number':
+            return self._generate_validator_number()
+        elif data_type_family in ('uri', 'file'):
+            return self._generate_validator_uri()
+        elif data_type_family in ('hex', 'uuid', 'ip', 'geo'):
+            # These schemas consist of a single pattern restriction.
+            return self._generate_validator_pattern(self.generate_relaxng(regexp).find('param').text)
+        elif data_type_family == 'string':
+            return self._generate_validator_string(regexp)
+        elif data_type_family == 'base64':
+            return self._generate_validator_base64()
+        elif data_type_family == 'boolean':
+            return frozenset(('true', 'false')).__contains__
+        elif data_type_family == 'enum':
+            return self._generate_validator_enum()
+        else:
+            raise TypeError('Unknown EDXML data type: "%s"' % self.type)
+
     def _normalize_datetime(self, values):
         normalized = set()
         for value in values:
             if isinstance(value, datetime):
                 normalized.add(self.format_utc_datetime(value))
             elif isinstance(value, str):
+                if self._DATETIME_NORMALIZED_PATTERN.fullmatch(value):
+                    # Value looks normalized already. If it is a valid
+                    # date and time, we can skip the expensive parsing.
+                    try:
+                        datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                                 int(value[11:13]), int(value[14:16]), int(value[17:19]))
+                    except ValueError:
+                        pass
+                    else:
+                        normalized.add(value)
+                        continue
                 try:
                     normalized.add(self.format_utc_datetime(parse(value)))
                 except Exception:
@@ -795,7 +1060,7 @@ class DataType(object):
         return normalized
 
     def _normalize_number(self, values):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         if split_data_type[1] == 'decimal':
             decimal_precision = split_data_type[3]
@@ -853,7 +1118,7 @@ class DataType(object):
             )
 
     def _normalize_ip(self, values):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
         normalized = set()
         for value in values:
             if not isinstance(value, IP):
@@ -872,7 +1137,7 @@ class DataType(object):
         return normalized
 
     def _normalize_geo(self, values):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
         if split_data_type[1] == 'point':
             try:
                 return {'%.6f,%.6f' % tuple(float(coord) for coord in value.split(',')) for value in values}
@@ -882,7 +1147,7 @@ class DataType(object):
                 )
 
     def _normalize_string(self, values):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         max_len = int(split_data_type[1])
 
@@ -943,32 +1208,109 @@ class DataType(object):
           Set[str]. The normalized object values
         """
 
-        split_data_type = self.type.split(':')
+        if self.__compiled_type != self.type:
+            self.__compile()
 
-        if split_data_type[0] == 'datetime':
-            return self._normalize_datetime(values)
-        elif split_data_type[0] == 'number':
-            return self._normalize_number(values)
-        elif split_data_type[0] == 'hex':
-            return self._normalize_hex(values)
-        elif split_data_type[0] == 'uri':
-            return self._normalize_uri(values)
-        elif split_data_type[0] == 'ip':
-            return self._normalize_ip(values)
-        elif split_data_type[0] == 'geo':
-            return self._normalize_geo(values)
-        elif split_data_type[0] == 'string':
-            return self._normalize_string(values)
-        elif split_data_type[0] == 'base64':
-            return self._normalize_base64(values)
-        elif split_data_type[0] == 'boolean':
-            return self._normalize_boolean(values)
-        else:
-            return {str(value) for value in values}
+        return self.__normalizer(self, values)
+
+    def normalize_values(self, values):
+        """Normalize a column of values to valid EDXML object value strings
+
+        Like normalize_objects(), but rather than returning a set of
+        normalized strings it returns a list containing the normalized
+        string for each of the input values, in the order of the input.
+        This allows normalizing the values of a property in many events
+        at once, assigning the normalized values back to the events
+        afterwards.
+
+        Each distinct input value is normalized only once. String values
+        that are accepted by the validator from generate_validator() are
+        known to be normalized already and are not modified, which means
+        that mostly values that actually need normalization are normalized.
+        Numbers and IP addresses are always normalized, because many valid
+        strings of these data types differ from their normalized form.
+
+        Args:
+          values (Iterable[Any]): The input object values
+
+        Raises:
+          EDXMLEventValidationError
+
+        Returns:
+          List[str]. The normalized object values
+        """
+
+        if self.__compiled_type != self.type:
+            self.__compile()
+
+        if self.__normalized_checker_type != self.type:
+            self.__normalized_checker = self.__generate_normalized_checker()
+            self.__normalized_checker_type = self.type
+
+        normalizer = self.__normalizer
+        checker = self.__normalized_checker
+        normalized = {}
+        result = []
+
+        for value in values:
+            # Note that the key includes the type of the value, because
+            # values like 1, 1.0 and True compare equal while their
+            # normalized strings may differ.
+            key = (type(value), value)
+            try:
+                result.append(normalized[key])
+                continue
+            except KeyError:
+                pass
+
+            normalized_value = None
+            if checker is not None and isinstance(value, str) and checker(value):
+                normalized_value = value
+
+            if normalized_value is None:
+                normalized_value = normalizer(self, (value,))
+                if not normalized_value:
+                    raise EDXMLEventValidationError(
+                        'Failed to normalize value for data type %s: %s' % (self.type, repr(value))
+                    )
+                normalized_value = next(iter(normalized_value))
+
+            normalized[key] = normalized_value
+            result.append(normalized_value)
+
+        return result
+
+    def __generate_normalized_checker(self):
+        """
+
+        Returns a function that returns True for object value strings
+        that are normalized already, or None in case this cannot be
+        checked. Values that are not normalized may be valid but differ
+        from their normalized form, like '01' for integers, '1.5' for
+        floating point numbers or '010.0.0.1' for IPv4 addresses. For
+        this reason, numbers and IP addresses are never checked. For
+        other data types, we use the strict validator from
+        generate_validator(), which only accepts values in the form
+        that the normalizers produce.
+
+        Returns:
+          Optional[Callable[[str], bool]]
+        """
+        if self.__split[0] in ('number', 'ip'):
+            return None
+
+        try:
+            return self.generate_validator(None)
+        except (TypeError, ValueError, IndexError):
+            # Invalid data type, which the normalizer must deal with.
+            return None
+
+    def _normalize_other(self, values):
+        return {str(value) for value in values}
 
     def _validate_value_datetime(self, value):
         if isinstance(value, str):
-            if not re.match(r'^' + self.DATETIME_PATTERN + '$', value):
+            if not self._DATETIME_VALUE_PATTERN.match(value):
                 raise EDXMLEventValidationError("Invalid value string for data type %s: '%s'." % (self.type, value))
         elif not isinstance(value, datetime):
             raise EDXMLEventValidationError(
@@ -994,7 +1336,7 @@ class DataType(object):
             )
 
     def _validate_value_number(self, value):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         if split_data_type[1] == 'decimal':
             if isinstance(value, str):
@@ -1127,7 +1469,7 @@ class DataType(object):
                 "Data type %s cannot be used to store values of type '%s'." % (self.type, type(value).__name__)
             )
 
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         if value.lower() != value:
             raise EDXMLEventValidationError(
@@ -1156,7 +1498,7 @@ class DataType(object):
             raise EDXMLEventValidationError(
                 "Data type %s cannot be used to store values of type '%s'." % (self.type, type(value).__name__)
             )
-        if not re.match(self.UUID_PATTERN, value):
+        if not self.UUID_PATTERN.match(value):
             raise EDXMLEventValidationError(
                 "Invalid value string for data type %s: '%s'. Must be all lowercase." % (self.type, value)
             )
@@ -1219,7 +1561,7 @@ class DataType(object):
                 "Data type %s cannot be used to store values of type '%s'." % (self.type, type(value).__name__)
             )
 
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         # Check length of object value
         max_string_length = int(split_data_type[1])
@@ -1259,7 +1601,7 @@ class DataType(object):
             )
 
     def _validate_value_base64(self, value):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
 
         try:
             decoded = base64.decodebytes(value.encode())
@@ -1284,7 +1626,7 @@ class DataType(object):
         # file values can be any string, nothing else to validate.
 
     def _validate_value_ip(self, value):
-        split_data_type = self.type.split(':')
+        split_data_type = self.__split
         if isinstance(value, str):
             try:
                 ip = IP(value)
@@ -1335,8 +1677,7 @@ class DataType(object):
             raise EDXMLEventValidationError(
                 "Data type %s cannot be used to store values of type '%s'." % (self.type, type(value).__name__)
             )
-        split_data_type = self.type.split(':')
-        if value not in split_data_type[1:]:
+        if value not in self.__enum_choices:
             raise EDXMLEventValidationError("Invalid value string for data type %s: '%s'" % (self.type, value))
 
     def validate_object_value(self, value):
@@ -1361,37 +1702,31 @@ class DataType(object):
                 "Value of %s object is empty. Empty object values are not valid and must be omitted." % self.type
             )
 
-        data_type_family = self.get_family()
+        if self.__compiled_type != self.type:
+            self.__compile()
 
-        if data_type_family == 'datetime':
-            self._validate_value_datetime(value)
-        elif data_type_family == 'sequence':
-            self._validate_value_sequence(value)
-        elif data_type_family == 'number':
-            self._validate_value_number(value)
-        elif data_type_family == 'hex':
-            self._validate_value_hex(value)
-        elif data_type_family == 'uuid':
-            self._validate_value_uuid(value)
-        elif data_type_family == 'geo':
-            self._validate_value_geo(value)
-        elif data_type_family == 'string':
-            self._validate_value_string(value)
-        elif data_type_family == 'uri':
-            self._validate_value_uri(value)
-        elif data_type_family == 'base64':
-            self._validate_value_base64(value)
-        elif data_type_family == 'file':
-            self._validate_value_file(value)
-        elif data_type_family == 'ip':
-            self._validate_value_ip(value)
-        elif data_type_family == 'boolean':
-            self._validate_value_boolean(value)
-        elif data_type_family == 'enum':
-            self._validate_value_enum(value)
+        if self.__value_validator is not None:
+            self.__value_validator(self, value)
 
         return self
 
+    def __compile(self):
+        """
+
+        Selects the methods for validating and normalizing object values
+        of this data type and prepares the information they need, like
+        the split data type. This is done only once rather than for each
+        object value. The data type is compiled again when it is changed.
+
+        """
+        self.__split = tuple(self.type.split(':'))
+        family = self.__split[0]
+        validator = self._VALUE_VALIDATORS.get(family)
+        self.__value_validator = getattr(type(self), validator) if validator else None
+        self.__normalizer = getattr(type(self), self._NORMALIZERS.get(family, '_normalize_other'))
+        self.__enum_choices = frozenset(self.__split[1:]) if family == 'enum' else None
+        self.__compiled_type = self.type
+
     def _validate_decimal(self):
         split_data_type = self.type.split(':')
 
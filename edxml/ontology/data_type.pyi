@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from lxml import etree
-from typing import List, Set, Iterable, Any
+from typing import List, Set, Iterable, Any, Callable, Optional, Dict, Tuple
 
 
 class DataType(object):
@@ -15,6 +15,8 @@ class DataType(object):
     UUID_PATTERN = ...
     # Expression used for matching valid EDXML datetime values
     DATETIME_PATTERN = ...
+    # Value ranges of integer data types, unsigned and signed
+    INTEGER_RANGES = ...  # type: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]]
 
     FAMILY_DATETIME = ...
     FAMILY_SEQUENCE = ...
@@ -141,6 +143,24 @@ class DataType(object):
 
     def generate_relaxng(self, regexp: str) -> etree.Element: ...
 
+    def _generate_validator_pattern(self, pattern: str) -> Optional[Callable[[str], bool]]: ...
+
+    def _generate_validator_datetime(self) -> Callable[[str], bool]: ...
+
+    def _generate_validator_sequence(self) -> Callable[[str], bool]: ...
+
+    def _generate_validator_number(self) -> Callable[[str], bool]: ...
+
+    def _generate_validator_uri(self) -> Callable[[str], bool]: ...
+
+    def _generate_validator_string(self, regexp: Optional[str]) -> Optional[Callable[[str], bool]]: ...
+
+    def _generate_validator_base64(self) -> Callable[[str], bool]: ...
+
+    def _generate_validator_enum(self) -> Callable[[str], bool]: ...
+
+    def generate_validator(self, regexp: Optional[str]) -> Optional[Callable[[str], bool]]: ...
+
     def _normalize_datetime(self, values: Iterable[Any]) -> Set: ...
 
     def _normalize_number(self, values: Iterable[Any]) -> Set: ...
@@ -161,6 +181,8 @@ class DataType(object):
 
     def normalize_objects(self, value: Iterable[Any]) -> List[str]: ...
 
+    def normalize_values(self, values: Iterable[Any]) -> List[str]: ...
+
     def validate_object_value(self, value) -> 'DataType': ...
 
     def _validate_value_datetime(self, value) -> None: ...
@@ -13,6 +13,9 @@
 
 import base64
 import binascii
+import codecs
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from typing import Dict # noqa
 
@@ -156,11 +159,14 @@ class EventType(VersionedOntologyElement, MutableMapping):
         self.__attachments = {}     # type: Dict[str, EventTypeAttachment]
         self.__relax_ng = None      # type: etree.RelaxNG
         self.__ontology = ontology  # type: edxml.ontology.Ontology
+        self.__change_count = 0
 
         self.__parent_description = None  # type: str
 
         self.__cached_is_timeless = None
         self.__cached_hash_properties = None
+        self.__cached_hash_prefixes = None
+        self.__cached_templates = {}
 
     def __delitem__(self, property_name):
         if property_name in self.__properties:
@@ -220,6 +226,9 @@ class EventType(VersionedOntologyElement, MutableMapping):
         """Callback for change tracking"""
         self.__cached_is_timeless = None
         self.__cached_hash_properties = None
+        self.__cached_hash_prefixes = None
+        self.__cached_templates = {}
+        self.__change_count += 1
         self.__ontology._child_modified_callback()
         return self
 
@@ -354,6 +363,76 @@ class EventType(VersionedOntologyElement, MutableMapping):
 
         return self.__cached_hash_properties
 
+    def compute_sticky_hashes(self, events, hash_function=hashlib.sha1, encoding='hex', threads=1):
+        """
+
+        Computes the sticky hashes of specified events, which must
+        all be of this event type. The result is identical to calling
+        the compute_sticky_hash() method of each of the events, but
+        computing the hashes of many events at once is more efficient.
+
+        The hashes can optionally be computed using multiple threads.
+        Note that this is only beneficial when events contain lots
+        of hashed object values. The hash functions from the hashlib
+        module only release the GIL for inputs exceeding 2kB.
+
+        Args:
+          events (Iterable[edxml.EDXMLEvent]): The events
+          hash_function (callable): The hashlib hash function to use
+          encoding (str): Desired output encoding
+          threads (int): Number of hashing threads
+
+        Returns:
+          List[str]: String representations of the hashes, in event order
+        """
+        if self.__cached_hash_prefixes is None:
+            self.__cached_hash_prefixes = {name: (name + ':').encode() for name in self.get_hashed_properties()}
+
+        prefixes = self.__cached_hash_prefixes
+        object_separator = b'\xff\xff\xff\xff'
+        headers = {}
+        hash_inputs = []
+
+        for event in events:
+            source_uri = event.get_source_uri()
+            try:
+                header = headers[source_uri]
+            except KeyError:
+                header = headers[source_uri] = b'%s\n%s\n' % (source_uri.encode(), event.get_type_name().encode())
+
+            object_strings = set()
+            if isinstance(event, etree.ElementBase):
+                # Parsed events are XML elements which always reflect the
+                # current event properties. Reading the object values from
+                # the XML directly avoids decoding the event properties.
+                for element in event.find('{http://edxml.org/edxml}properties'):
+                    prefix = prefixes.get(element.tag[24:])
+                    if prefix is not None:
+                        object_strings.add(prefix + str(element.text).encode())
+            else:
+                properties = event.get_properties()
+                for name, prefix in prefixes.items():
+                    if name in properties:
+                        object_strings.update(prefix + str(value).encode() for value in properties[name])
+
+            hash_inputs.append(header + object_separator.join(sorted(object_strings)))
+
+        if threads > 1 and len(hash_inputs) > threads:
+            chunk_size = -(-len(hash_inputs) // threads)
+            chunks = [hash_inputs[i:i + chunk_size] for i in range(0, len(hash_inputs), chunk_size)]
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                digests = [
+                    digest for chunk_digests in pool.map(
+                        lambda chunk: [hash_function(data).digest() for data in chunk], chunks
+                    ) for digest in chunk_digests
+                ]
+        else:
+            digests = [hash_function(data).digest() for data in hash_inputs]
+
+        if encoding == 'hex':
+            return [digest.hex() for digest in digests]
+        return [codecs.encode(digest, encoding).decode() for digest in digests]
+
     def get_property_relations(self, relation_type=None, source=None, target=None):
         """
 
@@ -489,6 +568,19 @@ class EventType(VersionedOntologyElement, MutableMapping):
 
         return self.__attr['version']
 
+    def get_change_count(self):
+        """
+
+        Returns the number of changes made to the event type since
+        it was instantiated. This is used for change tracking, it
+        is not related to the version of the definition itself.
+
+        Returns:
+          int:
+        """
+
+        return self.__change_count
+
     def create_property(self, name, object_type_name, description=None):
         """
 
@@ -969,10 +1061,36 @@ class EventType(VersionedOntologyElement, MutableMapping):
         Returns:
           str:
         """
-        return edxml.Template(self.__attr[which]).evaluate(
+        return self._get_template(which).evaluate(
             self, edxml_event.get_properties(), edxml_event.get_attachments(), capitalize, colorize
         )
 
+    def evaluate_templates(self, events, which='story', capitalize=True, colorize=False):
+        """
+
+        Evaluates the event story or summary template of an event type
+        for each of the specified events, which must all be of this
+        event type. This produces the same results as calling the
+        evaluate_template() method for each event, but more efficiently.
+
+        Args:
+          events (Iterable[edxml.EDXMLEvent]): The events
+          which (str): which template to evaluate
+          capitalize (bool): Capitalize output or not
+          colorize (bool): Colorize output or not
+
+        Returns:
+          List[str]: The evaluated templates, in the same order as the events
+        """
+        return self._get_template(which).evaluate_many(self, events, capitalize, colorize)
+
+    def _get_template(self, which):
+        if which not in self.__cached_templates:
+            # Templates parse themselves on first use. By caching them,
+            # the parsing is done only once for all events of this type.
+            self.__cached_templates[which] = edxml.Template(self.__attr[which])
+        return self.__cached_templates[which]
+
     def _validate_event_versioning(self):
         if self.__attr['event-version'] is None:
             # Nothing to do.
@@ -1554,6 +1672,77 @@ class EventType(VersionedOntologyElement, MutableMapping):
 
         return self
 
+    def normalize_events(self, events, property_names):
+        """
+
+        Normalizes the object values of specified properties in
+        a batch of events of this type. Rather than normalizing
+        the values event by event, the values of each property
+        are gathered from all events and normalized at once using
+        the normalize_values() method of the data type. Values that
+        occur in many events are normalized only once and string
+        values that are valid already are left untouched.
+
+        Unlike normalize_event_objects(), this method does not raise
+        an exception when a value cannot be normalized. Instead, the
+        objects of the offending property are left unmodified in the
+        events containing such values. Validating these events will
+        fail, leaving them to be repaired or rejected by the EDXML writer.
+
+        Args:
+          events (Iterable[edxml.EDXMLEvent]): Events of this type
+          property_names (List[str]): Properties to normalize
+
+        Raises:
+          EDXMLEventValidationError
+
+        Returns:
+          edxml.ontology.EventType: The EventType instance
+        """
+        events = list(events)
+
+        for property_name in property_names:
+            try:
+                data_type = self.__properties[property_name].get_object_type().get_data_type()
+            except KeyError:
+                raise EDXMLEventValidationError(
+                    "Event type '%s' has no property '%s'." % (self.get_name(), property_name)
+                )
+
+            # Gather the objects of all events into a single column.
+            object_sets = []
+            column = []
+            for event in events:
+                if property_name not in event:
+                    continue
+                objects = list(event[property_name])
+                object_sets.append((event, objects))
+                column.extend(objects)
+
+            if not column:
+                continue
+
+            try:
+                normalized = data_type.normalize_values(column)
+            except EDXMLEventValidationError:
+                # At least one value could not be normalized. We
+                # normalize the events one by one, skipping the
+                # events containing the offending values.
+                normalized = None
+
+            position = 0
+            for event, objects in object_sets:
+                if normalized is None:
+                    try:
+                        event[property_name] = data_type.normalize_values(objects)
+                    except EDXMLEventValidationError:
+                        pass
+                    continue
+                event[property_name] = normalized[position:position + len(objects)]
+                position += len(objects)
+
+        return self
+
     def generate_relax_ng(self, ontology, namespaced=True):
         """
 
@@ -1736,6 +1925,147 @@ class EventType(VersionedOntologyElement, MutableMapping):
         # convert the schema to a string and parse it back gain, all is good.
         return etree.parse(BytesIO(etree.tostring(etree.ElementTree(schema))))
 
+    def generate_validator(self, ontology, namespaced=True):
+        """
+
+        Returns a function that takes the XML element of an event of this
+        event type as its sole argument and returns True when it can establish
+        that the event is valid according to the RelaxNG schema generated by
+        the generate_relax_ng() method. Checking events using this function is
+        much faster than using the RelaxNG schema. When the function returns
+        False the event may or may not be valid, which means that the event
+        should be validated using the RelaxNG schema. This also yields the
+        details of any validation errors. In case any of the object types of
+        the properties does not support fast validation, None is returned.
+
+        Args:
+          ontology (Ontology): Ontology containing the event type
+          namespaced (bool): Require a namespace specification or not
+
+        Returns:
+          Optional[Callable[[lxml.etree.Element], bool]]: The validator
+        """
+        namespace = '{http://edxml.org/edxml}' if namespaced else ''
+
+        property_validators = {}
+        for property_name, event_property in self.__properties.items():
+            validator = ontology.get_object_type(event_property.get_object_type_name()).generate_validator()
+            if validator is None:
+                return None
+            property_validators[namespace + property_name] = validator
+
+        mandatory = [namespace + name for name in self.get_mandatory_property_names()]
+        singular = [namespace + name for name in self.get_singular_property_names()]
+
+        attachments = {}
+        for attachment_name, attachment in self.get_attachments().items():
+            attachments[namespace + attachment_name] = attachment.is_base64_string()
+
+        event_tag = namespace + 'event'
+        properties_tag = namespace + 'properties'
+        attachments_tag = namespace + 'attachments'
+
+        event_type_pattern = re.compile('[a-z0-9.-]{1,64}')
+        source_uri_pattern = re.compile('(/[a-z0-9-]+)*/')
+        parents_pattern = re.compile('[0-9a-f]{40}(,[0-9a-f]{40})*')
+        # Note that we cannot use len(), keys() or the list interface of
+        # the event element, because parsed events override these to behave
+        # like a dictionary of event properties. Properties that happen
+        # to be named 'event' are parsed events as well.
+        element_length = etree.ElementBase.__len__
+        element_child = etree.ElementBase.__getitem__
+        element_keys = etree.ElementBase.keys
+
+        base64_pattern = re.compile(
+            r'([A-Za-z0-9+/]{4})*([A-Za-z0-9+/]{2}[AEIMQUYcgkosw048]=|[A-Za-z0-9+/][AQgw]==)?'
+        )
+
+        def is_blank(text):
+            return text is None or text.strip(' \t\n\r') == ''
+
+        def validate_attributes(attributes):
+            if 'event-type' not in attributes or 'source-uri' not in attributes:
+                return False
+            for name, value in attributes.items():
+                if name == 'event-type':
+                    if event_type_pattern.fullmatch(value) is None:
+                        return False
+                elif name == 'source-uri':
+                    if source_uri_pattern.fullmatch(value) is None:
+                        return False
+                elif name == 'parents':
+                    if parents_pattern.fullmatch(value) is None:
+                        return False
+                elif name[0] != '{' or name.startswith('{http://edxml.org/edxml}'):
+                    return False
+            return True
+
+        def validate_properties(properties_element):
+            if element_keys(properties_element) or not is_blank(properties_element.text):
+                return False
+
+            counts = defaultdict(int)
+            for element in properties_element:
+                validator = property_validators.get(element.tag)
+                if validator is None or element_keys(element) or element_length(element) > 0:
+                    return False
+                if not is_blank(element.tail):
+                    return False
+                text = element.text
+                if text is None or not validator(text):
+                    return False
+                counts[element.tag] += 1
+
+            for tag in mandatory:
+                if counts[tag] == 0:
+                    return False
+            for tag in singular:
+                if counts[tag] > 1:
+                    return False
+            return True
+
+        def validate_attachments(attachments_element):
+            if element_keys(attachments_element) or not is_blank(attachments_element.text):
+                return False
+
+            for element in attachments_element:
+                is_base64 = attachments.get(element.tag)
+                if is_base64 is None or element_length(element) > 0 or not is_blank(element.tail):
+                    return False
+                if element_keys(element) != ['id'] or not 0 < len(element.get('id')) <= 40:
+                    return False
+                value = element.text
+                if value is None:
+                    return False
+                if is_base64:
+                    if base64_pattern.fullmatch(value) is None or len(value) // 4 * 3 - value.count('=') < 4:
+                        return False
+            return True
+
+        def validate_event(event_element):
+            if event_element.tag != event_tag or not is_blank(event_element.text):
+                return False
+            if not validate_attributes(event_element.attrib):
+                return False
+
+            num_children = element_length(event_element)
+            if num_children == 0 or num_children > 2:
+                return False
+            properties_element = element_child(event_element, 0)
+            if properties_element.tag != properties_tag or not is_blank(properties_element.tail):
+                return False
+            if not validate_properties(properties_element):
+                return False
+            if num_children == 2:
+                attachments_element = element_child(event_element, 1)
+                if attachments_element.tag != attachments_tag or not is_blank(attachments_element.tail):
+                    return False
+                if not validate_attachments(attachments_element):
+                    return False
+            return True
+
+        return validate_event
+
     def merge_events(self, events):
         """
 
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import hashlib
+
 import edxml
 
-from typing import List, Dict, Iterable, Tuple, Optional
+from typing import List, Dict, Iterable, Tuple, Optional, Callable
 
 from edxml import EDXMLEvent
 from lxml import etree
@@ -58,6 +60,9 @@ class EventType(OntologyElement):
 
     def get_hashed_properties(self) -> Dict[str, edxml.ontology.EventProperty]: ...
 
+    def compute_sticky_hashes(self, events: Iterable[edxml.EDXMLEvent], hash_function: callable = hashlib.sha1,
+                              encoding: str = 'hex', threads: int = 1) -> List[str]: ...
+
     def get_property_relations(self, relation_type: str=None, source:str=None, target:str=None) -> \
             Dict[str, edxml.ontology.PropertyRelation]: ...
 
@@ -67,6 +72,8 @@ class EventType(OntologyElement):
 
     def get_version(self) -> int: ...
 
+    def get_change_count(self) -> int: ...
+
     def get_timespan_property_names(self) -> Tuple[Optional[str], Optional[str]]: ...
 
     def is_timeless(self) -> bool: ...
@@ -130,6 +137,12 @@ class EventType(OntologyElement):
             self, edxml_event: EDXMLEvent, which: str = 'story', capitalize: bool = True, colorize: bool = False
     ) -> str: ...
 
+    def evaluate_templates(
+            self, events: Iterable[EDXMLEvent], which: str = 'story', capitalize: bool = True, colorize: bool = False
+    ) -> List[str]: ...
+
+    def _get_template(self, which: str) -> edxml.Template: ...
+
     def _validate_event_versioning(self) -> None: ...
 
     def _validate_event_sequencing(self) -> None: ...
@@ -161,8 +174,13 @@ class EventType(OntologyElement):
 
     def normalize_event_objects(self, event: edxml.EDXMLEvent, property_names: List[str]) -> 'EventType': ...
 
+    def normalize_events(self, events: Iterable[edxml.EDXMLEvent], property_names: List[str]) -> 'EventType': ...
+
     def generate_relax_ng(self, ontology: edxml.ontology.Ontology, namespaced: bool=False) -> etree.ElementTree: ...
 
+    def generate_validator(self, ontology: edxml.ontology.Ontology,
+                           namespaced: bool = True) -> Optional[Callable[[etree.Element], bool]]: ...
+
     def merge_events(self, events: List[edxml.EDXMLEvent]) -> edxml.EDXMLEvent: ...
 
     def _check_merge_conflict(self, events: List[edxml.EDXMLEvent], version_property: str) -> None: ...
@@ -60,12 +60,15 @@ class ObjectType(VersionedOntologyElement):
         }
 
         self.__ontology = ontology  # type: edxml.ontology.Ontology
+        self.__change_count = 0
+        self.__cached_data_type = None
 
         self.__versions = {1: copy.copy(self)}
 
     def __copy__(self):
         new = self.__new__(ObjectType)
         new.__attr = self.__attr.copy()
+        new.__cached_data_type = None
         return new
 
     def __repr__(self):
@@ -76,6 +79,7 @@ class ObjectType(VersionedOntologyElement):
 
     def _child_modified_callback(self):
         """Callback for change tracking"""
+        self.__change_count += 1
         self.__ontology._child_modified_callback()
         return self
 
@@ -136,8 +140,11 @@ class ObjectType(VersionedOntologyElement):
         Returns:
           edxml.ontology.DataType: The data type
         """
-
-        return DataType(self.__attr['data-type'])
+        # We cache the data type, allowing it to reuse the validators
+        # and normalizers that it compiles for validating object values.
+        if self.__cached_data_type is None or self.__cached_data_type.type != self.__attr['data-type']:
+            self.__cached_data_type = DataType(self.__attr['data-type'])
+        return self.__cached_data_type
 
     def get_unit_name(self):
         """
@@ -260,6 +267,19 @@ class ObjectType(VersionedOntologyElement):
 
         return self.__attr['version']
 
+    def get_change_count(self):
+        """
+
+        Returns the number of changes made to the object type since
+        it was instantiated. This is used for change tracking, it
+        is not related to the version of the definition itself.
+
+        Returns:
+          int:
+        """
+
+        return self.__change_count
+
     def set_description(self, description):
         """
 
@@ -515,6 +535,20 @@ class ObjectType(VersionedOntologyElement):
 
         return DataType(self.__attr['data-type']).generate_relaxng(self.__attr['regex-hard'])
 
+    def generate_validator(self):
+        """
+
+        Returns a function for quickly checking the validity of object values
+        of this object type, or None in case the data type of the object
+        type does not support it. Refer to DataType.generate_validator()
+        for details.
+
+        Returns:
+          Optional[Callable[[str], bool]]: The validator
+        """
+
+        return DataType(self.__attr['data-type']).generate_validator(self.__attr['regex-hard'])
+
     def validate_object_value(self, value):
         """
 
@@ -3,7 +3,7 @@
 import edxml
 
 from lxml import etree
-from typing import Any, Optional
+from typing import Any, Optional, Callable
 from typing import Dict
 
 from edxml.ontology import OntologyElement
@@ -55,6 +55,8 @@ class ObjectType(OntologyElement):
 
     def get_version(self) -> int: ...
 
+    def get_change_count(self) -> int: ...
+
     def set_description(self, description: str) -> 'ObjectType': ...
 
     def set_data_type(self, data_type: edxml.ontology.DataType) -> 'ObjectType': ...
@@ -89,6 +91,8 @@ class ObjectType(OntologyElement):
 
     def generate_relaxng(self) -> etree.Element: ...
 
+    def generate_validator(self) -> Optional[Callable[[str], bool]]: ...
+
     def validate_object_value(self, value: str) -> 'ObjectType': ...
 
     def validate(self) -> 'ObjectType': ...
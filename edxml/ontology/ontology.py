@@ -11,7 +11,7 @@
 #                                                                                        =
 # ========================================================================================
 
-from typing import Dict # noqa
+from typing import Callable, Dict, List # noqa
 
 from lxml import etree
 from edxml.error import EDXMLOntologyValidationError
@@ -34,6 +34,7 @@ class Ontology(OntologyElement):
 
     def __init__(self):
         self.__version = 0
+        self.__modification_callbacks = []  # type: List[Callable[[], None]]
         self.__event_types = {}    # type: Dict[str, EventType]
         self.__object_types = {}   # type: Dict[str, ObjectType]
         self.__sources = {}        # type: Dict[str, EventSource]
@@ -46,6 +47,13 @@ class Ontology(OntologyElement):
     def __str__(self):
         return 'ontology'
 
+    def __getstate__(self):
+        # Modification callbacks belong to the original
+        # ontology, copies must not invoke them.
+        state = self.__dict__.copy()
+        state['_Ontology__modification_callbacks'] = []
+        return state
+
     def clear(self):
         """
 
@@ -61,6 +69,9 @@ class Ontology(OntologyElement):
         self.__sources = {}
         self.__concepts = {}
 
+        for callback in self.__modification_callbacks:
+            callback()
+
         return self
 
     def get_version(self):
@@ -94,6 +105,25 @@ class Ontology(OntologyElement):
         """
         return self.__version > version
 
+    def add_modification_callback(self, callback):
+        """
+
+        Registers a callback that is invoked each time the
+        ontology is modified. This allows keeping track of
+        changes without having to check the ontology version
+        over and over again. The callback is invoked without
+        arguments. Note that copies of the ontology do not
+        inherit the callbacks of the original.
+
+        Args:
+          callback (Callable[[], None]): The callback
+
+        Returns:
+          edxml.ontology.Ontology: The ontology
+        """
+        self.__modification_callbacks.append(callback)
+        return self
+
     @classmethod
     def register_brick(cls, brick):
         """
@@ -382,6 +412,8 @@ class Ontology(OntologyElement):
     def _child_modified_callback(self):
         """Callback for change tracking"""
         self.__version += 1
+        for callback in self.__modification_callbacks:
+            callback()
         return self
 
     def _add_event_type(self, event_type, validate=True):
@@ -16,3 +16,133 @@ import re
 
 def normalize_xml_token(token):
     return re.sub(r'[^\S]', ' ', token).replace('  ', ' ').strip()
+
+
+# Characters that have a special meaning in XML Schema regular expressions
+# and may be escaped to obtain their literal meaning.
+_XSD_ESCAPABLE = set('\\|.-^?*+{}()[]')
+
+
+def _xsd_class_escape(char):
+    return '\\U%08x' % ord(char)
+
+
+def translate_xsd_pattern(pattern):
+    """
+
+    Translates a regular expression in XML Schema syntax, as used in
+    the pattern facets of RelaxNG schemas, into a Python regular expression.
+    The translation is conservative: any string that fully matches the
+    resulting expression also matches the XML Schema pattern, but some
+    strings that match the XML Schema pattern may not match the Python
+    expression. For instance, \\d is translated into [0-9] rather than
+    into the full set of Unicode digits. Returns None for patterns using
+    constructs that cannot be translated in this way.
+
+    Args:
+        pattern (str): XML Schema regular expression
+
+    Returns:
+        Optional[str]: Python regular expression
+    """
+    translated = []
+    position = 0
+    quantifiable = False
+
+    while position < len(pattern):
+        char = pattern[position]
+        position += 1
+
+        if char == '\\':
+            if position == len(pattern):
+                return None
+            escaped = pattern[position]
+            position += 1
+            if escaped in _XSD_ESCAPABLE:
+                translated.append(re.escape(escaped))
+            elif escaped in 'nrt':
+                translated.append('\\' + escaped)
+            elif escaped == 'd':
+                translated.append('[0-9]')
+            elif escaped == 's':
+                translated.append('[ \\t\\n\\r]')
+            else:
+                return None
+            quantifiable = True
+        elif char == '[':
+            end = position
+            negated = pattern[end:end + 1] == '^'
+            if negated:
+                end += 1
+            items = []
+            while end < len(pattern) and (pattern[end] != ']' or end == position + negated):
+                if pattern[end] == '[':
+                    return None
+                if pattern[end] == '\\':
+                    escaped = pattern[end + 1:end + 2]
+                    if escaped in _XSD_ESCAPABLE:
+                        items.append(_xsd_class_escape(escaped))
+                    elif escaped in ('n', 'r', 't'):
+                        items.append(_xsd_class_escape({'n': '\n', 'r': '\r', 't': '\t'}[escaped]))
+                    elif escaped == 'd' and not negated:
+                        items.append('0-9')
+                    elif escaped == 's' and not negated:
+                        items.append('\\t\\n\\r ')
+                    else:
+                        return None
+                    end += 2
+                elif pattern[end] == '-' and items and pattern[end + 1:end + 2] not in ('', ']'):
+                    if pattern[end + 1] in '[\\':
+                        # Class subtraction or an escaped range end.
+                        return None
+                    if len(items[-1]) != 10:
+                        # Range start is not a single character.
+                        return None
+                    items.append('-' + _xsd_class_escape(pattern[end + 1]))
+                    end += 2
+                else:
+                    items.append(_xsd_class_escape(pattern[end]))
+                    end += 1
+            if end == len(pattern) or not items:
+                return None
+            translated.append('[' + ('^' if negated else '') + ''.join(items) + ']')
+            position = end + 1
+            quantifiable = True
+        elif char == '.':
+            translated.append('[^\\n\\r]')
+            quantifiable = True
+        elif char in '*+?':
+            if not quantifiable:
+                return None
+            translated.append(char)
+            quantifiable = False
+        elif char == '{':
+            end = pattern.find('}', position)
+            if not quantifiable or end == -1 or not re.fullmatch('[0-9]+(,[0-9]*)?', pattern[position:end]):
+                return None
+            translated.append(pattern[position - 1:end + 1])
+            position = end + 1
+            quantifiable = False
+        elif char == '(':
+            if pattern[position:position + 1] == '?':
+                return None
+            translated.append(char)
+            quantifiable = False
+        elif char == ')':
+            translated.append(char)
+            quantifiable = True
+        elif char == '|':
+            translated.append(char)
+            quantifiable = False
+        else:
+            translated.append(re.escape(char))
+            quantifiable = True
+
+    translated = ''.join(translated)
+
+    try:
+        re.compile(translated)
+    except re.error:
+        return None
+
+    return translated
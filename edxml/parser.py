@@ -15,13 +15,16 @@
 This module offers various classes for incremental parsing of EDXML data streams.
 """
 import copy
+import os
 import re
 import edxml_schema
 
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
 from lxml.etree import XMLSyntaxError
 from typing import Dict, List, Any # noqa
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from lxml import etree
 
 from edxml.error import EDXMLValidationError, EDXMLEventValidationError, EDXMLOntologyValidationError
@@ -30,6 +33,49 @@ from edxml.event_validator import EventValidator
 from edxml.ontology import Ontology
 
 
+def _validate_event(validator, event):
+    if not validator.is_valid(event):
+        raise EDXMLEventValidationError(
+            'Event failed to validate:\n\n%s\nDetails:\n%s' % (
+                etree.tostring(event, pretty_print=True, encoding='unicode'),
+                validator.get_last_error().exception.args[0])
+        )
+
+
+# Event validators that worker processes of the parallel pull
+# parser keep around, keyed by ontology revision.
+_worker_validators = {}  # type: Dict[int, EventValidator]
+
+
+def _validate_event_chunk(ontology_revision, ontology_data, event_data):
+    # Runs in a worker process of the parallel pull parser. It validates a
+    # chunk of serialized events and returns None when all events are valid.
+    # Otherwise it returns the position of the first invalid event in the
+    # chunk and the validation error message.
+    validator = _worker_validators.get(ontology_revision)
+    if validator is None:
+        ontology = Ontology()
+        ontology.update(etree.fromstring(ontology_data).find('{http://edxml.org/edxml}ontology'), validate=False)
+        # The ontology only grows while parsing, so older
+        # validators will not be needed anymore.
+        _worker_validators.clear()
+        _worker_validators[ontology_revision] = validator = EventValidator(ontology)
+
+    lookup = etree.ElementNamespaceClassLookup()
+    lookup.get_namespace('http://edxml.org/edxml')['event'] = ParsedEvent
+    parser = etree.XMLParser(**EDXMLParserBase._LXML_PARSER_OPTIONS)
+    parser.set_element_class_lookup(lookup)
+
+    for position, event_string in enumerate(event_data):
+        event = etree.fromstring(event_string, parser)
+        try:
+            _validate_event(validator, event)
+        except EDXMLEventValidationError as error:
+            return position, error.args[0]
+
+    return None
+
+
 def _get_relevant_parser_events(foreign_element_tags):
     # Note that the EDXML tags that we want to visit while parsing all have
     # an end tag, visiting the start tag is not needed. This may not be the
@@ -75,6 +121,7 @@ class EDXMLParserBase(object):
         self.__root_element = None            # type: etree.Element
         self.__parsing = False                 # type: bool
         self.__num_parsed_events = 0           # type: int
+        self.__num_visited_events = 0          # type: int
         self.__num_parsed_event_types = {}      # type: Dict[str, int]
         self.__event_type_handlers = {}        # type: Dict[str, callable]
         self.__event_source_handlers = {}      # type: Dict[str, callable]
@@ -391,6 +438,7 @@ class EDXMLParserBase(object):
                     raise EDXMLValidationError("Found an <event> element while no <ontology> has been read yet.")
 
                 self.__parse_event(elem)
+                self.__num_visited_events += 1
 
                 # The first child of the root is always an <ontology> element. We do not
                 # clean that one, because that would render our EDXML tree structure invalid.
@@ -398,7 +446,7 @@ class EDXMLParserBase(object):
                 # child of the root element. However, deleting the element that we are
                 # currently processing can lead to crashes in lxml. So, we only delete
                 # the second event, which is the third child of the root.
-                if self.__num_parsed_events > 1:
+                if self.__num_visited_events > 1:
                     # Note that deleting the element here while there are still
                     # references to it elsewhere orphans the element from the tree.
                     # this causes lxml to copy the namespace that it inherits from
@@ -415,6 +463,10 @@ class EDXMLParserBase(object):
                     self._check_element_is_event_property(elem)
                     continue
 
+                # Any events that precede the ontology element must
+                # be fully processed before the ontology is updated.
+                self._finish_pending_events()
+
                 # Before parsing the ontology information, we validate
                 # the generic structure of the ontology element, using
                 # the RelaxNG schema.
@@ -452,6 +504,7 @@ class EDXMLParserBase(object):
 
     def _init(self):
         self.__num_parsed_events = 0
+        self.__num_visited_events = 0
         self.__root_element = None
         self.__parsed_initial_ontology = False
         self.__previous_event = None
@@ -521,23 +574,56 @@ class EDXMLParserBase(object):
                 "An input event refers to event type %s, which is not defined." % event_type_name
             )
 
+        self._process_event(event)
+
+    def _process_event(self, event):
+        """
+
+        Validates the event and passes it to its handlers. Parsers
+        that defer validation, like the parallel pull parser, override
+        this method.
+
+        Args:
+          event (edxml.ParsedEvent): The parsed event
+
+        """
         if self.__validate:
             if self.__validator is None:
                 self.__validator = EventValidator(self._ontology)
-            if not self.__validator.is_valid(event):
-                raise EDXMLEventValidationError(
-                    'Event failed to validate:\n\n%s\nDetails:\n%s' % (
-                        etree.tostring(event, pretty_print=True, encoding='unicode'),
-                        self.__validator.get_last_error().exception.args[0])
-                )
+            _validate_event(self.__validator, event)
+
+        self._dispatch_event(event)
+
+    def _dispatch_event(self, event):
+        """
+
+        Invokes the handlers of a parsed event, which must have been
+        validated already, and updates the event counters.
+
+        Args:
+          event (edxml.ParsedEvent): The parsed event
+
+        """
+        event_type_name = event.get_type_name()
 
         # Call all event handlers in order
-        for handler in self._get_event_handlers(event_type_name, event_source_uri):
+        for handler in self._get_event_handlers(event_type_name, event.get_source_uri()):
             handler(event)
 
         self.__num_parsed_events += 1
         self.__num_parsed_event_types[event_type_name] += 1
 
+    def _finish_pending_events(self):
+        """
+
+        Callback that is invoked when the parser needs all events
+        parsed so far to be validated and passed to their handlers,
+        for instance because the ontology is about to be updated.
+        Parsers that process events immediately have nothing to do here.
+
+        """
+        pass
+
     def _parsed_event(self, event):
         """
 
@@ -632,6 +718,188 @@ class EDXMLPullParser(EDXMLParserBase):
         return self
 
 
+class EDXMLParallelPullParser(EDXMLPullParser):
+    """
+
+    A variant of the pull parser that distributes the validation of
+    events over a pool of worker processes. The parser reads the input
+    and collects the parsed events into chunks. The events in each chunk
+    are serialized and validated by the workers, each of which holds a
+    copy of the ontology that was parsed from the preceding ontology
+    elements.
+
+    Note that only validation runs in parallel. The parser process still
+    parses every event, serializes it for the workers and invokes the
+    event handlers. The workers parse the serialized events again in
+    order to validate them. This is inherent to the design: the event
+    handlers run in the parser process, which needs the parsed events
+    for that. As a result, the time spent by the parser process bounds
+    the speedup. For simple events, parsing and serializing takes over
+    half the time of parsing and validating them using a regular pull
+    parser, limiting the speedup to well below 2x regardless of the
+    number of workers. On a single CPU core, the parallel parser is
+    slower than the regular pull parser. The parallel parser pays off
+    for event types that are expensive to validate.
+
+    By default, events are passed to the event handlers in the order
+    in which they appear in the input. When the ordered parameter is
+    set to False, chunks of events are passed to the handlers as soon
+    as they are validated, which is faster but does not preserve the
+    order of events. Either way, the event handlers are invoked from
+    the process that runs the parser.
+
+    Note:
+      Since events are passed to their handlers some time after they
+      have been parsed, foreign elements may be passed to the
+      _parsed_foreign_element() callback before events that precede
+      them in the input. Also note that events are detached from
+      the XML tree of the input by the time they reach their handlers.
+
+    Note:
+      This class extends EDXMLPullParser, refer to that
+      class for more details about the EDXML parsing interface.
+
+    Args:
+      validate (bool, optional): Validate input or not
+      workers (int, optional): Number of worker processes, defaults to the number of CPUs
+      chunk_size (int, optional): Number of events per chunk
+      ordered (bool, optional): Preserve event order or not
+
+    """
+
+    def __init__(self, validate=True, workers=None, chunk_size=1000, ordered=True):
+        super().__init__(validate)
+        self.__validate = validate
+        self.__workers = workers or os.cpu_count() or 1
+        self.__chunk_size = chunk_size
+        self.__ordered = ordered
+        self.__pool = None                # type: ProcessPoolExecutor
+        self.__chunk = []                 # type: List[ParsedEvent]
+        self.__chunk_data = []            # type: List[bytes]
+        self.__pending = deque()          # type: deque
+        self.__ontology_data = None       # type: bytes
+        self.__ontology_revision = 0      # type: int
+
+    def parse(self, input_file, foreign_element_tags=()):
+        """
+
+        Parses the specified file, distributing event validation over
+        the worker processes. Refer to EDXMLPullParser for details.
+
+        Args:
+          input_file (Union[io.TextIOBase, file, str]):
+          foreign_element_tags (List[str])
+
+        Returns:
+            edxml.EDXMLParallelPullParser
+
+        """
+        self.__ontology_data = None
+        self.__chunk, self.__chunk_data = [], []
+        self.__pending = deque()
+
+        if self.__validate and self.__pool is None:
+            self.__pool = ProcessPoolExecutor(max_workers=self.__workers)
+
+        try:
+            super().parse(input_file, foreign_element_tags)
+            self._finish_pending_events()
+        except BaseException:
+            # Discard any events that are still in flight.
+            for future, _ in self.__pending:
+                future.cancel()
+            self.__pending.clear()
+            self.__chunk, self.__chunk_data = [], []
+            raise
+
+        return self
+
+    def _close(self):
+        if self.__pool is not None:
+            # Cancel any chunks that the workers did not start validating.
+            for future, _ in self.__pending:
+                future.cancel()
+            self.__pending.clear()
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+        return super()._close()
+
+    def _parsed_ontology(self, ontology):
+        super()._parsed_ontology(ontology)
+        # The workers receive a copy of the ontology along with each
+        # chunk. We serialize it once for each ontology update.
+        self.__ontology_data = None
+
+    def _process_event(self, event):
+        if not self.__validate:
+            self._dispatch_event(event)
+            return
+
+        # Note that we serialize the event while it is still part of
+        # the input tree. Once detached, the event would be serialized
+        # using explicit namespace prefixes.
+        self.__chunk.append(event)
+        self.__chunk_data.append(etree.tostring(event))
+        if len(self.__chunk) >= self.__chunk_size:
+            self.__submit_chunk()
+
+    def _finish_pending_events(self):
+        if self.__chunk:
+            self.__submit_chunk()
+        while self.__pending:
+            self.__complete_chunks(block=True)
+
+    def __get_ontology_data(self):
+        if self.__ontology_data is None:
+            root = etree.Element('edxml', nsmap={None: 'http://edxml.org/edxml'})
+            root.append(self._ontology.generate_xml())
+            self.__ontology_data = etree.tostring(root)
+            self.__ontology_revision += 1
+        return self.__ontology_data
+
+    def __submit_chunk(self):
+        events, event_data = self.__chunk, self.__chunk_data
+        self.__chunk, self.__chunk_data = [], []
+
+        ontology_data = self.__get_ontology_data()
+        future = self.__pool.submit(_validate_event_chunk, self.__ontology_revision, ontology_data, event_data)
+        self.__pending.append((future, events))
+
+        # Limit the number of chunks in flight in order
+        # to bound the memory usage of the parser.
+        while len(self.__pending) > 2 * self.__workers:
+            self.__complete_chunks(block=True)
+
+        # Pass any chunks that are done to their handlers
+        # without waiting for the others.
+        self.__complete_chunks(block=False)
+
+    def __complete_chunks(self, block):
+        if self.__ordered:
+            while self.__pending and (block or self.__pending[0][0].done()):
+                future, events = self.__pending.popleft()
+                self.__dispatch_chunk(future.result(), events)
+                block = False
+        else:
+            done, _ = wait([future for future, _ in self.__pending], timeout=None if block else 0,
+                           return_when=FIRST_COMPLETED)
+            completed = [(future, events) for future, events in self.__pending if future in done]
+            self.__pending = deque((future, events) for future, events in self.__pending if future not in done)
+            for future, events in completed:
+                self.__dispatch_chunk(future.result(), events)
+
+    def __dispatch_chunk(self, error, events):
+        if error is not None:
+            position, message = error
+            events = events[:position]
+
+        for event in events:
+            self._dispatch_event(event)
+
+        if error is not None:
+            raise EDXMLEventValidationError(message)
+
+
 class EDXMLPushParser(EDXMLParserBase):
     """
 
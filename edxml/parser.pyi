@@ -4,8 +4,9 @@ from edxml.event import ParsedEvent
 from edxml.event_validator import EventValidator
 from edxml.ontology import Ontology
 
+from concurrent.futures import Future, ProcessPoolExecutor
 from lxml import etree
-from typing import Union, List, Type, BinaryIO
+from typing import Union, List, Type, BinaryIO, Optional, Tuple, Deque
 
 
 class ProcessingInterrupted(Exception):
@@ -29,6 +30,7 @@ class EDXMLParserBase(object):
         self.__parsing = ...
         self.__parsed_initial_ontology = ...
         self.__num_parsed_events = ...
+        self.__num_visited_events = ...
         self.__num_parsed_event_types = ...
         self.__event_type_handlers = ...
         self.__event_source_handlers = ...
@@ -68,6 +70,12 @@ class EDXMLParserBase(object):
 
     def __parse_event(self, event: ParsedEvent) -> None: ...
 
+    def _process_event(self, event: ParsedEvent) -> None: ...
+
+    def _dispatch_event(self, event: ParsedEvent) -> None: ...
+
+    def _finish_pending_events(self) -> None: ...
+
     def _init(self) -> None: ...
 
     def _check_element_is_event_property(self, elem: etree.Element) -> None: ...
@@ -84,6 +92,34 @@ class EDXMLPullParser(EDXMLParserBase):
               foreign_element_tags: List[str]=()) -> 'EDXMLPullParser': ...
 
 
+class EDXMLParallelPullParser(EDXMLPullParser):
+
+    def __init__(self, validate: bool = True, workers: Optional[int] = None, chunk_size: int = 1000,
+                 ordered: bool = True) -> None:
+        super().__init__(validate)
+        self.__validate = ...  # type: bool
+        self.__workers = ...  # type: int
+        self.__chunk_size = ...  # type: int
+        self.__ordered = ...  # type: bool
+        self.__pool = ...  # type: Optional[ProcessPoolExecutor]
+        self.__chunk = ...  # type: List[ParsedEvent]
+        self.__chunk_data = ...  # type: List[bytes]
+        self.__pending = ...  # type: Deque[Tuple[Future, List[ParsedEvent]]]
+        self.__ontology_data = ...  # type: Optional[bytes]
+        self.__ontology_revision = ...  # type: int
+
+    def parse(self, input_file: Union[BinaryIO, str],
+              foreign_element_tags: List[str]=()) -> 'EDXMLParallelPullParser': ...
+
+    def __get_ontology_data(self) -> bytes: ...
+
+    def __submit_chunk(self) -> None: ...
+
+    def __complete_chunks(self, block: bool) -> None: ...
+
+    def __dispatch_chunk(self, error: Optional[Tuple[int, str]], events: List[ParsedEvent]) -> None: ...
+
+
 class EDXMLPushParser(EDXMLParserBase):
 
     def __init__(self, validate: bool = True) -> None:
@@ -12,6 +12,7 @@
 # ========================================================================================
 
 import re
+from functools import lru_cache
 from typing import Dict # noqa
 
 import edxml # noqa
@@ -59,8 +60,42 @@ class Template(object):
         'url': 2
     }
 
+    DEFAULT_VALUE_CACHE_SIZE = 10000
+
     def __init__(self, template):
         self._template = template
+        self._compiled = None
+
+    @classmethod
+    def set_value_cache_size(cls, max_size):
+        """
+
+        Sets the maximum number of formatted object values that is cached
+        while evaluating templates. Formatting object values like date / time
+        values and geographical locations is relatively expensive. When the
+        same values occur in many events, caching the formatted values greatly
+        speeds up template evaluation. The cache is shared by all templates.
+        Setting the cache size discards any cached values. Setting the size
+        to zero disables caching, None makes the cache size unbounded.
+
+        Args:
+          max_size (Optional[int]): Maximum cache size
+
+        """
+        cls._format_value_cached = staticmethod(lru_cache(maxsize=max_size)(cls._format_value))
+
+    @classmethod
+    def get_value_cache_info(cls):
+        """
+
+        Returns statistics of the cache of formatted object values, as a
+        named tuple containing the number of cache hits, misses, the
+        maximum size of the cache and its current size.
+
+        Returns:
+          functools._CacheInfo
+        """
+        return cls._format_value_cached.cache_info()
 
     def validate(self, event_type, property_names=None):
         """
@@ -187,14 +222,143 @@ class Template(object):
         Returns:
           str:
         """
+        return self._evaluate(
+            self._get_property_data_types(event_type), event_properties, event_attachments,
+            capitalize, colorize, ignore_value_errors
+        )
+
+    def evaluate_many(self, event_type, events, capitalize=True, colorize=False, ignore_value_errors=False):
+        """
+
+        Evaluates the EDXML template for each of the specified events, which
+        must all be of the specified event type. This produces the same results
+        as evaluating the template for each event individually using the evaluate()
+        method, but it is more efficient because information about the event type
+        that is needed for rendering is looked up only once.
+
+        Args:
+          event_type (edxml.ontology.EventType): the event type of the events
+          events (Iterable[edxml.EDXMLEvent]): the events
+          capitalize (bool): Capitalize evaluated template yes or no
+          colorize (bool): Colorize output or not
+          ignore_value_errors (bool): Ignore object value errors yes or no
+
+        Returns:
+          List[str]: The evaluated templates, in the same order as the events
+        """
+        property_data_types = self._get_property_data_types(event_type)
+        return [
+            self._evaluate(
+                property_data_types, event.get_properties(), event.get_attachments(),
+                capitalize, colorize, ignore_value_errors
+            )
+            for event in events
+        ]
+
+    def _evaluate(self, property_data_types, event_properties, event_attachments,
+                  capitalize, colorize, ignore_value_errors):
+        event_properties = self._normalize_float_values(property_data_types, event_properties, ignore_value_errors)
 
         evaluated = self._process_split_template(
-            self._split_template(self._template)[1], event_type, event_properties,
+            self._get_compiled(), property_data_types, event_properties,
             event_attachments, colorize, ignore_value_errors
         )
 
         return self._capitalize(evaluated) if capitalize else evaluated
 
+    @staticmethod
+    def _get_property_data_types(event_type):
+        """
+
+        Returns a dictionary mapping the names of the properties
+        of specified event type to their data types.
+
+        Args:
+            event_type (edxml.ontology.EventType):
+
+        Returns:
+            Dict[str, edxml.ontology.DataType]
+        """
+        return {name: prop.get_data_type() for name, prop in event_type.get_properties().items()}
+
+    @staticmethod
+    def _normalize_float_values(property_data_types, event_object_values, ignore_value_errors):
+        """
+
+        Formats floating point object values, which are normalized in scientific
+        notation, to whatever is the most suitable for the value. Returns a copy
+        of the object values in case any values were formatted.
+
+        Args:
+            property_data_types (Dict[str, edxml.ontology.DataType]):
+            event_object_values (Dict[str, set]):
+            ignore_value_errors (bool):
+
+        Returns:
+            Dict[str, set]
+        """
+        normalized = event_object_values
+
+        for property_name, values in event_object_values.items():
+            data_type = property_data_types.get(property_name)
+            if data_type is None or data_type.get_family() != 'number' or \
+                    data_type.get_split()[1] not in ('float', 'double'):
+                continue
+            if normalized is event_object_values:
+                normalized = dict(event_object_values)
+            try:
+                normalized[property_name] = {'%f' % float(value) for value in values}
+            except ValueError:
+                if not ignore_value_errors:
+                    raise
+                # Object value is not valid. Just render the values as strings.
+                normalized[property_name] = {str(value) for value in values}
+
+        return normalized
+
+    def _get_compiled(self):
+        """
+
+        Returns the compiled template. The compiled template is the split
+        template where each string is paired with the placeholders that
+        it contains, parsed into their formatters and arguments. The
+        template is compiled on first use, allowing the Template instance
+        to be reused for evaluating many events without parsing it again.
+
+        Returns:
+            list
+        """
+        if self._compiled is None:
+            self._compiled = self._compile_split_template(self._split_template(self._template)[1])
+        return self._compiled
+
+    @classmethod
+    def _compile_split_template(cls, elements):
+        compiled = []
+        for element in elements:
+            if isinstance(element, list):
+                compiled.append(cls._compile_split_template(element))
+            else:
+                compiled.append((element, cls._compile_placeholders(element)))
+        return compiled
+
+    @staticmethod
+    def _compile_placeholders(string):
+        # Match on placeholders like "[[DATETIME:datetime,minute]]", creating
+        # groups of the strings in between the placeholders and the
+        # placeholders themselves, with and without brackets included.
+        placeholders = []
+        for placeholder, contents in re.findall(r'(\[\[([^]]*)]])', string):
+            try:
+                formatter, argument_string = contents.split(':', 1)
+                arguments = argument_string.split(',')
+            except ValueError:
+                # No formatter present.
+                formatter = None
+                arguments = contents.split(',')
+            placeholders.append((placeholder, formatter, arguments))
+        return placeholders
+
     @classmethod
     def generate_collapsed_templates(cls, event_type: EventType, template, colorize=False):
         """
@@ -508,13 +672,15 @@ class Template(object):
 
     @classmethod
     def _process_simple_placeholder_string(
-            cls, event_type, string, event_object_values, event_attachments, colorize, ignore_value_errors
+            cls, property_data_types, string, placeholders, event_object_values, event_attachments, colorize,
+            ignore_value_errors
     ):
         """
 
         Args:
-            event_type (edxml.ontology.EventType):
+            property_data_types (Dict[str, edxml.ontology.DataType]):
             string (str):
+            placeholders (List[Tuple[str, Optional[str], List[str]]]): Compiled placeholders
             event_object_values (Dict[str, set]):
             event_attachments (Dict[str, Dict[str, str]]):
             colorize (bool):
@@ -526,39 +692,9 @@ class Template(object):
 
         replacements = {}
 
-        # Match on placeholders like "[[DATETIME:datetime,minute]]", creating
-        # groups of the strings in between the placeholders and the
-        # placeholders themselves, with and without brackets included.
-        placeholders = re.findall(r'(\[\[([^]]*)]])', string)
-
-        property_data_types = {}  # type: Dict[str, edxml.ontology.DataType]
-
-        # Format object values based on their data type to make them
-        # more human friendly.
-        for property_name, values in event_object_values.items():
-            property_data_types[property_name] = event_type[property_name].get_data_type()
-            if property_data_types[property_name].get_family() == 'number':
-                if property_data_types[property_name].get_split()[1] in ('float', 'double'):
-                    # Floating point numbers are normalized in scientific notation,
-                    # here we format it to whatever is the most suitable for the value.
-                    try:
-                        event_object_values[property_name] = {'%f' % float(value) for value in values}
-                    except ValueError:
-                        if not ignore_value_errors:
-                            raise
-                        # Object value is not valid. Just render the values as strings.
-                        event_object_values[property_name] = {str(value) for value in values}
-
-        for placeholder in placeholders:
+        for placeholder, formatter, arguments in placeholders:
 
             object_strings = []
-            try:
-                formatter, argument_string = placeholder[1].split(':', 1)
-                arguments = argument_string.split(',')
-            except ValueError:
-                # No formatter present.
-                formatter = None
-                arguments = placeholder[1].split(',')
 
             if formatter == 'time_span':
 
@@ -572,15 +708,16 @@ class Template(object):
                     return ''
 
                 try:
-                    span = parse(date_time_start).isoformat(' '), parse(date_time_end).isoformat(' ')
+                    object_strings.append(
+                        cls._format_value_cached('time_span', None, (date_time_start, date_time_end))
+                    )
                 except ParserError:
                     if not ignore_value_errors:
                         raise
                     # Not a valid date string. Just render it as-is.
-                    span = date_time_start, date_time_end
-                object_strings.append(
-                    'between %s and %s' % span
-                )
+                    object_strings.append(
+                        'between %s and %s' % (date_time_start, date_time_end)
+                    )
 
             elif formatter == 'duration':
 
@@ -594,7 +731,7 @@ class Template(object):
                     return ''
 
                 try:
-                    duration = cls._format_time_duration(parse(date_time_start), parse(date_time_end))
+                    duration = cls._format_value_cached('duration', None, (date_time_start, date_time_end))
                 except ParserError:
                     if not ignore_value_errors:
                         raise
@@ -607,32 +744,12 @@ class Template(object):
 
                 for object_value in event_object_values.get(arguments[0], []):
                     try:
-                        date_time = parse(object_value)
+                        object_strings.append(cls._format_value_cached('date_time', arguments[1], object_value))
                     except ParserError:
                         if not ignore_value_errors:
                             raise
                         # Not a valid date string. Just render it as-is.
                         object_strings.append(object_value)
-                        continue
-                    if arguments[1] == 'microsecond':
-                        object_strings.append(date_time.strftime('%A, %B %d %Y at %H:%M:%S.%fh'))
-                    elif arguments[1] == 'millisecond':
-                        object_strings.append(
-                            date_time.strftime('%A, %B %d %Y at %H:%M:%S.') +
-                            date_time.strftime('%f')[:3] + 'h'
-                        )
-                    elif arguments[1] == 'second':
-                        object_strings.append(date_time.strftime('%A, %B %d %Y at %H:%M:%Sh'))
-                    elif arguments[1] == 'minute':
-                        object_strings.append(date_time.strftime('%A, %B %d %Y at %H:%Mh'))
-                    elif arguments[1] == 'hour':
-                        object_strings.append(date_time.strftime('%A, %B %d %Y at %Hh'))
-                    elif arguments[1] == 'date':
-                        object_strings.append(date_time.strftime('%A, %B %d %Y'))
-                    elif arguments[1] == 'month':
-                        object_strings.append(date_time.strftime('%B %Y'))
-                    else:  # year
-                        object_strings.append(date_time.strftime('%Y'))
 
             elif formatter == 'url':
 
@@ -703,8 +820,8 @@ class Template(object):
 
             elif formatter == 'unless_empty':
 
-                not_empty_string = arguments.pop()
-                if [value for property_name in arguments for value in event_object_values.get(property_name, [])]:
+                not_empty_string = arguments[-1]
+                if [value for property_name in arguments[:-1] for value in event_object_values.get(property_name, [])]:
                     object_strings.append(not_empty_string)
 
             else:
@@ -715,18 +832,7 @@ class Template(object):
                 if property_name in property_data_types and property_data_types[property_name].type == 'geo:point':
                     for object_value in event_object_values.get(property_name, []):
                         try:
-                            lat, long = object_value.split(',')
-                            degrees = int(float(lat))
-                            minutes = int((float(lat) - degrees) * 60.0)
-                            seconds = int((float(lat) - degrees - (minutes / 60.0)) * 3600.0)
-
-                            lat_long = '%d°%d′%d %s″' % (degrees, minutes, seconds, 'N' if degrees > 0 else 'S')
-
-                            degrees = int(float(long))
-                            minutes = int((float(long) - degrees) * 60.0)
-                            seconds = int((float(long) - degrees - (minutes / 60.0)) * 3600.0)
-
-                            lat_long += ' %d°%d′%d %s″' % (degrees, minutes, seconds, 'E' if degrees > 0 else 'W')
+                            lat_long = cls._format_value_cached('geo:point', None, object_value)
                         except ValueError:
                             if not ignore_value_errors:
                                 raise
@@ -759,7 +865,7 @@ class Template(object):
             else:
                 object_string = ''
 
-            replacements[placeholder[0]] = object_string
+            replacements[placeholder] = object_string
 
         # Return template where all placeholders are replaced
         # by the actual (formatted) object values
@@ -773,23 +879,89 @@ class Template(object):
 
         return string
 
+    @classmethod
+    def _format_value(cls, formatter, option, value):
+        """
+
+        Formats an object value for use in an evaluated template. The
+        formatter is the name of a template formatter or, when the
+        formatting depends on the data type of the value rather than
+        on a formatter, the name of the data type. The option is a
+        formatter argument affecting the output, if applicable. For
+        formatters involving two object values, the value is a tuple.
+        Raises ValueError in case the value is not valid.
+
+        Note:
+          This method is wrapped in a cache, see set_value_cache_size().
+
+        Args:
+            formatter (str): Formatter or data type
+            option (Optional[str]): Formatter option
+            value (Union[str, Tuple[str, str]]): Object value
+
+        Returns:
+            str
+        """
+        if formatter == 'time_span':
+            return 'between %s and %s' % (parse(value[0]).isoformat(' '), parse(value[1]).isoformat(' '))
+
+        if formatter == 'duration':
+            return cls._format_time_duration(parse(value[0]), parse(value[1]))
+
+        if formatter == 'date_time':
+            date_time = parse(value)
+            if option == 'microsecond':
+                return date_time.strftime('%A, %B %d %Y at %H:%M:%S.%fh')
+            elif option == 'millisecond':
+                return date_time.strftime('%A, %B %d %Y at %H:%M:%S.') + date_time.strftime('%f')[:3] + 'h'
+            elif option == 'second':
+                return date_time.strftime('%A, %B %d %Y at %H:%M:%Sh')
+            elif option == 'minute':
+                return date_time.strftime('%A, %B %d %Y at %H:%Mh')
+            elif option == 'hour':
+                return date_time.strftime('%A, %B %d %Y at %Hh')
+            elif option == 'date':
+                return date_time.strftime('%A, %B %d %Y')
+            elif option == 'month':
+                return date_time.strftime('%B %Y')
+            else:  # year
+                return date_time.strftime('%Y')
+
+        if formatter == 'geo:point':
+            lat, long = value.split(',')
+            degrees = int(float(lat))
+            minutes = int((float(lat) - degrees) * 60.0)
+            seconds = int((float(lat) - degrees - (minutes / 60.0)) * 3600.0)
+
+            lat_long = '%d°%d′%d %s″' % (degrees, minutes, seconds, 'N' if degrees > 0 else 'S')
+
+            degrees = int(float(long))
+            minutes = int((float(long) - degrees) * 60.0)
+            seconds = int((float(long) - degrees - (minutes / 60.0)) * 3600.0)
+
+            return lat_long + ' %d°%d′%d %s″' % (degrees, minutes, seconds, 'E' if degrees > 0 else 'W')
+
+        raise ValueError('Unknown formatter: %s' % formatter)
+
     @classmethod
     def _process_split_template(
-            cls, elements, event_type, event_properties, event_attachments, colorize,
+            cls, elements, property_data_types, event_properties, event_attachments, colorize,
             ignore_value_errors, iteration_level=0
     ):
         result = ''
 
         for element in elements:
-            if type(element) == list:
+            if isinstance(element, list):
                 processed = cls._process_split_template(
-                    element, event_type, event_properties, event_attachments, colorize,
+                    element, property_data_types, event_properties, event_attachments, colorize,
                     ignore_value_errors, iteration_level + 1
                 )
             else:
-                if element != '':
+                string, placeholders = element
+                if string != '':
                     processed = cls._process_simple_placeholder_string(
-                        event_type, element, event_properties, event_attachments, colorize, ignore_value_errors
+                        property_data_types, string, placeholders, event_properties, event_attachments, colorize,
+                        ignore_value_errors
                     )
                     if processed == '':
                         return ''
@@ -878,3 +1050,6 @@ class Template(object):
             property_arguments, _ = self._get_placeholder_arguments(placeholder)
             properties.update(property_arguments)
         return list(properties)
+
+
+Template.set_value_cache_size(Template.DEFAULT_VALUE_CACHE_SIZE)
@@ -17,7 +17,10 @@ various types of input data (like JSON records) into EDXML output streams.
 """
 from .transcoder import RecordTranscoder, NullTranscoder
 from .mediator import TranscoderMediator
+from .async_mediator import AsyncTranscoderMediator
 from .test_harness import TranscoderTestHarness
 
 
-__all__ = ['RecordTranscoder', 'TranscoderMediator', 'TranscoderTestHarness', 'NullTranscoder']
+__all__ = [
+    'RecordTranscoder', 'TranscoderMediator', 'AsyncTranscoderMediator', 'TranscoderTestHarness', 'NullTranscoder'
+]
@@ -0,0 +1,122 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+from typing import List # noqa
+
+import edxml # noqa
+
+
+class AsyncTranscoderMediator(object):
+    """
+    Asyncio counterpart of the transcoder mediator. It wraps a regular
+    transcoder mediator, like an ObjectTranscoderMediator, which does the
+    actual transcoding using the registered record transcoders. Rather than
+    writing into a blocking file-like object, the output is written into an
+    asynchronous output stream, like an asyncio StreamWriter. The output
+    stream must have a write() method and a drain() coroutine.
+
+    The output is buffered and written into the output stream when the
+    buffer is full. After writing, the mediator waits for the output stream
+    to drain, which makes producers feeding input records slow down when the
+    output stream cannot keep up. This allows a single event loop to transcode
+    many concurrent feeds, each using its own mediator, without using threads.
+
+    The wrapped mediator must be created without an output, which makes it
+    return its output data rather than writing it. Note that transcoding
+    input records is done in the event loop. Any time spent transcoding
+    delays other tasks running in the same event loop.
+
+    The class is an asynchronous context manager which will automatically
+    close the mediator when it goes out of scope::
+
+        async with AsyncTranscoderMediator(ObjectTranscoderMediator(), writer) as mediator:
+            mediator.mediator.register('user', UserTranscoder())
+            async for record in feed:
+                await mediator.process(record)
+
+    Args:
+      mediator (edxml.transcode.TranscoderMediator): Transcoder mediator without output
+      output: Asynchronous output stream
+      buffer_size (int): Number of bytes to buffer before writing to the output stream
+    """
+
+    def __init__(self, mediator, output, buffer_size=65536):
+        self.mediator = mediator  # type: edxml.transcode.TranscoderMediator
+        """The wrapped transcoder mediator"""
+
+        self._output = output
+        self._buffer_size = buffer_size
+        self._buffer = []  # type: List[bytes]
+        self._buffered_bytes = 0
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close(write_ontology_update=exc_type is None)
+
+    async def process(self, record):
+        """
+        Processes a single input record, invoking the correct
+        transcoder to generate EDXML events and writing the
+        events into the output stream.
+
+        Args:
+          record: Input data record
+        """
+        if self._closed:
+            raise Exception('Failed to process record, the mediator has been closed.')
+
+        await self._write(self.mediator.process(record))
+
+    async def flush(self):
+        """
+        Writes any buffered output data into the output
+        stream and waits for the output stream to drain.
+        """
+        if self._buffer:
+            data = b''.join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            self._output.write(data)
+        await self._output.drain()
+
+    async def close(self, write_ontology_update=True):
+        """
+        Finalizes the transcoding process by closing the wrapped
+        mediator and writing its final output into the output stream.
+        When the mediator is not used as a context manager, this method
+        must be called explicitly to properly close the mediator. Note
+        that the output stream itself is not closed.
+
+        Args:
+            write_ontology_update (bool): Output ontology yes/no
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        self._buffer.append(self.mediator.close(write_ontology_update))
+        await self.flush()
+
+    async def _write(self, data):
+        if not data:
+            return
+
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+
+        if self._buffered_bytes >= self._buffer_size:
+            await self.flush()
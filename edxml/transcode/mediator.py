@@ -11,7 +11,12 @@
 #                                                                                        =
 # ========================================================================================
 
-from typing import Dict, Optional # noqa
+import multiprocessing
+import os
+
+from collections import deque
+from copy import copy
+from typing import Deque, Dict, List, Optional, Tuple # noqa
 from graphviz import Digraph
 
 import edxml # noqa
@@ -23,6 +28,18 @@ from edxml.ontology.description import describe_producer_rst
 from edxml.error import EDXMLValidationError
 from edxml.writer import EDXMLWriter
 
+# The mediator of a worker process, see _enable_parallel_processing()
+_worker_mediator = None  # type: Optional[TranscoderMediator]
+
+
+def _initialize_worker(mediator):
+    global _worker_mediator
+    _worker_mediator = mediator
+
+
+def _process_batch(records, ontology, ontology_version, source_uri):
+    return _worker_mediator._process_batch(records, ontology, ontology_version, source_uri)
+
 
 class TranscoderMediator(object):
     """
@@ -68,6 +85,17 @@ class TranscoderMediator(object):
         self.__validate_events = True
         self.__allow_repair_normalize = {}
         self.__log_repaired_events = False
+        self.__background_writing = None
+        self.__flush_policy = None
+
+        # Parallel processing configuration and state
+        self.__parallel_processing = None
+        self.__pool = None                  # type: Optional[multiprocessing.pool.Pool]
+        self.__pool_ontology_version = 0
+        self.__worker_ontology_versions = {}  # type: Dict[int, int]
+        self.__pending_records = []
+        self.__pending_results = deque()   # type: Deque[Tuple[multiprocessing.pool.AsyncResult, int]]
+        self.__worker_output = None         # type: Optional[List[bytes]]
 
         self._transcoders = {}              # type: Dict[any, edxml.transcode.RecordTranscoder]
         self._discard_selectors = set()
@@ -77,14 +105,23 @@ class TranscoderMediator(object):
         self.__writer = None   # type: Optional[edxml.EDXMLWriter]
 
         self.__ontology = Ontology()
+        self.__ontology.add_modification_callback(self.__ontology_modified_callback)
 
         self._ontology_populated = False
         self._last_written_ontology_version = 0
+        # Indicates if the ontology may have been modified since
+        # we last wrote it, which is tracked by means of the
+        # modification callback of the ontology.
+        self.__ontology_modified = True
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            # Do not wait for worker processes
+            # to finish processing pending records.
+            self.__stop_workers(terminate=True)
         self.close(write_ontology_update=exc_type is None)
 
     @property
@@ -298,6 +335,71 @@ class TranscoderMediator(object):
 
         return self
 
+    def enable_background_writing(self, batch_size=1000, queue_size=10):
+        """
+
+        Enables writing output events in a background thread, allowing
+        the mediator to read and transcode input records while previous
+        output events are validated and written. Refer to the
+        :func:`~edxml.EDXMLWriter.enable_background_writing` method of
+        the EDXML writer for details.
+
+        Note that invalid output events are reported at some point after
+        the mediator wrote them, which means that the error cannot be
+        attributed to a particular input record.
+
+        Args:
+            batch_size (int): Number of events per batch
+            queue_size (int): Maximum number of queued batches
+
+        Returns:
+            TranscoderMediator
+        """
+        self.__background_writing = (batch_size, queue_size)
+
+        if self.__writer:
+            self.__writer.enable_background_writing(batch_size, queue_size)
+
+        return self
+
+    def set_flush_policy(self, max_elements=1, max_bytes=None, max_latency=None):
+        """
+
+        Configures when the output is flushed. By default, the output is
+        flushed after each output event. Refer to the
+        :func:`~edxml.EDXMLWriter.set_flush_policy` method of the EDXML
+        writer for details.
+
+        Args:
+            max_elements (Optional[int]): Maximum number of buffered elements
+            max_bytes (Optional[int]): Maximum number of buffered bytes
+            max_latency (Optional[float]): Maximum time between flushes in seconds
+
+        Returns:
+            TranscoderMediator
+        """
+        self.__flush_policy = (max_elements, max_bytes, max_latency)
+
+        if self.__writer:
+            self.__writer.set_flush_policy(max_elements, max_bytes, max_latency)
+
+        return self
+
+    def _enable_parallel_processing(self, processes=None, batch_size=1000):
+        """
+        Enables processing input records using a pool of worker processes.
+        This is meant for mediators that can submit their input records to
+        the workers using _submit_records(). Extensions that support parallel
+        processing offer a public method that calls this one. Refer to the
+        :func:`~edxml.transcode.object.ObjectTranscoderMediator.enable_parallel_processing`
+        method of the object transcoder mediator for details.
+
+        Args:
+            processes (Optional[int]): Number of worker processes, defaults to the number of CPUs
+            batch_size (int): Number of input records per batch
+        """
+        self.__parallel_processing = (processes or os.cpu_count() or 1, batch_size)
+
     def add_event_source(self, source_uri):
         """
 
@@ -324,6 +426,9 @@ class TranscoderMediator(object):
         Returns:
           EventSource:
         """
+        # Input records that are pending for parallel processing
+        # must be processed using the ontology as it is now.
+        self.__submit_pending_records()
         return self.__ontology.create_event_source(source_uri)
 
     def set_event_source(self, source_uri):
@@ -338,6 +443,9 @@ class TranscoderMediator(object):
         Returns:
           TranscoderMediator:
         """
+        # Input records that are pending for parallel processing
+        # must be processed using the current event source.
+        self.__submit_pending_records()
         self._output_source_uri = source_uri
         return self
 
@@ -390,7 +498,15 @@ class TranscoderMediator(object):
         # by event types.
         self.__ontology.validate()
 
+    def __ontology_modified_callback(self):
+        self.__ontology_modified = True
+
     def _write_ontology_update(self):
+        if not self.__ontology_modified:
+            # This is the common case, which is
+            # checked before writing each event.
+            return
+
         if len(self.__ontology.get_event_sources()) == 0:
             log.warning('No EDXML source was defined before writing the first event, generating bogus source.')
             self.__ontology.create_event_source('/undefined/')
@@ -398,13 +514,23 @@ class TranscoderMediator(object):
         # Here, we write ontology updates resulting
         # from adding new ontology elements while
         # generating events. Currently, this is limited
-        # to event source definitions.
-        if not self._ontology.is_modified_since(self._last_written_ontology_version):
-            # Ontology did not change since we last wrote one.
-            return
+        # to event source definitions. Note that the ontology
+        # may have been modified and changed back again, in
+        # which case there is nothing to write.
+        if self._ontology.is_modified_since(self._last_written_ontology_version):
+            if self.__worker_output is not None:
+                # We are running in a worker process. The writer needs the
+                # ontology to validate events but its output must not contain
+                # the ontology, the parent process writes it. So, we set any
+                # events written so far aside and discard the ontology.
+                self.__worker_output.append(self._writer.flush())
+                self._writer.add_ontology(self._ontology)
+                self._writer.flush()
+            else:
+                self._writer.add_ontology(self._ontology)
+            self._last_written_ontology_version = self._ontology.get_version()
 
-        self._writer.add_ontology(self._ontology)
-        self._last_written_ontology_version = self._ontology.get_version()
+        self.__ontology_modified = False
 
     def _create_writer(self):
         self.__writer = EDXMLWriter(
@@ -418,6 +544,10 @@ class TranscoderMediator(object):
             self._writer.enable_auto_repair_normalize(event_type_name, property_names)
         for event_type_name, property_names in self.__allow_repair_drop.items():
             self._writer.enable_auto_repair_drop(event_type_name, property_names)
+        if self.__background_writing:
+            self._writer.enable_background_writing(*self.__background_writing)
+        if self.__flush_policy:
+            self._writer.set_flush_policy(*self.__flush_policy)
 
     def _write_event(self, record_id, record, event):
         """
@@ -428,16 +558,7 @@ class TranscoderMediator(object):
             event (edxml.EDXMLEvent): The EDXML event
         """
         self._write_ontology_update()
-
-        source_uri = event.get_source_uri()
-        if source_uri is None:
-            source_uri = self._get_source_uri(record, event)
-            if source_uri is None:
-                raise Exception(
-                    'Failed to assign source URI to output event. Either configure the transcoder mediator to use '
-                    'a fixed source URI or override its _get_source_uri() method.'
-                )
-            event.set_source(source_uri)
+        self._assign_source_uri(record, event)
 
         try:
             self._writer.add_event(event)
@@ -450,6 +571,288 @@ class TranscoderMediator(object):
                     'an invalid event: %s\n\nContinuing...' % (record_id, str(e))
                 )
 
+    def _write_events(self, record_id, record, events):
+        """
+        Writes the events generated from a single input record using the
+        EDXML writer. The events are handed to the writer in bulk, which
+        validates them in groups of events of the same event type. Only
+        events that fail to validate are normalized and repaired.
+
+        Args:
+            record_id (str): Record identifier
+            record: The input record
+            events (Iterable[edxml.EDXMLEvent]): The EDXML events
+        """
+        self._write_batch([(record_id, record, event) for event in events])
+
+    def _write_batch(self, batch):
+        """
+        Writes the events generated from a batch of input records using
+        the EDXML writer. The batch is a list of tuples containing a record
+        identifier, the input record and an event generated from it. Rather
+        than writing the events one by one, the events are handed to the
+        writer in bulk.
+
+        Args:
+            batch (List[Tuple[str, any, edxml.EDXMLEvent]]): The batch
+        """
+        if not batch:
+            return
+
+        events = [event for _, _, event in batch]
+
+        self._write_ontology_update()
+
+        for record_id, record, event in batch:
+            self._assign_source_uri(record, event)
+
+        try:
+            self._writer.add_events(events)
+        except EDXMLValidationError:
+            if not self._ignore_invalid_events:
+                raise
+            # The writer checks all events before writing any of them. So,
+            # no events were written. Write the events one by one, which
+            # skips the offending events and logs warnings about them.
+            for record_id, record, event in batch:
+                self._write_event(record_id, record, event)
+
+    def _get_output(self):
+        """
+        Returns the XML data generated by the writer when the mediator
+        was created without an output. When the mediator has an output,
+        an empty bytes object is returned and flushing the output is
+        left to the flush policy of the writer.
+
+        Returns:
+            bytes: Generated output XML data
+        """
+        if self.__worker_output is not None:
+            # We are running in a worker process, output
+            # is collected at the end of each batch.
+            return b''
+        if self.__output is None:
+            return self._writer.flush()
+        return b''
+
+    def _parallel_processing_enabled(self):
+        """
+        Returns True when input records should be submitted to
+        worker processes using _submit_records() rather than being
+        processed by the mediator itself.
+
+        Returns:
+            bool
+        """
+        return self.__parallel_processing is not None
+
+    def _submit_records(self, records):
+        """
+        Submits input records for processing by the worker processes.
+        Records are sent to the workers in batches. Any output of batches
+        that the workers finished processing is written into the output.
+
+        Args:
+            records (Iterable): Input records
+
+        Returns:
+            bytes: Generated output XML data
+        """
+        processes, batch_size = self.__parallel_processing
+
+        for record in records:
+            self.__pending_records.append(record)
+            self._num_input_records_processed += 1
+            if len(self.__pending_records) >= batch_size:
+                self.__submit_pending_records()
+                self.__write_finished_results(processes)
+
+        self.__write_finished_results(processes)
+
+        return self._get_output()
+
+    def __write_finished_results(self, processes):
+        # Write the output of finished batches. We limit the number of
+        # batches in flight to keep the memory usage of pending batches
+        # in check while keeping all workers busy.
+        while self.__pending_results and \
+                (self.__pending_results[0][0].ready() or len(self.__pending_results) > 2 * processes):
+            self.__write_result(*self.__pending_results.popleft())
+
+    def __submit_pending_records(self):
+        if not self.__pending_records:
+            return
+
+        if self.__pool is None:
+            self.__start_workers()
+
+        # When the ontology changed since all workers last received it,
+        # for instance because event sources were added, the workers
+        # need the updated ontology. We cannot choose the worker that
+        # picks up the batch, so we keep sending the ontology until
+        # each of the workers reported having received it.
+        ontology = None
+        ontology_version = self._ontology.get_version()
+        if self._ontology.is_modified_since(self.__pool_ontology_version):
+            ontology = self._ontology
+
+        self.__pending_results.append((
+            self.__pool.apply_async(
+                _process_batch, (self.__pending_records, ontology, ontology_version, self._output_source_uri)
+            ),
+            ontology_version
+        ))
+        self.__pending_records = []
+
+    def __start_workers(self):
+        # Write the ontology before copying the mediator into
+        # the workers, which makes sure that the ontology is
+        # complete and the workers have an event source.
+        self._write_ontology_update()
+        self.__pool_ontology_version = self._ontology.get_version()
+        self.__worker_ontology_versions = {}
+        self.__pool = multiprocessing.Pool(
+            self.__parallel_processing[0], initializer=_initialize_worker, initargs=(self._create_worker(),)
+        )
+
+    def __stop_workers(self, terminate=False):
+        if self.__pool is None:
+            return
+
+        try:
+            if not terminate:
+                self.__submit_pending_records()
+                while self.__pending_results:
+                    self.__write_result(*self.__pending_results.popleft())
+        except BaseException:
+            terminate = True
+            raise
+        finally:
+            self.__pending_records = []
+            self.__pending_results.clear()
+            if terminate:
+                self.__pool.terminate()
+            else:
+                self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def __write_result(self, result, ontology_version):
+        output, ontology, (worker, worker_ontology_version) = result.get()
+        self.__worker_ontology_versions[worker] = worker_ontology_version
+        if len(self.__worker_ontology_versions) == self.__parallel_processing[0]:
+            # All workers have at least this version of the ontology.
+            self.__pool_ontology_version = min(self.__worker_ontology_versions.values())
+        if ontology is not None:
+            # The worker updated its ontology while processing the batch.
+            self.__ontology.update(ontology)
+        if not output:
+            return
+        if ontology is not None or ontology_version > self._last_written_ontology_version:
+            # Like when processing records without using workers, the
+            # ontology is written right before the first events that
+            # may need the updated ontology.
+            self._write_ontology_update()
+        self._writer.add_serialized_events(output)
+
+    def _create_worker(self):
+        """
+        Creates the copy of the mediator that is used by the
+        worker processes. The copy has no output and no EDXML
+        writer of its own, it creates one in the worker process.
+
+        Returns:
+            TranscoderMediator
+        """
+        worker = copy(self)
+        worker.__output = None
+        worker.__writer = None
+        worker.__parallel_processing = None
+        worker.__pool = None
+        worker.__pending_records = []
+        worker.__pending_results = deque()
+        # Background writing is of no use in the workers and the
+        # workers produce their output in one piece for each batch.
+        worker.__background_writing = None
+        worker.__flush_policy = (None, None, None)
+        worker._last_written_ontology_version = 0
+        worker.__ontology_modified = True
+        return worker
+
+    def _process_batch(self, records, ontology, ontology_version, source_uri):
+        """
+        Processes a batch of input records in a worker process. Returns a
+        tuple containing the serialized output events, the ontology and a
+        tuple identifying the worker process and the version of the ontology
+        of the parent process that the worker received last. The ontology
+        is None unless processing the records modified it.
+
+        Args:
+            records (List): Input records
+            ontology (Optional[Ontology]): Updated ontology of the parent process
+            ontology_version (int): Version of the ontology of the parent process
+            source_uri (Optional[str]): Fixed event source URI of the parent process
+
+        Returns:
+            Tuple[bytes, Optional[Ontology], Tuple[int, int]]
+        """
+        if self.__writer is None:
+            # This is the first batch. The ontology of the worker is a copy
+            # which does not notify the worker about modifications yet.
+            self.__ontology.add_modification_callback(self.__ontology_modified_callback)
+            # Create the writer, discarding the opening <edxml> tag.
+            self._writer.flush()
+
+        if ontology is not None:
+            self.__ontology.update(ontology)
+            # In the worker, this tracks the version of the
+            # ontology of the parent process that we have.
+            self.__pool_ontology_version = ontology_version
+
+        self._output_source_uri = source_uri
+        version = self.__ontology.get_version()
+
+        self.__worker_output = []
+        self._process_records(records)
+        self.__worker_output.append(self._writer.flush())
+
+        output, self.__worker_output = b''.join(self.__worker_output), None
+
+        return (
+            output,
+            self.__ontology if self.__ontology.is_modified_since(version) else None,
+            (os.getpid(), self.__pool_ontology_version)
+        )
+
+    def _process_records(self, records):
+        """
+        Processes a batch of input records in a worker process. By default,
+        the records are processed one by one using the process() method.
+        Extensions may override this method to process the records in bulk.
+
+        Args:
+            records (List): Input records
+        """
+        for record in records:
+            self.process(record)
+
+    def _assign_source_uri(self, record, event):
+        """
+        Assigns a source URI to the event in case it has none.
+
+        Args:
+            record: Input data record
+            event (edxml.EDXMLEvent): Generated EDXML event
+        """
+        if event.get_source_uri() is None:
+            source_uri = self._get_source_uri(record, event)
+            if source_uri is None:
+                raise Exception(
+                    'Failed to assign source URI to output event. Either configure the transcoder mediator to use '
+                    'a fixed source URI or override its _get_source_uri() method.'
+                )
+            event.set_source(source_uri)
+
     def _get_source_uri(self, record, event):
         """
 
@@ -481,12 +884,29 @@ class TranscoderMediator(object):
             record_selector (Optional[str]): Selector matching the record
             transcoder (edxml.transcode.RecordTranscoder): The record transcoder to use
         """
+        self._write_events(record_id, record, self._generate_events(record, record_id, record_selector, transcoder))
+
+    def _generate_events(self, record, record_id, record_selector, transcoder):
+        """
+        Uses specified record transcoder to generate the output events
+        for specified input record, including any post-processing.
+
+        Args:
+            record: The input record
+            record_id (str): Record identifier
+            record_selector (Optional[str]): Selector matching the record
+            transcoder (edxml.transcode.RecordTranscoder): The record transcoder to use
+
+        Returns:
+            List[edxml.EDXMLEvent]
+        """
+        events = []
         for event in transcoder.generate(record, record_selector):
             if self._transcoder_is_postprocessor(transcoder):
-                for post_processed_event in self._post_process(record_id, record, transcoder, event):
-                    self._write_event(record_id, record, post_processed_event)
+                events.extend(self._post_process(record_id, record, transcoder, event))
             else:
-                self._write_event(record_id, record, event)
+                events.append(event)
+        return events
 
     def _post_process(self, record_id, record, transcoder, event):
         """
@@ -593,6 +1013,15 @@ class TranscoderMediator(object):
         if self.__closed:
             return b''
 
+        try:
+            # Write the output of any pending input
+            # records processed by worker processes.
+            self.__stop_workers()
+        except BaseException:
+            self._writer.close()
+            self.__closed = True
+            raise
+
         if write_ontology_update:
             # Make sure we output the ontology even
             # when no events are output.
@@ -11,10 +11,117 @@
 #                                                                                        =
 # ========================================================================================
 
+from typing import Dict # noqa
+
 from edxml.transcode import RecordTranscoder
 from edxml import EDXMLEvent
 
 
+class FieldAccessor(object):
+    """
+    Class for fetching the value of a field from input records, using a
+    field selector in the dotted notation of the PROPERTY_MAP attribute of
+    the ObjectTranscoder class. Each part of the selector is a step into
+    the record, which can be a dictionary key, an object attribute or a
+    list index.
+
+    The selector is parsed only once. While fetching a field from a record,
+    the accessor tries each method of accessing the fields, in above order.
+    For each step, it remembers the method that worked and the type of the
+    record or sub-field it worked on. For subsequent records of the same
+    structure, the remembered methods are used right away. When a step
+    finds a record or sub-field of some other type, the accessor tries all
+    methods again, learning the new structure.
+
+    Args:
+      selector (str): Field selector
+    """
+
+    _KEY = 0
+    _ATTRIBUTE = 1
+    _INDEX = 2
+
+    def __init__(self, selector):
+        try:
+            path = selector.split('.')
+        except AttributeError:
+            # Selector could be an integer key into
+            # a dictionary or a list index.
+            path = [selector]
+        self._path = path
+        self._indices = []
+        for field in path:
+            try:
+                self._indices.append(int(field))
+            except ValueError:
+                self._indices.append(None)
+        # For each step, the learned type of the record or
+        # sub-field and the method to access the field in it.
+        self._types = [None] * len(path)
+        self._methods = [None] * len(path)
+
+    def get(self, record):
+        """
+
+        Fetches the field value from specified record. Returns
+        None in case the record does not contain the field.
+
+        Args:
+          record (dict, object): Input record
+
+        Returns:
+          The field value
+        """
+        value = record
+        types = self._types
+        methods = self._methods
+        for position, field in enumerate(self._path):
+            if type(value) is types[position]:
+                method = methods[position]
+                if method == self._KEY:
+                    value = value.get(field)
+                    continue
+                if method == self._ATTRIBUTE:
+                    try:
+                        value = getattr(value, field)
+                        continue
+                    except AttributeError:
+                        pass
+                else:
+                    try:
+                        value = value[self._indices[position]]
+                        continue
+                    except IndexError:
+                        return None
+            found, value = self._step(position, value)
+            if not found:
+                return None
+        return value
+
+    def _step(self, position, value):
+        field = self._path[position]
+        # The record itself may also be an object that does not accept
+        # the field name as attribute name, like an integer field name.
+        attribute_errors = (TypeError, AttributeError) if position == 0 else AttributeError
+        try:
+            result = value.get(field)
+            method = self._KEY
+        except AttributeError:
+            try:
+                result = getattr(value, field)
+                method = self._ATTRIBUTE
+            except attribute_errors:
+                try:
+                    result = value[int(field)]
+                    method = self._INDEX
+                except (ValueError, IndexError):
+                    # Field not found.
+                    return False, None
+        self._types[position] = type(value)
+        self._methods[position] = method
+        return True, result
+
+
 class ObjectTranscoder(RecordTranscoder):
 
     PROPERTY_MAP = {}
@@ -37,6 +144,11 @@ class ObjectTranscoder(RecordTranscoder):
     to the attribute map and remove them in the generate() method, which may be convenient
     for composing properties from multiple input record attributes, or for splitting the
     auto-generated event into multiple output events.
+
+    The selectors are parsed only once and the transcoder learns how to access the
+    fields from the first records it transcodes, which makes transcoding subsequent
+    records of the same structure faster. Because of this, the property mappings
+    should not be modified in place. Assigning a new dictionary is fine.
     """
 
     EMPTY_VALUES = {}
@@ -100,65 +212,63 @@ class ObjectTranscoder(RecordTranscoder):
 
         event_type_name = self.TYPE_MAP[record_selector]
 
-        for selector, property_names in self.PROPERTY_MAP[event_type_name].items():
+        for accessor, property_names, empty in self._get_field_plan(event_type_name):
 
-            if not isinstance(property_names, list):
-                property_names = [property_names]
+            value = accessor.get(input_object)
 
-            # Below, we parse dotted notation to find sub-fields
-            # in the object.
+            if value is not None:
+                if type(value) == list:
+                    property_values = [v for v in value if v not in empty]
+                elif type(value) == bool:
+                    property_values = ['true' if value else 'false']
+                else:
+                    property_values = [value] if value not in empty else []
 
-            try:
-                field_path = selector.split('.')
-            except AttributeError:
-                # Field path could be an integer key into a dictionary
-                # or a list index.
-                field_path = [selector]
-            if len(field_path) > 0:
-                try:
-                    # Try using the record as a dictionary
-                    value = input_object.get(field_path[0])
-                except AttributeError:
-                    # That did not work. Try using the record
-                    # as an object.
-                    try:
-                        value = getattr(input_object, field_path[0])
-                    except (TypeError, AttributeError):
-                        # That did not work either. Try interpreting
-                        # the field as an index into a list.
-                        try:
-                            value = input_object[int(field_path[0])]
-                        except (ValueError, IndexError):
-                            # Field not found in record, try next field.
-                            continue
-                # Now descend into the record to find the innermost
-                # value that the field is referring to.
-                for field in field_path[1:]:
-                    try:
-                        try:
-                            value = value.get(field)
-                        except AttributeError:
-                            value = getattr(value, field)
-                    except AttributeError:
-                        try:
-                            value = value[int(field)]
-                        except (ValueError, IndexError):
-                            # Field not found in object.
-                            value = None
-                            break
-
-                if value is not None:
-                    empty = ['']
-                    empty.extend(self.EMPTY_VALUES.get(selector, ()))
-
-                    if type(value) == list:
-                        property_values = [v for v in value if v not in empty]
-                    elif type(value) == bool:
-                        property_values = ['true' if value else 'false']
-                    else:
-                        property_values = [value] if value not in empty else []
-
-                    for property_name in property_names:
-                        properties[property_name] = property_values
+                for property_name in property_names:
+                    properties[property_name] = property_values
 
         yield EDXMLEvent(self._post_process_properties(event_type_name, properties), event_type_name)
+
+    def _get_field_plan(self, event_type_name):
+        """
+        Returns a list of tuples containing a field accessor, the list of
+        property names and the list of empty values for each of the fields
+        in the PROPERTY_MAP of specified event type. The list is cached
+        and created again when the PROPERTY_MAP or EMPTY_VALUES attribute
+        is replaced.
+
+        Args:
+          event_type_name (str): Event type name
+
+        Returns:
+          List[Tuple[FieldAccessor, List[str], List]]
+        """
+        # Note that the caches are created on first use rather than in a
+        # constructor, because subclasses may not call our constructor.
+        field_plans = self.__dict__.setdefault('_field_plans', {})
+        field_accessors = self.__dict__.setdefault('_field_accessors', {})  # type: Dict[str, FieldAccessor]
+
+        property_map = self.PROPERTY_MAP[event_type_name]
+        try:
+            cached_map, cached_empty_values, plan = field_plans[event_type_name]
+            if cached_map is property_map and cached_empty_values is self.EMPTY_VALUES:
+                return plan
+        except KeyError:
+            pass
+
+        plan = []
+        for selector, property_names in property_map.items():
+            if not isinstance(property_names, list):
+                property_names = [property_names]
+            try:
+                accessor = field_accessors[selector]
+            except KeyError:
+                # Parse the dotted notation once, creating an
+                # accessor that finds the field in the records.
+                accessor = field_accessors[selector] = FieldAccessor(selector)
+            empty = ['']
+            empty.extend(self.EMPTY_VALUES.get(selector, ()))
+            plan.append((accessor, property_names, empty))
+
+        field_plans[event_type_name] = (property_map, self.EMPTY_VALUES, plan)
+        return plan
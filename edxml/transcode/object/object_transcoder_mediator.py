@@ -65,6 +65,42 @@ class ObjectTranscoderMediator(edxml.transcode.mediator.TranscoderMediator):
         """
         super().register(record_type_identifier, transcoder)
 
+    def enable_parallel_processing(self, processes=None, batch_size=1000):
+        """
+
+        Enables processing input records using a pool of worker processes,
+        allowing CPU bound record transcoders to use multiple CPU cores.
+        Input records are collected into batches which are distributed over
+        the worker processes. Each worker process has its own copy of the
+        mediator, including its record transcoders and EDXML writer. The
+        workers transcode the input records and validate and serialize the
+        resulting events. The mediator merges the serialized events into
+        its output in the order of the input records. The ontology is
+        written by the mediator, the workers only send it any ontology
+        updates they produce.
+
+        The worker processes are started when the first batch of input
+        records is complete. At that point, the mediator and its record
+        transcoders are copied into the workers. Depending on the method
+        that is used to start worker processes on the platform, this may
+        require the input records, the mediator and its record transcoders
+        to be picklable. Note that any state that record transcoders
+        accumulate while transcoding is local to the worker processes.
+
+        The return values of the process() and process_many() methods only
+        contain the output of batches that the workers finished processing.
+        Pending batches are processed when the mediator is closed.
+
+        Args:
+            processes (Optional[int]): Number of worker processes, defaults to the number of CPUs
+            batch_size (int): Number of input records per batch
+
+        Returns:
+            ObjectTranscoderMediator
+        """
+        self._enable_parallel_processing(processes, batch_size)
+        return self
+
     def _get_transcoder(self, record_type_name=None):
         """
 
@@ -103,19 +139,105 @@ class ObjectTranscoderMediator(edxml.transcode.mediator.TranscoderMediator):
           bytes: Generated output XML data
 
         """
+        if self._parallel_processing_enabled():
+            return self._submit_records((input_record,))
+
+        record_type = self._get_record_type(input_record)
+        record_type, transcoder = self._select_transcoder(input_record, record_type, self._get_transcoder(record_type))
+
+        if transcoder:
+            self._transcode(input_record, record_type or '', record_type, transcoder)
+
+        self._num_input_records_processed += 1
+
+        return self._get_output()
+
+    def process_many(self, input_records):
+        """
+        Processes a batch of input objects. This is equivalent
+        to processing the objects one by one using process(),
+        but more efficient. The objects are grouped by record type,
+        looking up the object transcoder only once for each group.
+        The events generated from all of the objects are written
+        in bulk, in the order of the input objects.
+
+        If no output was specified while instantiating this class,
+        any generated XML data will be returned as bytes.
+
+        Args:
+          input_records (Iterable[dict,object]): Input objects
+
+        Returns:
+          bytes: Generated output XML data
+        """
+        if self._parallel_processing_enabled():
+            return self._submit_records(input_records)
+
+        input_records = list(input_records)
 
+        # Group the positions of the records by record type.
+        groups = {}
+        for position, input_record in enumerate(input_records):
+            groups.setdefault(self._get_record_type(input_record), []).append(position)
+
+        events = [()] * len(input_records)
+        for record_type, positions in groups.items():
+            transcoder = self._get_transcoder(record_type)
+            for position in positions:
+                input_record = input_records[position]
+                selector, record_transcoder = self._select_transcoder(input_record, record_type, transcoder)
+                if record_transcoder:
+                    record_id = selector or ''
+                    events[position] = [
+                        (record_id, input_record, event) for event in
+                        self._generate_events(input_record, record_id, selector, record_transcoder)
+                    ]
+
+        self._write_batch([item for record_events in events for item in record_events])
+
+        self._num_input_records_processed += len(input_records)
+
+        return self._get_output()
+
+    def _process_records(self, records):
+        self.process_many(records)
+
+    def _get_record_type(self, input_record):
+        """
+        Returns the record type of specified input object,
+        or None in case it cannot be determined.
+
+        Args:
+          input_record (dict,object): Input object
+
+        Returns:
+          Optional[str]
+        """
         if self.TYPE_FIELD is None:
             # Type field is not set, which means we must use the
             # fallback transcoder.
-            record_type = None
-        else:
-            try:
-                record_type = input_record.get(self.TYPE_FIELD)
-            except AttributeError:
-                record_type = getattr(input_record, self.TYPE_FIELD)
+            return None
+        try:
+            return input_record.get(self.TYPE_FIELD)
+        except AttributeError:
+            return getattr(input_record, self.TYPE_FIELD)
 
-        transcoder = self._get_transcoder(record_type)
+    def _select_transcoder(self, input_record, record_type, transcoder):
+        """
+        Selects the object transcoder for specified input object, given
+        its record type and the transcoder registered for that type. In
+        case no transcoder was registered for the record type, the fallback
+        transcoder is selected. Returns a tuple containing the record selector
+        and the transcoder, which is None when no transcoder is available.
+
+        Args:
+          input_record (dict,object): Input object
+          record_type (Optional[str]): Record type
+          transcoder (Optional[ObjectTranscoder]): Transcoder for the record type
 
+        Returns:
+          Tuple[Optional[str], Optional[ObjectTranscoder]]
+        """
         if not transcoder and record_type is not None:
             # No record transcoder available for record type,
             # use the fallback transcoder, if available.
@@ -128,20 +250,15 @@ class ObjectTranscoderMediator(edxml.transcode.mediator.TranscoderMediator):
                     'Input object has no "%s" field, passing to fallback transcoder. Record was: %s' %
                     (self.TYPE_FIELD, input_record)
                 )
+        elif self._warn_no_transcoder:
+            if record_type is None and self.TYPE_FIELD:
+                log.warning(
+                    'Input record has no "%s" field and no fallback transcoder available.' % self.TYPE_FIELD
+                )
+            else:
+                log.warning(
+                    'No record transcoder registered itself as fallback (record type None), '
+                    'no %s event generated. Record was: %s' % (record_type, input_record)
+                )
 
-            self._transcode(input_record, record_type or '', record_type, transcoder)
-        else:
-            if self._warn_no_transcoder:
-                if record_type is None and self.TYPE_FIELD:
-                    log.warning(
-                        'Input record has no "%s" field and no fallback transcoder available.' % self.TYPE_FIELD
-                    )
-                else:
-                    log.warning(
-                        'No record transcoder registered itself as fallback (record type None), '
-                        'no %s event generated. Record was: %s' % (record_type, input_record)
-                    )
-
-        self._num_input_records_processed += 1
-
-        return self._writer.flush()
+        return record_type, transcoder
@@ -110,15 +110,17 @@ class TranscoderTestHarness(TranscoderMediator):
 
         super().process(record)
 
+        events = []
         for event in self.transcoder.generate(record, selector):
             if self._output_source_uri:
                 event.set_source(self._output_source_uri)
 
             if self._transcoder_is_postprocessor(self.transcoder):
-                for post_processed_event in self._post_process(selector, record, self.transcoder, event):
-                    self._write_event(selector, record, post_processed_event)
+                events.extend(self._post_process(selector, record, self.transcoder, event))
             else:
-                self._write_event(selector, record, event)
+                events.append(event)
+
+        self._write_events(selector, record, events)
 
     def close(self, write_ontology_update=True):
         super().close(write_ontology_update)
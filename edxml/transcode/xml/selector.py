@@ -0,0 +1,163 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import re
+
+from lxml import etree
+
+_NAME = r'[A-Za-z_][0-9A-Za-z_.-]*'
+_STEP_PATTERN = re.compile(
+    r'(//|/)?(\*|' + _NAME + r')((?:\[@' + _NAME + r'(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'))?\])*)'
+)
+_PREDICATE_PATTERN = re.compile(r'\[@(' + _NAME + r')(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'))?\]')
+
+
+class XPathSelector(object):
+    """
+    Class for testing if XML elements match an XPath expression. Evaluating
+    an XPath expression against a full XML document and checking if an element
+    is among the results gets slower as the document grows. For simple location
+    paths like::
+
+        /root/records/record
+        //record[@type="a"]
+
+    the selector compiles the expression into a matcher that only inspects the
+    element and its ancestors. Other expressions are evaluated using lxml.
+
+    Supported expressions are paths containing child (/) and descendant (//)
+    steps, where each step is a tag name or a wildcard, optionally followed by
+    predicates testing for the presence or the value of an attribute. Like
+    lxml does when evaluating an XPath expression against an element tree,
+    relative paths are evaluated relative to the root element.
+
+    Args:
+      xpath_expression (str): XPath expression
+      namespaces (Optional[Dict[str, str]]): Namespace prefix mapping
+    """
+
+    def __init__(self, xpath_expression, namespaces=None):
+        self.xpath_expression = xpath_expression
+        # Compiling the expression using lxml also validates it,
+        # raising XPathSyntaxError in case the expression is invalid.
+        self._xpath = etree.XPath(xpath_expression, namespaces=namespaces)
+        self._absolute = False
+        self._steps = self._compile(xpath_expression)
+        self.tag = None
+        """The tag that all matching elements have, or None if unknown"""
+
+        if self._steps is not None and self._steps[-1][1] != '*':
+            self.tag = self._steps[-1][1]
+
+    @property
+    def compiled(self):
+        """
+        Indicates if the expression was compiled into an
+        ancestor matcher rather than being evaluated by lxml.
+
+        Returns:
+            bool
+        """
+        return self._steps is not None
+
+    def _compile(self, xpath_expression):
+        steps = []
+        position = 0
+        expression = xpath_expression.strip()
+
+        while position < len(expression):
+            match = _STEP_PATTERN.match(expression, position)
+            if match is None or match.end() == position:
+                return None
+            separator, name, predicates = match.groups()
+            if separator is None and position > 0:
+                # Two steps without a separator between them.
+                return None
+            if position == 0:
+                self._absolute = separator is not None
+            steps.append((
+                separator == '//',
+                name,
+                [
+                    (predicate.group(1), predicate.group(2) if predicate.group(2) is not None else predicate.group(3))
+                    for predicate in _PREDICATE_PATTERN.finditer(predicates)
+                ]
+            ))
+            position = match.end()
+
+        return steps or None
+
+    def matches(self, element, tree):
+        """
+        Checks if the element matches the XPath expression.
+
+        Args:
+          element (etree.Element): XML element
+          tree (etree.ElementTree): Root of XML document containing the element
+
+        Returns:
+          bool
+        """
+        if self._steps is None:
+            return element in self._xpath(tree)
+
+        if self.tag is not None and element.tag != self.tag:
+            return False
+
+        # Gather the element and its ancestors, root element first.
+        path = [element]
+        parent = element.getparent()
+        while parent is not None:
+            path.append(parent)
+            parent = parent.getparent()
+        path.reverse()
+
+        # Absolute paths start at the document node, which
+        # precedes the root element. Relative paths start
+        # at the root element.
+        return self._match_steps(path, 0, -1 if self._absolute else 0)
+
+    def _match_steps(self, path, step_index, context):
+        descendant, name, predicates = self._steps[step_index]
+        last_step = step_index == len(self._steps) - 1
+
+        if last_step:
+            # The last step must match the element itself.
+            candidates = [len(path) - 1]
+            if not descendant and context + 1 != len(path) - 1:
+                return False
+        elif descendant:
+            candidates = range(context + 1, len(path) - 1)
+        else:
+            # Intermediate steps must match one of the ancestors.
+            candidates = [context + 1] if context + 1 < len(path) - 1 else []
+
+        for candidate in candidates:
+            if not self._match_step(path[candidate], name, predicates):
+                continue
+            if last_step or self._match_steps(path, step_index + 1, candidate):
+                return True
+
+        return False
+
+    @staticmethod
+    def _match_step(element, name, predicates):
+        if name != '*' and element.tag != name:
+            return False
+        for attribute, value in predicates:
+            if value is None:
+                if attribute not in element.attrib:
+                    return False
+            elif element.get(attribute) != value:
+                return False
+        return True
@@ -12,11 +12,27 @@
 # ========================================================================================
 
 import re
+from typing import Dict, List # noqa
 
 from lxml import etree
 from lxml.etree import XPathSyntaxError
 from edxml.logger import log
 from edxml.transcode import TranscoderMediator
+from edxml.transcode.xml.selector import XPathSelector
+
+
+class _ElementPath(object):
+    # Identifies an input element by its XPath expression in
+    # log messages, computing the expression when it is needed.
+
+    __slots__ = ('tree', 'element')
+
+    def __init__(self, tree, element):
+        self.tree = tree
+        self.element = element
+
+    def __str__(self):
+        return self.tree.getpath(self.element)
 
 
 class XmlTranscoderMediator(TranscoderMediator):
@@ -32,10 +48,11 @@ class XmlTranscoderMediator(TranscoderMediator):
 
     def __init__(self, output=None):
         super().__init__(output)
-        self._transcoder_positions = {}
         self._last_used_transcoder_xpath = None
-        self._last_parent_xpath = None
-        self._xpath_matchers = {}
+        self._last_transcoded = None
+        self._max_retained_elements = None
+        self._selectors = {}  # type: Dict[str, XPathSelector]
+        self._selectors_by_tag = {}  # type: Dict[str, List[XPathSelector]]
         self._transcoder_tags = {}
         self._warned_large_tree = False
         self._root = None
@@ -43,6 +60,7 @@ class XmlTranscoderMediator(TranscoderMediator):
     def _close(self):
         super(XmlTranscoderMediator, self)._close()
         self._root = None
+        self._last_transcoded = None
 
     def register(self, xpath_expression, transcoder, tag=None):
         """
@@ -90,10 +108,10 @@ class XmlTranscoderMediator(TranscoderMediator):
         if xpath_expression is None:
             return
 
-        # Create and cache a compiled function for evaluating the
-        # XPath expression.
+        # Create and cache a selector for matching elements
+        # against the XPath expression.
         try:
-            self._xpath_matchers[xpath_expression] = etree.XPath(
+            self._selectors[xpath_expression] = XPathSelector(
                 xpath_expression, namespaces={
                     're': 'http://exslt.org/regular-expressions'}
             )
@@ -103,6 +121,30 @@ class XmlTranscoderMediator(TranscoderMediator):
                 (type(transcoder).__name__, xpath_expression)
             )
 
+        self._selectors_by_tag = {}
+
+    def set_max_retained_elements(self, max_elements):
+        """
+
+        Limits the number of XML elements that are retained in the in memory
+        XML tree while parsing. Transcoded elements and elements associated
+        with the Null transcoder are always deleted. Other elements are kept,
+        as transcoders may need to aggregate information from multiple XML
+        elements. When a limit is set, only the specified number of elements
+        preceding the element that is being transcoded is retained, as well as
+        the same number of elements preceding each of its ancestors. Older
+        elements are deleted. This keeps memory usage flat while parsing large
+        XML documents.
+
+        Args:
+          max_elements (Optional[int]): Maximum number of retained elements, or None
+
+        Returns:
+          XmlTranscoderMediator:
+        """
+        self._max_retained_elements = max_elements
+        return self
+
     def _get_transcoder(self, xpath_expression=None):
         """
 
@@ -259,13 +301,12 @@ class XmlTranscoderMediator(TranscoderMediator):
           bytes: Generated output XML data
         """
 
-        # Get the XPath expression that matches the element. Note that this
-        # is an XPath that matches only this one element, while record transcoders are
-        # registered on XPath expressions that are much more generic and typically
-        # match multiple elements.
-        element_xpath = tree.getpath(element)
+        # The XPath expression that matches only this one element is used
+        # to identify the input record in log messages. Computing it is
+        # expensive, so we only do that when a message needs it.
+        element_xpath = _ElementPath(tree, element)
 
-        transcoder_xpaths = list(self._xpath_matchers.keys())
+        selectors = self._get_selectors(element.tag)
 
         matching_element_xpath = None
 
@@ -273,15 +314,17 @@ class XmlTranscoderMediator(TranscoderMediator):
             # Try whatever record transcoder was used on the previously
             # transcoded element first. If it matches, we are lucky and we
             # do not need to try them all.
-            transcoder_xpaths.insert(0, self._last_used_transcoder_xpath)
+            last_used_selector = self._selectors[self._last_used_transcoder_xpath]
+            if last_used_selector in selectors:
+                selectors = [last_used_selector] + selectors
 
         # Below, we try to match the XPath expressions of each of the registered
-        # record transcoders with the XPath expression of the current element.
-        for matching_xpath in transcoder_xpaths:
-            if element in self._xpath_matchers[matching_xpath](tree):
+        # record transcoders with the current element.
+        for selector in selectors:
+            if selector.matches(element, tree):
                 # The element is among the elements that match the
                 # XPath expression of one of the record transcoders.
-                matching_element_xpath = matching_xpath
+                matching_element_xpath = selector.xpath_expression
                 break
 
         if matching_element_xpath is not None:
@@ -293,7 +336,7 @@ class XmlTranscoderMediator(TranscoderMediator):
             if matching_element_xpath is None and self._warn_fallback:
                 log.warning(
                     'XML element at %s does not match any XPath expressions, passing to fallback transcoder' %
-                    tree.getpath(element)
+                    element_xpath
                 )
 
             self._transcode(element, element_xpath, matching_element_xpath, transcoder)
@@ -308,59 +351,105 @@ class XmlTranscoderMediator(TranscoderMediator):
 
         self._num_input_records_processed += 1
 
-        return self._writer.flush()
+        return self._get_output()
+
+    def _get_selectors(self, tag):
+        """
+        Returns the selectors that may match elements having specified
+        tag, in order of registration. Selectors that were compiled for
+        matching other tags are left out.
+
+        Args:
+          tag (str): XML tag name
+
+        Returns:
+          List[XPathSelector]
+        """
+        if tag not in self._selectors_by_tag:
+            self._selectors_by_tag[tag] = [
+                selector for selector in self._selectors.values() if selector.tag is None or selector.tag == tag
+            ]
+        return self._selectors_by_tag[tag]
 
     def _clean_after_transcode(self, tree, element):
         # Delete previously transcoded elements to keep the in-memory XML
-        # tree small and processing efficient. Note that lxml only allows us
-        # to delete children of a parent element by index. Also, we cannot delete
-        # the element that we are currently processing, we always delete the
-        # previously transcoded element. To this end, we keep track of the
-        # indices of the last transcoded element inside its parent element.
+        # tree small and processing efficient. We cannot delete the element
+        # that we are currently processing, we always delete the previously
+        # transcoded element. Any elements in between that are associated
+        # with the Null transcoder are deleted as well. Elements are tracked
+        # by identity, so we never need to compute their locations.
         parent = element.getparent()
-        parent_xpath = tree.getpath(parent)
-        if self._last_parent_xpath is not None:
-            last_parent, last_transcoded = self._transcoder_positions[self._last_parent_xpath]
-            # We recorded the index of the previously transcoded
-            # element. We can always safely delete that one.
-            del last_parent[last_transcoded]
-
-            if last_parent == parent:
+        last_transcoded = self._last_transcoded
+        if last_transcoded is not None and last_transcoded.getparent() is not None:
+            last_parent = last_transcoded.getparent()
+            if last_parent is parent:
                 # Previously transcoded element is child of same
                 # parent as the currently transcoded element.
                 # So, we can try to delete any of the elements
                 # in between.
-                self._clean_child_elements(tree, parent, last_transcoded, parent.index(element) - 1)
+                in_between = []
+                for sibling in last_transcoded.itersiblings():
+                    if sibling is element:
+                        break
+                    in_between.append(sibling)
+                self._clean_elements(tree, in_between)
             else:
                 # Previously transcoded element is in a different
                 # parent element. Try to delete all remaining
                 # child elements. Also, we delete any elements
                 # in the current parent preceding the element we
                 # just transcoded.
-                self._clean_child_elements(tree, last_parent, last_transcoded, len(last_parent) - 1)
-                self._clean_child_elements(tree, parent, 0, parent.index(element) - 1)
-
-        index = parent.index(element)
-        self._transcoder_positions[parent_xpath] = (parent, index)
-        self._last_parent_xpath = parent_xpath
-
-        if index > 100:
-            self._warn_large_tree(tree, parent, index)
-
-    def _clean_child_elements(self, tree, parent, first, last):
-        for i in range(last, first - 1, -1):
-            # Get the XPath location of the child and remove any
-            # index specifiers like '[1]'. Then we can check if
-            # the child is inside an element that is associated
-            # with the Null transcoder.
-            child_path = re.sub(r'\[\d+]', '', tree.getpath(parent[i]))
-            for discard_path in self._discard_selectors:
-                if child_path.startswith(discard_path):
+                self._clean_elements(tree, list(last_transcoded.itersiblings()))
+                if parent is not None:
+                    self._clean_elements(tree, list(element.itersiblings(preceding=True)))
+            # We can always safely delete the previously transcoded element.
+            last_parent.remove(last_transcoded)
+            parent_changed = last_parent is not parent
+        else:
+            parent_changed = True
+
+        self._last_transcoded = element
+
+        if parent is None:
+            return
+
+        if self._max_retained_elements is not None:
+            self._prune_retained_elements(element, ancestors=parent_changed)
+        elif not self._warned_large_tree:
+            index = parent.index(element)
+            if index > 100:
+                self._warn_large_tree(tree, parent, index)
+
+    def _clean_elements(self, tree, elements):
+        discard_selectors = [self._selectors[xpath] for xpath in self._discard_selectors if xpath is not None]
+        if not discard_selectors:
+            return
+        for element in elements:
+            for selector in discard_selectors:
+                if selector.matches(element, tree):
                     # Element is associated with the Null transcoder
                     # and can be safely discarded.
-                    del parent[i]
+                    element.getparent().remove(element)
                     break
 
+    def _prune_retained_elements(self, element, ancestors=False):
+        # Delete the oldest elements preceding the element that was
+        # just transcoded, keeping no more than the configured number
+        # of elements. When the transcoded element is the first one
+        # inside its parent, the preceding siblings of its ancestors are
+        # pruned as well, as these are left behind by previous parents.
+        while element is not None and element.getparent() is not None:
+            preceding = element.itersiblings(preceding=True)
+            for _ in range(self._max_retained_elements):
+                if next(preceding, None) is None:
+                    break
+            else:
+                for sibling in list(preceding):
+                    sibling.getparent().remove(sibling)
+            if not ancestors:
+                break
+            element = element.getparent()
+
     def _warn_large_tree(self, tree, parent, index):
         if self._warned_large_tree:
             return
@@ -369,7 +458,9 @@ class XmlTranscoderMediator(TranscoderMediator):
         tag_counts = sorted([(tag, tags.count(tag)) for tag in set(tags)], key=lambda item: item[1], reverse=True)
         log.warning(
             "The element at xpath %s contains many child elements that have no associated record transcoder. "
-            "These elements are clogging the in memory XML tree, slowing down processing. Worst offenders are: %s." %
+            "These elements are clogging the in memory XML tree, slowing down processing. Worst offenders are: %s. "
+            "Consider registering these elements using a NullTranscoder or setting a maximum number of retained "
+            "elements." %
             (tree.getpath(parent), ','.join([f"{tag} ({count})" for tag, count in tag_counts[:5]]))
         )
         self._warned_large_tree = True
@@ -19,13 +19,17 @@ to generate EDXML streams.
 """
 import edxml_schema
 import sys
+import time
 
 from collections import deque
+from queue import Queue
+from threading import Thread
 from typing import Optional # noqa
 from lxml import etree
-from copy import deepcopy
+from copy import copy, deepcopy
 
 from edxml.error import EDXMLEventValidationError, EDXMLOntologyValidationError
+from edxml.event import ParsedEvent, EventElement, PropertySet
 from edxml.event_validator import EventValidator
 from edxml.ontology import Ontology
 from edxml.logger import log
@@ -60,6 +64,30 @@ class EDXMLWriter(object):
         def write(self, data):
             self.buffer.append(data)
 
+    class FlushBuffer(object):
+        # A buffer for collecting the output of the lxml xml writer
+        # until the flush policy of the writer decides to write the
+        # collected data into the actual output in a single write.
+
+        def __init__(self, output):
+            self.output = output
+            self.chunks = []
+            self.size = 0
+            self.num_elements = 0
+            self.last_flush = time.monotonic()
+
+        def write(self, data):
+            self.chunks.append(data)
+            self.size += len(data)
+
+        def flush_output(self):
+            if self.chunks:
+                self.output.write(b''.join(self.chunks))
+                self.chunks = []
+                self.size = 0
+            self.num_elements = 0
+            self.last_flush = time.monotonic()
+
     def __init__(self, output=sys.stdout.buffer, validate=True, log_repaired_events=False, pretty_print=True):
 
         super().__init__()
@@ -76,9 +104,22 @@ class EDXMLWriter(object):
         self.__validate = validate
         self.__output = output
 
+        # Flush policy, flushing the output after each element by default.
+        self.__flush_max_elements = 1           # type: Optional[int]
+        self.__flush_max_bytes = None           # type: Optional[int]
+        self.__flush_max_latency = None         # type: Optional[float]
+
         self.__num_events_repaired = 0
         self.__num_events_produced = 0
 
+        # Background writing thread and its state
+        self.__thread = None                    # type: Optional[Thread]
+        self.__queue = None                     # type: Optional[Queue]
+        self.__batch_size = 0
+        self.__pending = []
+        self.__background_error = None          # type: Optional[BaseException]
+        self.__background_failed = False
+
         self.__validator = EventValidator(self.__ontology)  # type: EventValidator
 
         if self.__output is None:
@@ -160,6 +201,83 @@ class EDXMLWriter(object):
 
         return self
 
+    def enable_background_writing(self, batch_size=1000, queue_size=10):
+        """
+
+        Enables writing in a background thread. After calling this method,
+        adding events does not validate and write them right away. Rather,
+        the events are collected into batches which are queued for a
+        background thread that validates, serializes and writes them. This
+        allows event producers, like transcoders reading input from a
+        network socket, to continue while previous events are written.
+
+        The queue holds at most queue_size batches. When the queue is
+        full, adding events blocks until the background thread catches up.
+
+        Since events are written later, errors like invalid events are not
+        raised by the method that added the offending event. Rather, the
+        error is raised by the next call to one of the methods for adding
+        events, adding ontologies, flushing or closing the writer. Any
+        events that were added after the offending event and before the
+        error is raised are discarded. Events added later are written.
+
+        Events that wrap an XML element, like the events produced by EDXML
+        parsers, are copied before queueing them, as are foreign elements.
+        That way, the background thread never touches XML trees that the
+        caller, like a parser reading more input, may still modify. Other
+        events are not copied, which means that these events must not be
+        modified after adding them.
+
+        Args:
+            batch_size (int): Number of events per batch
+            queue_size (int): Maximum number of queued batches
+
+        Returns:
+            edxml.writer.EDXMLWriter: The EDXMLWriter instance
+        """
+        if self.__thread is not None:
+            # Already enabled.
+            return self
+
+        self.__batch_size = batch_size
+        self.__queue = Queue(maxsize=queue_size)
+        self.__thread = Thread(target=self.__write_batches, name='EDXMLWriter', daemon=True)
+        self.__thread.start()
+
+        return self
+
+    def set_flush_policy(self, max_elements=1, max_bytes=None, max_latency=None):
+        """
+
+        Configures when the writer flushes its output. The writer collects
+        the XML data that it generates in an internal buffer. Flushing writes
+        the buffered data into the output in a single write. By default,
+        the output is flushed after writing each event, ontology or foreign
+        element, which minimizes latency for streaming applications. For
+        writing large amounts of data into files or pipes, buffering more
+        data reduces the number of writes.
+
+        The output is flushed as soon as the number of buffered elements
+        reaches max_elements, the amount of buffered data reaches max_bytes
+        or the time since the previous flush exceeds max_latency seconds,
+        whichever comes first. Limits that are set to None are disabled.
+        Note that the latency limit is only checked while writing elements.
+        When all limits are disabled, the output is only flushed when
+        explicitly calling the flush() method and when closing the writer.
+
+        Args:
+            max_elements (Optional[int]): Maximum number of buffered elements
+            max_bytes (Optional[int]): Maximum number of buffered bytes
+            max_latency (Optional[float]): Maximum time between flushes in seconds
+
+        Returns:
+            edxml.writer.EDXMLWriter: The EDXMLWriter instance
+        """
+        self.__flush_max_elements = max_elements
+        self.__flush_max_bytes = max_bytes
+        self.__flush_max_latency = max_latency
+        return self
+
     def get_output(self):
         return self.__output
 
@@ -174,22 +292,51 @@ class EDXMLWriter(object):
         raise EDXMLEventValidationError(error_message)
 
     def __write_coroutine(self):
-        """Coroutine which performs the actual XML serialisation"""
-        with etree.xmlfile(self.__output, encoding='utf-8') as writer:
+        """
+        Coroutine which performs the actual XML serialisation. Sending
+        None into the coroutine flushes the output.
+        """
+        buffer = self.FlushBuffer(self.__output)
+        with etree.xmlfile(buffer, encoding='utf-8') as writer:
             writer.write_declaration()
             with writer.element('edxml', version='3.0.0', nsmap=NAMESPACE_MAP):
                 writer.flush()
+                buffer.flush_output()
                 try:
                     while True:
                         # This is the main loop which generates the ontology elements,
                         # event elements and foreign elements.
-                        writer.write((yield), pretty_print=self.__pretty_print)
-                        writer.flush()
-                        if not self.__pretty_print:
-                            self.__output.write(b'\n')
+                        element = yield
+                        if element is None:
+                            writer.flush()
+                            buffer.flush_output()
+                            continue
+                        if isinstance(element, bytes):
+                            # Serialized elements bypass the lxml writer. Since
+                            # we flush the lxml writer after each element, the
+                            # data ends up in the buffer in the correct order.
+                            buffer.write(element)
+                        else:
+                            writer.write(element, pretty_print=self.__pretty_print)
+                            # Note that flushing the lxml writer only moves
+                            # the data into the buffer, which is cheap.
+                            writer.flush()
+                            if not self.__pretty_print:
+                                buffer.write(b'\n')
+                        buffer.num_elements += 1
+                        if self.__flush_max_elements is not None and \
+                                buffer.num_elements >= self.__flush_max_elements:
+                            buffer.flush_output()
+                        elif self.__flush_max_bytes is not None and buffer.size >= self.__flush_max_bytes:
+                            buffer.flush_output()
+                        elif self.__flush_max_latency is not None and \
+                                time.monotonic() - buffer.last_flush >= self.__flush_max_latency:
+                            buffer.flush_output()
                 except GeneratorExit:
                     # Coroutine was closed
                     pass
+        buffer.write(b'\n')
+        buffer.flush_output()
 
     def flush(self):
         """
@@ -198,9 +345,21 @@ class EDXMLWriter(object):
         that case, this method will return the content of the buffer
         and clear it. Otherwise, an empty string is returned.
 
+        When writing in the background, this method waits for
+        the background thread to finish writing all pending events.
+
+        Any data that is buffered according to the flush policy
+        is written into the output before returning.
+
         Returns:
             bytes: Generated EDXML data
         """
+        if self.__thread is not None:
+            self.__drain()
+
+        if self.__writer is not None:
+            self.__writer.send(None)
+
         if isinstance(self.__output, self.OutputBuffer):
             output = b''.join(self.__output.buffer)
             self.__output.buffer.clear()
@@ -220,6 +379,12 @@ class EDXMLWriter(object):
             edxml.writer.EDXMLWriter: The EDXMLWriter instance
         """
 
+        if self.__thread is not None:
+            # The background thread uses the ontology for validating
+            # events. We wait for it to write all pending events before
+            # updating the ontology.
+            self.__drain()
+
         # Below update triggers an exception in case the added
         # ontology is invalid or when it is incompatible with
         # the existing ontology.
@@ -272,8 +437,13 @@ class EDXMLWriter(object):
             # Already closed
             return
 
+        if self.__thread is not None:
+            self.__submit_pending()
+            self.__queue.put(None)
+            self.__thread.join()
+            self.__thread = None
+
         self.__writer.close()
-        self.__output.write(b'\n')
 
         if self.__num_events_produced > 0 and (100 * self.__num_events_repaired) / self.__num_events_produced > 10:
             log.warning(
@@ -284,9 +454,101 @@ class EDXMLWriter(object):
 
         self.__writer = None
 
+        self.__raise_background_error()
+
         return self
 
-    def _repair_event(self, event):
+    def __write_batches(self):
+        """
+        Main loop of the background writing thread. The thread
+        stops when it finds None in the queue.
+        """
+        while True:
+            batch = self.__queue.get()
+            try:
+                if batch is None:
+                    return
+                if not self.__background_failed:
+                    self.__write_batch(batch)
+            except BaseException as e:
+                # Any batches that are still queued must be discarded
+                # until the error has been raised in the main thread.
+                self.__background_error = e
+                self.__background_failed = True
+            finally:
+                self.__queue.task_done()
+
+    def __write_batch(self, batch):
+        """
+        Writes a batch of queued items. The items are tuples containing
+        an event, the sort flag and the validate flag. Foreign elements and
+        serialized events are queued as tuples containing the element or
+        the serialized data and None for both flags.
+        Consecutive events having the same flags are written as a group.
+        """
+        group = []
+        group_flags = None
+        for item, sort, validate in batch:
+            if group and (sort, validate) != group_flags:
+                self.__write_events(group, *group_flags)
+                group = []
+            if sort is None:
+                self.__writer.send(item)
+            else:
+                group.append(item)
+                group_flags = (sort, validate)
+        if group:
+            self.__write_events(group, *group_flags)
+
+    @staticmethod
+    def __copy_event_for_queue(event):
+        """
+        Returns a copy of events that wrap an XML element, which the
+        background thread can use without touching the XML tree of the
+        original event. Other events are returned as is.
+        """
+        if isinstance(event, (ParsedEvent, EventElement)):
+            return event.copy()
+        return event
+
+    def __enqueue(self, item):
+        self.__raise_background_error()
+        self.__pending.append(item)
+        if len(self.__pending) >= self.__batch_size:
+            self.__submit_pending()
+
+    def __submit_pending(self):
+        if self.__pending:
+            # Note that this blocks while the queue is full.
+            self.__queue.put(self.__pending)
+            self.__pending = []
+
+    def __drain(self):
+        """
+        Waits for the background thread to write all pending events.
+        """
+        self.__submit_pending()
+        self.__queue.join()
+        self.__raise_background_error()
+
+    def __raise_background_error(self):
+        """
+        Raises the error that occurred in the background thread, if
+        any. Events that were added before the error is raised are
+        discarded, events that are added afterwards are written.
+        """
+        if self.__background_error is None:
+            return
+        if self.__thread is not None:
+            # Wait for the background thread to discard
+            # the batches that are still in the queue.
+            self.__pending = []
+            self.__queue.join()
+        error, self.__background_error = self.__background_error, None
+        self.__background_failed = False
+        raise error
+
+    def _repair_event(self, event, event_element=None):
         """
 
         Tries to repair an invalid event by normalizing object
@@ -294,21 +556,36 @@ class EDXMLWriter(object):
         objects, it may try to remove invalid objects in case
         normalization fails.
 
+        The original event is not modified. Rather than copying the
+        full event, the repair is done on a copy that shares the object
+        value sets of the original. The repair code replaces object value
+        sets rather than modifying them, so only the properties that are
+        actually repaired are duplicated.
+
+        When the XML element of the event is given, the event is assumed
+        to have failed validation using that element as the most recent
+        validation. This saves generating and validating it again.
+
         Raises EDXMLEventValidationError in case the repair operation failed.
 
         Args:
             event (edxml.EDXMLEvent): The event
+            event_element (Optional[etree.Element]): The XML element of the invalid event
+
+        Returns:
+            edxml.EDXMLEvent: The repaired event
         """
 
-        # Do not modify the original event
-        event = deepcopy(event)
+        event = self._copy_event_for_repair(event)
 
-        valid = self.__validator.is_valid(event, event.get_element())
+        if event_element is None:
+            event_element = event.get_element()
+            valid = self.__validator.is_valid(event, event_element)
+        else:
+            valid = False
 
         while not valid:
 
-            original_event = deepcopy(event)
-
             try:
                 self._normalize_event(event)
             except EDXMLEventValidationError as e:
@@ -327,62 +604,75 @@ class EDXMLWriter(object):
                     # Raise the validation exception.
                     raise last_error.exception
 
-                offending_property_values_all = {str(v) for v in event[offending_property_name]}
-                offending_property_values_bad = [b.text for b in event.get_element().xpath(schema_error.path)]
+                # Note that the assignment below replaces the object value set, which
+                # means that the original objects remain available for logging.
+                original_objects = event[offending_property_name]
+                offending_property_values_all = {str(v) for v in original_objects}
+                offending_property_values_bad = [b.text for b in event_element.xpath(schema_error.path)]
                 event[offending_property_name] = offending_property_values_all.difference(offending_property_values_bad)
                 log.info(
                     'Repaired invalid property %s of event type %s (%s): %s => %s\n' % (
                         offending_property_name,
                         event.get_type_name(),
                         str(e),
-                        repr(original_event[offending_property_name]),
+                        repr(original_objects),
                         repr(event[offending_property_name])
                     )
                 )
 
-            valid = self.__validator.is_valid(event, event.get_element())
+            event_element = event.get_element()
+            valid = self.__validator.is_valid(event, event_element)
 
         self.__num_events_repaired += 1
 
         return event
 
+    @staticmethod
+    def _copy_event_for_repair(event):
+        """
+
+        Returns a copy of the event for repairing it. Events that
+        wrap an XML element are copied as a whole. Other events are
+        copied shallowly, sharing the object value sets of the original
+        event. The object value sets of the copy must not be modified,
+        only replaced, which does not affect the original event.
+
+        Args:
+            event (edxml.EDXMLEvent): The event
+
+        Returns:
+            edxml.EDXMLEvent: The copy
+        """
+        if isinstance(event, (ParsedEvent, EventElement)):
+            return event.copy()
+
+        copied = copy(event)
+        copied._properties = PropertySet()
+        for property_name, objects in event.get_properties().items():
+            copied._properties.replace_object_set(property_name, objects)
+        return copied
+
     def _normalize_event(self, event):
-        original_event = deepcopy(event)
+        property_names = self.__allow_repair_normalize.get(event.get_type_name(), [])
+        # Record the object value sets of the properties that may be normalized. Normalization
+        # replaces these sets, so the recorded sets hold the objects from before normalization.
+        original_objects = {name: event[name] for name in property_names if name in event}
         normalize_exception = None
         try:
             # Try to repair the event by normalizing the object values. This throws
             # an EDXMLEventValidationError in case any value does not make sense.
-            self.__ontology.get_event_type(event.get_type_name())\
-                .normalize_event_objects(event, self.__allow_repair_normalize.get(event.get_type_name(), []))
+            self.__ontology.get_event_type(event.get_type_name()).normalize_event_objects(event, property_names)
         except EDXMLEventValidationError as e:
             # Normalization failed, but it might have managed to correct one or more
             # objects before failing.
             normalize_exception = e
-        if event.get_properties() == original_event.get_properties():
+        if {name: event[name] for name in original_objects} == original_objects:
             # Properties did not change, normalization had no effect,
             raise normalize_exception or EDXMLEventValidationError(
                 "Attempt to normalize invalid event objects failed."
             )
 
-    def add_event(self, event, sort=False):
-        """
-
-        Adds specified event to the output data stream.
-
-        When the sort parameter is set to True, the properties,
-        attachments and event parents are sorted as required for
-        obtaining the event in its normal form as defined in the
-        EDXML specification. While this does not actually output
-        the events in their normal form, the sorting does make it
-        easier to spot relevant differences between events.
-
-        Args:
-          event (edxml.EDXMLEvent): The event
-          sort (bool): Sort event components yes or no
-
-        Returns:
-            edxml.writer.EDXMLWriter: The EDXMLWriter instance
-        """
+    def __check_event(self, event):
         event_type_name = event.get_type_name()
         source_uri = event.get_source_uri()
 
@@ -410,30 +700,74 @@ class EDXMLWriter(object):
                 'Attempt to add an event using unknown source URI: "%s"' % source_uri
             )
 
-        event_element = event.get_element(sort)
+    def __validate_event(self, event, event_element):
+        """
 
-        if self.__validate:
+        Validates the event, trying to repair it when it is invalid.
+        Returns the element that should be written into the output or
+        None in case an invalid event should be ignored.
+        """
+        try:
+            self.__validator.validate(event, event_element)
+        except EDXMLEventValidationError:
+            # Event does not validate.
+            if event.get_type_name() not in self.__allow_repair_normalize and not self.__ignore_invalid_events:
+                self.__generate_event_validation_exception(event_element)
+
+            # We will try to repair the event. The repair action works on a copy
+            # of the event, so we need to continue using the element of the copy.
             try:
-                self.__validator.validate(event, event_element)
-            except EDXMLEventValidationError:
-                # Event does not validate.
-                if event_type_name not in self.__allow_repair_normalize and not self.__ignore_invalid_events:
+                event = self._repair_event(event, event_element)
+                log.info('Event validated after repairing it.')
+                event_element = event.get_element()
+            except EDXMLEventValidationError as repair_error:
+                if self.__ignore_invalid_events:
+                    if self.__log_invalid_events:
+                        log.info(str(repair_error) + '\n\nContinuing anyways.\n')
+                    return None
+                else:
                     self.__generate_event_validation_exception(event_element)
 
-                # We will try to repair the event. Note that, since event_element
-                # is a reference to the internal lxml element, the repair action will manipulate
-                # event_element.
-                try:
-                    event = self._repair_event(event)
-                    log.info('Event validated after repairing it.')
-                    event_element = event.get_element()
-                except EDXMLEventValidationError as repair_error:
-                    if self.__ignore_invalid_events:
-                        if self.__log_invalid_events:
-                            log.info(str(repair_error) + '\n\nContinuing anyways.\n')
-                        return self
-                    else:
-                        self.__generate_event_validation_exception(event_element)
+        return event_element
+
+    def add_event(self, event, sort=False, validate=True):
+        """
+
+        Adds specified event to the output data stream.
+
+        When the sort parameter is set to True, the properties,
+        attachments and event parents are sorted as required for
+        obtaining the event in its normal form as defined in the
+        EDXML specification. While this does not actually output
+        the events in their normal form, the sorting does make it
+        easier to spot relevant differences between events.
+
+        Setting the validate parameter to False skips validating
+        the event even when the writer is configured to validate
+        its output. This is meant for events that are known to be
+        valid already, like unmodified events that were validated
+        by a parser using the same ontology.
+
+        Args:
+          event (edxml.EDXMLEvent): The event
+          sort (bool): Sort event components yes or no
+          validate (bool): Validate the event yes or no
+
+        Returns:
+            edxml.writer.EDXMLWriter: The EDXMLWriter instance
+        """
+        self.__check_event(event)
+
+        if self.__thread is not None:
+            self.__enqueue((self.__copy_event_for_queue(event), sort, validate))
+            return self
+
+        event_element = event.get_element(sort)
+
+        if self.__validate and validate:
+            event_element = self.__validate_event(event, event_element)
+            if event_element is None:
+                return self
 
         self.__writer.send(event_element)
 
@@ -441,6 +775,123 @@ class EDXMLWriter(object):
 
         return self
 
+    def add_events(self, events, sort=False):
+        """
+
+        Adds specified events to the output data stream. This is
+        equivalent to adding the events one by one using add_event(),
+        but validating the events is much more efficient. Events are
+        validated in groups of events of the same event type. Only for
+        groups that fail to validate, the events are validated and
+        repaired one at a time. The events are written in the order
+        of the input. Note that all events are checked for having a
+        known event type and event source before any of them is written.
+
+        Args:
+          events (Iterable[edxml.EDXMLEvent]): The events
+          sort (bool): Sort event components yes or no
+
+        Returns:
+            edxml.writer.EDXMLWriter: The EDXMLWriter instance
+        """
+        events = list(events)
+
+        for event in events:
+            self.__check_event(event)
+
+        if self.__thread is not None:
+            for event in events:
+                self.__enqueue((self.__copy_event_for_queue(event), sort, True))
+            return self
+
+        return self.__write_events(events, sort, validate=True)
+
+    def __write_events(self, events, sort, validate):
+        event_elements = [event.get_element(sort) for event in events]
+
+        invalid = set(self.__validator.find_invalid_events(events, event_elements)) \
+            if self.__validate and validate else ()
+
+        if invalid and self.__allow_repair_normalize:
+            self.__normalize_invalid_events(events, event_elements, invalid, sort)
+
+        for position, event_element in enumerate(event_elements):
+            if position in invalid:
+                event_element = self.__validate_event(events[position], event_element)
+                if event_element is None:
+                    continue
+
+            self.__writer.send(event_element)
+
+            self.__num_events_produced += 1
+
+        return self
+
+    def __normalize_invalid_events(self, events, event_elements, invalid, sort):
+        """
+        Tries to repair the invalid events at the specified positions by
+        normalizing them in bulk. Rather than repairing the events one by
+        one, the invalid events of each event type that has automatic
+        normalization enabled are copied and normalized at once, after
+        which the copies are validated in a single pass. The elements of
+        the copies that turn out to be valid replace the elements of the
+        original events and their positions are removed from the invalid
+        positions. Any remaining invalid events are left for the regular
+        event repair code.
+        """
+        positions_by_type = {}
+        for position in sorted(invalid):
+            event_type_name = events[position].get_type_name()
+            if event_type_name in self.__allow_repair_normalize:
+                positions_by_type.setdefault(event_type_name, []).append(position)
+
+        for event_type_name, positions in positions_by_type.items():
+            copies = [self._copy_event_for_repair(events[position]) for position in positions]
+            try:
+                self.__ontology.get_event_type(event_type_name).normalize_events(
+                    copies, self.__allow_repair_normalize[event_type_name]
+                )
+            except EDXMLEventValidationError:
+                # Normalization is enabled for a property that the event type
+                # does not have. The regular repair code will report it.
+                continue
+
+            copy_elements = [event.get_element(sort) for event in copies]
+            still_invalid = set(self.__validator.find_invalid_events(copies, copy_elements))
+
+            for index, position in enumerate(positions):
+                if index in still_invalid:
+                    continue
+                event_elements[position] = copy_elements[index]
+                invalid.discard(position)
+                self.__num_events_repaired += 1
+                log.info('Event validated after repairing it.')
+
+    def add_serialized_events(self, data):
+        """
+
+        Adds serialized events to the output data stream. The data
+        must be a sequence of event elements as written by another
+        EDXML writer, like the writer of a transcoder mediator running
+        in a worker process. The data is written into the output as
+        is, without validating it. It is up to the caller to make sure
+        that the events are valid and that the writer already wrote
+        an ontology containing the definitions that the events use.
+
+        Args:
+          data (bytes): Serialized event elements
+
+        Returns:
+            edxml.writer.EDXMLWriter: The EDXMLWriter instance
+        """
+        if self.__thread is not None:
+            self.__enqueue((data, None, None))
+            return self
+
+        self.__writer.send(data)
+
+        return self
+
     def add_foreign_element(self, element):
         """
 
@@ -452,6 +903,10 @@ class EDXMLWriter(object):
         Returns:
             edxml.writer.EDXMLWriter: The EDXMLWriter instance
         """
+        if self.__thread is not None:
+            self.__enqueue((deepcopy(element), None, None))
+            return self
+
         self.__writer.send(element)
 
         return self
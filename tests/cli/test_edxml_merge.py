@@ -0,0 +1,131 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+from io import BytesIO
+
+import pytest
+
+from edxml import EDXMLWriter, EDXMLEvent, EventCollection
+from edxml.cli.edxml_merge import EDXMLEventMerger, BufferingEDXMLEventMerger, main
+from edxml.ontology import Ontology
+
+
+class RecordingEventMerger(EDXMLEventMerger):
+    # Records the partitioning depths of merged partitions.
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.depths = []
+
+    def _merge_partition(self, partition, depth):
+        self.depths.append(depth)
+        super()._merge_partition(partition, depth)
+
+
+def generate_input(num_events, num_hashes):
+    ontology = Ontology()
+    ontology.create_object_type('string')
+    event_type = ontology.create_event_type('ea')
+    event_type.create_property('a', object_type_name='string').make_hashed()
+    event_type.create_property('b', object_type_name='string').make_optional().make_multivalued().merge_add()
+    ontology.create_event_source('/test/')
+
+    writer = EDXMLWriter(output=None)
+    writer.add_ontology(ontology)
+    for i in range(num_events):
+        writer.add_event(
+            EDXMLEvent({'a': str(i % num_hashes), 'b': str(i)}, event_type_name='ea', source_uri='/test/')
+        )
+    writer.close()
+    return writer.flush()
+
+
+@pytest.fixture()
+def edxml_input():
+    # Generate 600 events having 100 distinct sticky hashes.
+    return generate_input(600, 100)
+
+
+def merge(edxml_input, capsysbinary, batch_size=10, **kwargs):
+    capsysbinary.readouterr()
+    with RecordingEventMerger(batch_size=batch_size, **kwargs) as merger:
+        merger.parse(BytesIO(edxml_input))
+    return merger, EventCollection.from_edxml(capsysbinary.readouterr().out)
+
+
+@pytest.mark.parametrize('max_memory,recursive', [(200000, False), (5000, True)])
+def test_merge_max_memory(edxml_input, capsysbinary, max_memory, recursive):
+    _, expected = merge(edxml_input, capsysbinary)
+    merger, merged = merge(edxml_input, capsysbinary, max_memory=max_memory)
+
+    assert len(expected) == 100
+    assert merged.is_equivalent_of(expected)
+
+    # Each hash is one merge of six input events.
+    assert merger.num_merged == 500
+    assert {len(event['b']) for event in merged} == {6}
+
+    # Spilled events are merged one partition at a time. Partitions that
+    # do not fit into memory are partitioned further, increasing the depth.
+    assert merger.depths != []
+    assert (max(merger.depths) > 1) == recursive
+
+
+def test_merge_max_memory_growing_event(capsysbinary):
+    # All events have the same sticky hash. The merged event grows
+    # as events are merged into it. We use a single batch, which
+    # makes the size of the events estimated from the input size
+    # reflect the size of individual events.
+    edxml_input = generate_input(300, 1)
+
+    merger, merged = merge(edxml_input, capsysbinary, batch_size=1000, max_memory=20000)
+
+    assert merger.num_merged == 299
+    assert len(merged) == 1
+    assert len(merged[0]['b']) == 300
+
+    # The merged event does not fit into memory, which
+    # means that it must have been spilled to disk.
+    assert merger.depths != []
+
+
+def merge_buffered(edxml_input, capsysbinary, buffer_size, max_latency=None):
+    capsysbinary.readouterr()
+    with BufferingEDXMLEventMerger(buffer_size, max_latency) as merger:
+        for line in BytesIO(edxml_input):
+            merger.feed(line)
+    return EventCollection.from_edxml(capsysbinary.readouterr().out)
+
+
+def test_buffered_merge_writes_remaining_events(edxml_input, capsysbinary):
+    # The input size is no multiple of the buffer size, which leaves
+    # events in the buffer when the end of the input is reached.
+    merged = merge_buffered(edxml_input, capsysbinary, buffer_size=1000)
+
+    assert len(merged) == 100
+    assert {len(event['b']) for event in merged} == {6}
+
+
+def test_buffered_merge_without_max_latency(edxml_input, capsysbinary):
+    # Each buffer of 200 events contains two colliding events per hash.
+    merged = merge_buffered(edxml_input, capsysbinary, buffer_size=200, max_latency=None)
+
+    assert len(merged) == 300
+    assert {len(event['b']) for event in merged} == {2}
+
+
+def test_max_memory_with_buffer_is_rejected(monkeypatch, capsys):
+    monkeypatch.setattr('sys.argv', ['edxml-merge', '--buffer', '100', '--max-memory', '10'])
+    with pytest.raises(SystemExit):
+        main()
+    assert '--max-memory' in capsys.readouterr().err
@@ -0,0 +1,64 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+from edxml import EDXMLWriter, EDXMLEvent
+from edxml.cli.edxml_to_text import EDXMLEventPrinter
+from edxml.ontology import Ontology
+
+
+class StreamingInput(object):
+    # Returns the input in chunks, recording the number
+    # of lines that were output before reading each chunk.
+
+    def __init__(self, chunks, capsys):
+        self.chunks = list(chunks)
+        self.capsys = capsys
+        self.output = ''
+        self.num_lines_output = []
+
+    def read(self, size=-1):
+        self.output += self.capsys.readouterr().out
+        self.num_lines_output.append(len(self.output.splitlines()))
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def test_print_streaming_input(capsys):
+    ontology = Ontology()
+    ontology.create_object_type('string')
+    event_type = ontology.create_event_type('ea')
+    event_type.create_property('a', object_type_name='string')
+    event_type.set_story_template('Event [[a]].')
+    ontology.create_event_source('/test/')
+
+    writer = EDXMLWriter(output=None)
+    writer.add_ontology(ontology)
+    chunks = [writer.flush()]
+    for i in range(10):
+        writer.add_event(EDXMLEvent({'a': str(i)}, event_type_name='ea', source_uri='/test/'))
+        chunks.append(writer.flush())
+    writer.close()
+    chunks.append(writer.flush())
+
+    stream = StreamingInput(chunks, capsys)
+    with EDXMLEventPrinter() as printer:
+        printer.parse(stream)
+    stream.output += capsys.readouterr().out
+
+    assert stream.output.splitlines() == ['Event %d.' % i for i in range(10)]
+
+    # Even though the batch size is much larger than the number of events, the strings
+    # are output as the events arrive. Before reading the next chunk, the strings of
+    # the events in all but the last chunk that was read must have been output.
+    for num_chunks_read, num_lines_output in enumerate(stream.num_lines_output):
+        assert num_lines_output >= num_chunks_read - 2
+    assert stream.num_lines_output[-1] == 10
@@ -21,6 +21,7 @@ from IPy import IP
 from lxml import etree
 
 from edxml import EventCollection
+from edxml.error import EDXMLValidationError
 from edxml.event import EDXMLEvent, EventElement
 from edxml.event import ParsedEvent # noqa
 from edxml.logger import log
@@ -508,6 +509,62 @@ def test_compute_sticky_hash(event, ontology):
     assert event.compute_sticky_hash(event_type) == hash_hex
 
 
+@pytest.mark.parametrize('threads', [1, 2])
+def test_compute_sticky_hashes(event, ontology, threads):
+    ontology.create_event_source('/b/')
+    event_type = ontology.get_event_type(event.get_type_name())
+    event_type.create_property('unhashed', 'a').make_optional()
+    event['unhashed'] = 'x'
+
+    other = event.copy()
+    other['smiley'].add('🖤')
+    another = event.copy()
+    another.set_source('/b/')
+    events = [event, other, event.copy(), another]
+
+    hashes = event_type.compute_sticky_hashes(events, threads=threads)
+    assert hashes == [e.compute_sticky_hash(event_type) for e in events]
+    assert hashes[0] == hashes[2]
+    assert len({hashes[0], hashes[1], hashes[3]}) == 3
+
+    assert event_type.compute_sticky_hashes(events, hashlib.sha256, 'base64', threads) == \
+        [e.compute_sticky_hash(event_type, hashlib.sha256, 'base64') for e in events]
+
+    # Changes to the event type invalidate cached hashed property names.
+    event_type['unhashed'].make_hashed()
+    assert event_type.compute_sticky_hashes([event])[0] != hashes[0]
+
+
+def test_collection_compute_sticky_hashes(event, ontology):
+    other_type = ontology.create_event_type('other')
+    other_type.create_property('b', 'a').make_hashed()
+    other = EDXMLEvent({'b': 'b'}, event_type_name='other', source_uri=event.get_source_uri())
+
+    # The hashes are computed per event type, in
+    # the same order as the events in the collection.
+    events = EventCollection([event, other, event.copy()], ontology=ontology)
+    event_type = ontology.get_event_type(event.get_type_name())
+    assert events.compute_sticky_hashes() == [
+        event.compute_sticky_hash(event_type),
+        other.compute_sticky_hash(other_type),
+        event.compute_sticky_hash(event_type)
+    ]
+    assert events.evaluate_templates() == [
+        event_type.evaluate_template(event), other_type.evaluate_template(other), event_type.evaluate_template(event)
+    ]
+
+
+def test_collection_unknown_event_type(event, ontology):
+    unknown = EDXMLEvent({'b': 'b'}, event_type_name='unknown', source_uri=event.get_source_uri())
+    events = EventCollection([event, unknown], ontology=ontology)
+
+    with pytest.raises(EDXMLValidationError, match='unknown'):
+        events.compute_sticky_hashes()
+
+    with pytest.raises(EDXMLValidationError, match='unknown'):
+        events.evaluate_templates()
+
+
 def test_order_sensitivity_properties(event):
 
     o = Ontology()
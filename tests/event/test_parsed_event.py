@@ -188,3 +188,53 @@ def test_set_event_source(parsed_event):
     assert parsed_event.attrib['source-uri'] == "/a/"
     parsed_event.set_source('/b/')
     assert parsed_event.attrib['source-uri'] == "/b/"
+
+
+@pytest.mark.parametrize('modify', [
+    lambda event: event.__setitem__('b', ['x']),
+    lambda event: event['a'].add('b'),
+    lambda event: event.__delitem__('a'),
+    lambda event: event.set_properties({'a': {'b'}}),
+    lambda event: event.set_properties({}),
+    lambda event: event.set_properties({'a': []}),
+    lambda event: event.set_attachment('a', 'a'),
+    lambda event: event.set_parents([]),
+    lambda event: event.set_foreign_attributes({'{http://foreign/namespace}a': 'b'}),
+    lambda event: event.set_type('b'),
+    lambda event: event.set_source('/b/'),
+    lambda event: event.flush(),
+])
+def test_is_modified(parsed_event, modify):
+    assert not parsed_event.is_modified()
+    modify(parsed_event)
+    assert parsed_event.is_modified()
+    assert parsed_event.copy().is_modified()
+
+
+def test_reading_does_not_modify(parsed_event):
+    parsed_event.get_properties()
+    parsed_event.get_attachments()
+    parsed_event.get_element(sort=True)
+    assert not parsed_event.copy().is_modified()
+    assert not parsed_event.is_modified()
+
+
+def test_lazy_property_decoding(ontology):
+    ontology.create_object_type('b')
+    ontology.get_event_type('a').create_property('b', 'b').make_optional()
+    event = create_parsed_event(ontology, EDXMLEvent({'a': 'x', 'b': 'y'}, 'a', '/a/'))
+
+    properties = event.get_properties()
+    assert event['b'] == {'y'}
+    # Only the accessed property should have been decoded.
+    assert list(properties._object_sets.keys()) == ['b']
+
+    assert 'a' in event
+    assert 'c' not in event
+    assert len(event) == 2
+    assert properties.keys() == ['a', 'b']
+    assert properties == {'a': {'x'}, 'b': {'y'}}
+
+    event['b'].add('z')
+    assert {element.text for element in event.findall('e:properties/e:b', namespaces)} == {'y', 'z'}
+    assert event.copy() == event
@@ -12,9 +12,13 @@
 # ========================================================================================
 
 import os
+from copy import deepcopy
+
+import pytest
 
 from io import BytesIO
 from edxml import EDXMLPullFilter, EventCollection, EDXMLPushFilter
+from edxml.error import EDXMLEventValidationError
 
 
 class PullFilter(EDXMLPullFilter):
@@ -101,3 +105,57 @@ def test_edit_event():
 
     # We should have no events containing 'delete me' anymore.
     assert [event for event in output_events if 'delete me' in event['pa']] == []
+
+
+def test_unmodified_events_pass_through_unvalidated():
+    input_file = os.path.dirname(__file__) + '/input.edxml'
+
+    class EditingFilter(PullFilter):
+        def _parsed_event(self, event):
+            if 'delete me' in event['pa']:
+                event['pb'] = 'c'
+            super()._parsed_event(event)
+
+    with EditingFilter(BytesIO()) as edxml_filter:
+        edxml_filter.parse(input_file)
+
+    passthrough = [edxml_filter._is_passthrough_event(event) for event in edxml_filter.input_events]
+    assert passthrough == [True, False]
+
+
+@pytest.mark.parametrize('properties', [{}, {'pa': [], 'pb': []}])
+def test_emptied_events_are_validated(properties):
+    output = BytesIO()
+    input_file = os.path.dirname(__file__) + '/input.edxml'
+
+    class EmptyingFilter(PullFilter):
+        def _parsed_event(self, event):
+            if 'delete me' in event['pa']:
+                event.set_properties(properties)
+            super()._parsed_event(event)
+
+    with EmptyingFilter(output) as edxml_filter:
+        edxml_filter.parse(input_file)
+
+    passthrough = [edxml_filter._is_passthrough_event(event) for event in edxml_filter.input_events]
+    assert passthrough == [True, False]
+
+    output_events = EventCollection.from_edxml(output.getvalue())
+    assert [dict(event.get_properties()) for event in output_events] == [{'pa': {'a'}, 'pb': {'b'}}, {}]
+
+
+def test_altered_event_types_are_validated():
+    output = BytesIO()
+    input_file = os.path.dirname(__file__) + '/input.edxml'
+
+    class RestrictingFilter(PullFilter):
+        def _parsed_ontology(self, parsed_ontology, filtered_ontology=None):
+            filtered_ontology = deepcopy(parsed_ontology)
+            filtered_ontology.get_object_type('oa').set_data_type('string:1:mc')
+            super()._parsed_ontology(parsed_ontology, filtered_ontology)
+
+    with pytest.raises(EDXMLEventValidationError):
+        with RestrictingFilter(output) as edxml_filter:
+            edxml_filter.parse(input_file)
+
+    assert not edxml_filter._is_passthrough_event(edxml_filter.input_events[0])
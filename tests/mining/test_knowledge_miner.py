@@ -12,10 +12,13 @@
 # ========================================================================================
 
 import os
+from collections import defaultdict
+
 import pytest
 
 from dateutil.parser import parse
 from edxml.miner.knowledge import KnowledgeBase
+from edxml.miner.node import EventObjectNode
 from edxml.miner.parser import KnowledgePullParser, KnowledgePushParser
 
 
@@ -160,3 +163,64 @@ def test_from_json(knowledge_base):
     assert json['universals']['names'] == {'ob': {'b': {'oa': ['a']}}}
     assert json['universals']['descriptions'] == {'oc': {'c': {'oa': ['a']}}}
     assert json['universals']['containers'] == {'od': {'d': {'oa': ['a']}}}
+
+
+def reason_by_sorting(graph, seed, min_confidence=0.1, max_depth=10):
+    # Reference implementation of the reasoning process of the concept
+    # instance graph, which sorts the touched, unvisited nodes after each
+    # reasoning step to find the next node to visit. Nodes having equal
+    # confidences are ordered by depth and then in the order in which
+    # they were touched.
+    for node in graph._get_nodes():
+        node.depth = 0
+        node.visited = False
+
+    seed.visited = True
+    seed.seed_confidences[seed.id] = 1.0
+    seed.concept_name_equivalents = defaultdict(dict)
+    seed.concept_name_equivalents[seed.concept_name] = {seed.id: 1.0}
+
+    node = seed
+    touched = {}
+
+    while node is not None and node.seed_confidences[seed.id] >= min_confidence and node.depth < max_depth:
+        for edge in node.get_same_concept_inferences(seed, min_confidence):
+            if edge.target.visited:
+                continue
+            confidence = edge.compute_dijkstra_confidence(seed)
+            if confidence > min_confidence and confidence > edge.target.seed_confidences.get(seed.id, 0):
+                edge.reason(seed, confidence)
+                edge.target.depth = edge.source.depth + 1
+                touched[edge.target] = len(touched)
+
+        node.visited = True
+        touched.pop(node, None)
+
+        sorted_nodes = sorted(touched, key=lambda n: (-n.seed_confidences[seed.id], n.depth, touched[n]))
+        node = sorted_nodes[0] if sorted_nodes else None
+
+
+@pytest.mark.parametrize('input_file', ('input.edxml', 'input-timespan-start.edxml', 'input-timespan-end.edxml'))
+@pytest.mark.parametrize('max_depth', (1, 10))
+def test_reasoning_matches_sorting(input_file, max_depth):
+    # Reasoning picks the next node to visit from a priority queue. Here
+    # we verify that the results are identical to sorting the nodes, using
+    # each of the nodes of the mining fixtures as seed. A depth limit of one
+    # stops reasoning before visiting any of the touched nodes.
+    parser = KnowledgePullParser(KnowledgeBase())
+    parser.parse(os.path.dirname(__file__) + '/' + input_file)
+    graph = parser.miner._graph
+
+    seeds = [node for node in graph._get_nodes() if isinstance(node, EventObjectNode)]
+    assert len(seeds) == 4
+
+    for seed in seeds:
+        results = []
+        for reason in (graph._reason_from, lambda s, **kwargs: reason_by_sorting(graph, s, **kwargs)):
+            graph.reset()
+            graph._ensure_hubs(seed, seed, max_depth=max_depth)
+            reason(seed, max_depth=max_depth)
+            results.append({
+                node.id: (node.seed_confidences.get(seed.id), node.depth, node.visited) for node in graph._get_nodes()
+            })
+        assert results[0] == results[1]
@@ -12,7 +12,7 @@
 # ========================================================================================
 
 from edxml.miner.graph import ConceptInstanceGraph
-from edxml.miner.node import EventObjectNode
+from edxml.miner.node import EventObjectNode, Node
 from edxml.ontology import EventType, Ontology
 
 
@@ -209,3 +209,174 @@ def test_auto_mine():
     # needed for inference to use the intra-concept relation (confidence 2/10) but too high
     # to use the inferred concept c2 (again confidence 2/10) to jump from e1 to e2.
     assert len(mine_concepts([node_a, node_b], auto_mine=True)) == 2
+
+
+def test_reasoning_ties():
+    o = Ontology()
+    o.create_object_type(name='a')
+    o.create_concept(name='c1')
+
+    type_a = EventType(o, name='a')
+
+    names = ('p1', 'p2', 'p3', 'p4', 'p5')
+    associations = [attach_concept_property(type_a, name=name, concept_name='c1') for name in names]
+    properties = type_a.get_properties()
+
+    # We prepare two reasoning paths starting at a seed e1 which has four related
+    # properties. All nodes and relations have the same confidence, which means
+    # that the nodes on both paths are tied.
+    #
+    # Property:  p1 --> p2 --> p3
+    # Value:     a  --> b  --> c
+    #            |
+    #            |      p4 --> p5
+    #            +----> d  --> e
+    relations = {
+        (source, target): properties[source].relate_intra('related to', target)
+        for source, target in (('p1', 'p2'), ('p2', 'p3'), ('p1', 'p4'), ('p4', 'p5'))
+    }
+
+    nodes = {
+        name: EventObjectNode(
+            'e1', association, object_type_name='a', value=value, confidence=10, time_span=[None, None]
+        )
+        for name, value, association in zip(names, 'abcde', associations)
+    }
+
+    for (source, target), relation in relations.items():
+        nodes[source].link_relation(nodes[target], relation)
+
+    def mine_values(max_depth):
+        graph = ConceptInstanceGraph()
+        for node in nodes.values():
+            graph.add(node)
+        graph.reset()
+        graph.mine(nodes['p1'], max_depth=max_depth)
+        concept = next(iter(graph.extract_result_set().concepts.values()))
+        return sorted(attr.value for attr in concept.attributes)
+
+    # A depth limit of two stops reasoning when the first node at depth
+    # two is visited. Tied nodes are visited in order of depth, so both
+    # nodes at depth one have been visited by then. Both paths must
+    # be followed up to the nodes at depth two.
+    for _ in range(10):
+        assert mine_values(max_depth=2) == ['a', 'b', 'c', 'd', 'e']
+
+    # A depth limit of one stops reasoning before visiting
+    # any of the nodes touched from the seed.
+    assert mine_values(max_depth=1) == ['a', 'b', 'd']
+
+
+def test_seed_selection():
+    o = Ontology()
+    o.create_object_type(name='a')
+    o.create_concept(name='c1')
+
+    type_a = EventType(o, name='a')
+
+    # Create properties that identify the concept with different confidences.
+    strong = type_a.create_property('strong', object_type_name='a').identifies('c1', confidence=9)
+    weak = type_a.create_property('weak', object_type_name='a').identifies('c1', confidence=5)
+    related = type_a.create_property('related', object_type_name='a').identifies('c1', confidence=7)
+    relation = type_a.get_properties()['strong'].relate_intra('related to', 'related')
+
+    def create_node(event_id, association, value):
+        return EventObjectNode(
+            event_id, association, object_type_name='a', value=value, confidence=10, time_span=[None, None]
+        )
+
+    # Nodes a and c as well as b and e are tied. Node d is part of the same
+    # event as node c. Mining c taints d, which means that d will not be
+    # selected as a seed.
+    nodes = {
+        'a': create_node('e1', strong, 'a'),
+        'b': create_node('e2', weak, 'b'),
+        'c': create_node('e3', strong, 'c'),
+        'd': create_node('e3', related, 'd'),
+        'e': create_node('e4', weak, 'e'),
+    }
+    nodes['c'].link_relation(nodes['d'], relation)
+
+    graph = ConceptInstanceGraph()
+    for node in nodes.values():
+        graph.add(node)
+
+    graph.reset()
+
+    def find_optimal_seed_by_sorting():
+        # Reference implementation of seed selection, which sorts all nodes.
+        # Since the sort is stable, tied nodes are ordered as they were added.
+        seeds = sorted(
+            (node for node in graph._get_nodes() if isinstance(node, EventObjectNode) and node.taint <= 0),
+            key=lambda node: (1.0 - node.taint, node.concept_association.get_confidence()),
+            reverse=True
+        )
+        return seeds[0] if seeds else None
+
+    seeds = []
+    while True:
+        seed = graph.find_optimal_seed()
+        assert seed is find_optimal_seed_by_sorting()
+        if seed is None:
+            break
+        seeds.append(seed.value)
+        graph.mine(seed)
+        if len(seeds) == 1:
+            # Nodes that are added after mining the first seed
+            # should be considered for selecting the next seed.
+            nodes['f'] = create_node('e5', strong, 'f')
+            graph.add(nodes['f'])
+
+    # Strong seeds are selected first. Tied seeds are
+    # selected in the order they were added to the graph.
+    assert seeds == ['a', 'c', 'f', 'b', 'e']
+
+    result = graph.extract_result_set()
+    concepts = sorted(sorted(attr.value for attr in concept.attributes) for concept in result.concepts.values())
+
+    assert concepts == [['a'], ['b'], ['c', 'd'], ['e'], ['f']]
+
+
+def test_auto_mine_clears_touched_nodes_only(monkeypatch):
+    o = Ontology()
+    o.create_object_type(name='a')
+    o.create_concept(name='c1')
+
+    type_a = EventType(o, name='a')
+    type_a_p1_c1 = attach_concept_property(type_a, name='p1', concept_name='c1')
+
+    # Create a graph of unrelated events, each of which becomes a seed.
+    nodes = [
+        EventObjectNode(
+            f'e{i}', type_a_p1_c1, object_type_name='a', value=str(i), confidence=10, time_span=[None, None]
+        )
+        for i in range(100)
+    ]
+
+    graph = ConceptInstanceGraph()
+    for node in nodes:
+        graph.add(node)
+
+    # Count the number of nodes that are cleared for each seed.
+    resets = []
+    clear_edge_roles = Node.clear_edge_roles
+    set_seed = graph._set_seed
+
+    def count_reset(node):
+        resets[-1] += 1
+        clear_edge_roles(node)
+
+    def count_resets(seed, **kwargs):
+        resets.append(0)
+        set_seed(seed, **kwargs)
+
+    monkeypatch.setattr(Node, 'clear_edge_roles', count_reset)
+    monkeypatch.setattr(graph, '_set_seed', count_resets)
+
+    graph.mine()
+
+    # Only the seed of the previous concept and its shared
+    # object hub need to be cleared before mining the next one.
+    assert len(resets) == 100
+    assert max(resets) == 2
+    assert len(graph.extract_result_set().concepts) == 100
@@ -0,0 +1,161 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import random
+from io import BytesIO
+
+import pytest
+from lxml import etree
+from lxml.builder import ElementMaker
+
+from edxml import EventElement
+from edxml.error import EDXMLEventValidationError
+from edxml.event_validator import EventValidator
+from edxml.ontology import DataType, Ontology
+from edxml.ontology.util import translate_xsd_pattern
+
+data_types = [
+    ('datetime', None), ('sequence', None), ('boolean', None),
+    ('number:tinyint', None), ('number:tinyint:signed', None),
+    ('number:smallint', None), ('number:smallint:signed', None),
+    ('number:mediumint', None), ('number:mediumint:signed', None),
+    ('number:int', None), ('number:int:signed', None),
+    ('number:bigint', None), ('number:bigint:signed', None),
+    ('number:float', None), ('number:float:signed', None),
+    ('number:double', None), ('number:double:signed', None),
+    ('number:decimal:5:2', None), ('number:decimal:5:2:signed', None),
+    ('number:decimal:3:0:signed', None), ('number:currency', None),
+    ('string:0:mc', None), ('string:5:mc', None), ('string:0:lc', None), ('string:0:uc', None),
+    ('string:0:mc:u', None), ('string:0:lc:u', None), ('string:0:uc:u', None),
+    ('string:10:mc:ru', r'[a-z]+\d?'), ('string:0:mc', r'a.b|c*'),
+    ('base64:5', None), ('enum:a:b:c d', None), ('uri:/', None), ('file', None),
+    ('hex:4', None), ('hex:4:1:-', None), ('hex:6:1::', None), ('hex:4:2:.', None),
+    ('uuid', None), ('geo:point', None), ('ip:v4', None), ('ip:v6', None),
+]
+
+valid_values = [
+    '2020-02-29T23:59:59.999999Z', '1583-01-01T00:00:00.000000Z', '0', '127', '-128', '255', '-8388607', '16777215',
+    '9223372036854775807', '18446744073709551615', '1.5', '1E+5', '-1.5E-10', '0.00', '-0.50', '123.45', '5.',
+    '1234.5678', 'true', 'false', 'a', 'c d', 'abc', 'ABC', 'a1', 'axb', 'ccc', 'QUJD', 'QUI=', 'QQ==',
+    'http://a.b:80/c', '/x/y', 'a/b', '01234567', '01-23-45-67', '01:02:03:04:05:06', '0123.4567',
+    '01234567-89ab-cdef-0123-456789abcdef', '52.123456,4.123456', '-90.000000,0.000000', '1.2.3.4',
+    '0000:0000:0000:0000:0000:0000:0000:0001', '\xb5\xdf', '\xc0\xd7', 'ā',
+]
+
+mutations = list('0123456789abcdefABCDEFXYZ-+.:/,=E T\t\n\\%?#@[]|()') + ['\xaa', '\xba', '\xff', 'Ā', '==']
+
+
+def generate_schema(data_type, regexp):
+    e = ElementMaker()
+    grammar = e.grammar(
+        e.start(e.element(data_type.generate_relaxng(regexp), name='value')),
+        xmlns='http://relaxng.org/ns/structure/1.0',
+        datatypeLibrary='http://www.w3.org/2001/XMLSchema-datatypes',
+    )
+    return etree.RelaxNG(etree.parse(BytesIO(etree.tostring(grammar))))
+
+
+def mutate(value, rng):
+    chars = list(value)
+    for _ in range(rng.randint(0, 3)):
+        operation = rng.random()
+        if operation < 0.4 and chars:
+            chars[rng.randrange(len(chars))] = rng.choice(mutations)
+        elif operation < 0.7:
+            chars.insert(rng.randint(0, len(chars)), rng.choice(mutations))
+        elif chars:
+            del chars[rng.randrange(len(chars))]
+    return ''.join(chars)
+
+
+@pytest.mark.parametrize('data_type,regexp', data_types)
+def test_data_type_validator_agrees_with_schema(data_type, regexp):
+    data_type = DataType(data_type)
+    validator = data_type.generate_validator(regexp)
+    schema = generate_schema(data_type, regexp)
+
+    rng = random.Random(data_type.get())
+    values = valid_values + [mutate(rng.choice(valid_values), rng) for _ in range(1000)]
+
+    accepted = 0
+    for value in values:
+        if validator(value):
+            accepted += 1
+            element = etree.Element('value')
+            element.text = value
+            # The validator must never accept values
+            # that are rejected by the schema.
+            assert schema.validate(element), value
+
+    assert accepted > 0
+
+
+def test_data_type_validator_unsupported_pattern():
+    assert DataType.string().generate_validator(r'\p{Lu}+') is None
+    assert DataType.string().generate_validator(r'[A-Z]+') is not None
+
+
+def test_translate_xsd_pattern():
+    assert translate_xsd_pattern(r'\d{2}') == '[0-9]{2}'
+    assert translate_xsd_pattern('^a$') == r'\^a\$'
+    assert translate_xsd_pattern(r'(ab|c)*') == '(ab|c)*'
+    assert translate_xsd_pattern(r'[a-z-[aeiou]]') is None
+    assert translate_xsd_pattern(r'\w+') is None
+    assert translate_xsd_pattern(r'a**') is None
+
+
+@pytest.fixture()
+def ontology():
+    ontology = Ontology()
+    ontology.create_object_type('a', data_type='string:0:mc:u')
+    ontology.create_object_type('b', data_type='number:int:signed')
+    ontology.create_event_source('/a/')
+    event_type = ontology.create_event_type('ea')
+    event_type.create_property('a', 'a').make_mandatory().make_multivalued()
+    event_type.create_property('b', 'b').make_optional().make_single_valued()
+    event_type.create_attachment('c').set_encoding_base64()
+    return ontology
+
+
+def test_event_type_validator(ontology):
+    validator = ontology.get_event_type('ea').generate_validator(ontology, namespaced=False)
+
+    valid = EventElement({'a': ['x', 'y'], 'b': '-1'}, 'ea', '/a/', attachments={'c': {'1': 'QUJDRA=='}})
+    assert validator(valid.get_element())
+
+    for invalid in [
+        EventElement({'b': '1'}, 'ea', '/a/'),
+        EventElement({'a': 'x', 'b': ['1', '2']}, 'ea', '/a/'),
+        EventElement({'a': 'x', 'b': '01'}, 'ea', '/a/'),
+        EventElement({'a': 'x'}, 'ea', '/a/', attachments={'c': {'1': 'QUJD'}}),
+        EventElement({'a': 'x'}, 'ea', 'a'),
+    ]:
+        assert not validator(invalid.get_element())
+
+    # Namespaced validators reject events that lack a namespace.
+    assert not ontology.get_event_type('ea').generate_validator(ontology)(valid.get_element())
+
+
+def test_event_validator_engines_raise_same_error(ontology):
+    event = EventElement({'a': 'x', 'b': 'foo'}, 'ea', '/a/')
+
+    messages = []
+    for compiled in (True, False):
+        validator = EventValidator(ontology, compiled=compiled)
+        assert validator.is_valid(EventElement({'a': 'x', 'b': '1'}, 'ea', '/a/'))
+        with pytest.raises(EDXMLEventValidationError) as error:
+            validator.validate(event)
+        messages.append(str(error.value))
+        assert validator.get_last_error().property_name == 'b'
+
+    assert messages[0] == messages[1]
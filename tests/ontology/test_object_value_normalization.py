@@ -14,8 +14,9 @@
 from datetime import datetime
 
 import pytest
+from edxml import EDXMLEvent
 from edxml.error import EDXMLEventValidationError
-from edxml.ontology import DataType
+from edxml.ontology import DataType, Ontology
 
 
 def test_normalize_datetime():
@@ -25,6 +26,87 @@ def test_normalize_datetime():
     with pytest.raises(EDXMLEventValidationError):
         DataType.datetime().normalize_objects({'foo'})
 
+    # Values that are formatted like normalized values are
+    # not normalized, but they must still be valid.
+    assert DataType.datetime().normalize_objects({'1978-06-17T12:13:14.123456Z'}) == {'1978-06-17T12:13:14.123456Z'}
+    with pytest.raises(EDXMLEventValidationError):
+        DataType.datetime().normalize_objects({'1978-13-17T12:13:14.123456Z'})
+
+
+def test_normalize_modified_data_type():
+    data_type = DataType.string(lower_case=True, upper_case=False)
+    assert data_type.normalize_objects({'Foo'}) == {'foo'}
+
+    data_type.type = DataType.string(lower_case=False, upper_case=True).type
+    assert data_type.normalize_objects({'Foo'}) == {'FOO'}
+
+
+def test_normalize_overridden_methods():
+    class ReversingDataType(DataType):
+        def _normalize_string(self, values):
+            return {value[::-1] for value in values}
+
+        def _validate_value_string(self, value):
+            if value == 'bar':
+                raise EDXMLEventValidationError('Invalid value: bar')
+
+    data_type = ReversingDataType(DataType.string().type)
+    assert data_type.normalize_objects({'foo'}) == {'oof'}
+
+    with pytest.raises(EDXMLEventValidationError):
+        data_type.validate_object_value('bar')
+
+
+def test_normalize_values():
+    data_type = DataType.int()
+    assert data_type.normalize_values([2, '2', 2.0, True, '3', 2]) == ['2', '2', '2', '1', '3', '2']
+
+    data_type = DataType.string()
+    assert data_type.normalize_values([1, 1.0, True, 'Foo']) == ['1', '1.0', 'True', 'Foo']
+
+    # Valid values are left untouched.
+    data_type = DataType.datetime()
+    assert data_type.normalize_values(['1978-06-17T12:13:14.123456Z', datetime(1978, 6, 17)]) == \
+        ['1978-06-17T12:13:14.123456Z', '1978-06-17T00:00:00.000000Z']
+
+    with pytest.raises(EDXMLEventValidationError):
+        data_type.normalize_values(['1978-06-17', 'foo'])
+
+
+@pytest.mark.parametrize('data_type,value', [
+    (DataType.int(signed=True), '01'),
+    (DataType.int(signed=True), '+1'),
+    (DataType.double(), '1.5'),
+    (DataType.double(), '1E5'),
+])
+def test_normalize_values_valid_but_not_normalized(data_type, value):
+    # These values are valid, but they are not normalized.
+    assert data_type.normalize_values([value]) == list(data_type.normalize_objects({value}))
+    assert data_type.normalize_values([value]) != [value]
+
+
+def test_normalize_events():
+    ontology = Ontology()
+    ontology.create_object_type('int', data_type=DataType.int().get())
+    event_type = ontology.create_event_type('ea')
+    event_type.create_property('a', 'int').make_multivalued()
+
+    events = [
+        EDXMLEvent({'a': [1.2, '3']}, event_type_name='ea'),
+        EDXMLEvent({'a': ['foo', 4]}, event_type_name='ea'),
+        EDXMLEvent({}, event_type_name='ea'),
+    ]
+
+    event_type.normalize_events(events, ['a'])
+
+    assert events[0]['a'] == {'1', '3'}
+    # Events containing values that cannot be normalized are left as is.
+    assert events[1]['a'] == {'foo', 4}
+    assert 'a' not in events[2]
+
+    with pytest.raises(EDXMLEventValidationError, match='has no property'):
+        event_type.normalize_events(events, ['b'])
+
 
 def test_normalize_number_integer():
 
@@ -11,6 +11,8 @@
 #                                                                                        =
 # ========================================================================================
 
+import copy
+
 import pytest
 from edxml.ontology import Ontology
 
@@ -30,6 +32,31 @@ def test_ontology_versioning():
     assert ontology.get_version() == 0
 
 
+def test_ontology_modification_callback():
+    ontology = Ontology()
+    modifications = []
+    ontology.add_modification_callback(lambda: modifications.append(ontology.get_version()))
+
+    ontology.create_concept('c')
+    source = ontology.create_event_source('/source/')
+
+    assert modifications == [1, 2]
+
+    # Modifying a child of the ontology also modifies the ontology.
+    source.set_description('changed')
+
+    assert modifications == [1, 2, 3]
+
+    # Copies do not invoke the callbacks of the original.
+    copy.deepcopy(ontology).create_concept('d')
+
+    assert modifications == [1, 2, 3]
+
+    ontology.clear()
+
+    assert modifications == [1, 2, 3, 0]
+
+
 def test_ontology_repr():
     ontology = Ontology()
     ontology.create_object_type('o')
@@ -13,7 +13,7 @@
 import sys
 import pytest
 
-from edxml import Template
+from edxml import EDXMLEvent, Template
 from edxml.error import EDXMLOntologyValidationError
 from edxml.ontology import Ontology, DataType
 
@@ -63,6 +63,71 @@ def test_colorized_interpolation(event_type, monkeypatch):
     assert Template('value is [[p-string]].').evaluate(event_type, event_properties, {}, colorize=True) != uncolored
 
 
+def test_reuse_template(event_type):
+
+    template = Template('Value is [[p-string]]{ or [[unless_empty:p-float,not]] empty}.')
+
+    assert template.evaluate(event_type, {'p-string': {'foo'}}, {}) == 'Value is foo.'
+    assert template.evaluate(event_type, {'p-string': {'bar'}, 'p-float': {'1'}}, {}) == 'Value is bar or not empty.'
+    assert template.evaluate(event_type, {'p-string': {'foo'}}, {}) == 'Value is foo.'
+
+
+def test_evaluate_event_type_template(event_type):
+
+    event = EDXMLEvent({'p-string': ['foo']})
+
+    event_type.set_story_template('Value is [[p-string]].')
+    assert event_type.evaluate_template(event) == 'Value is foo.'
+
+    event_type.set_story_template('Changed value is [[p-string]].')
+    assert event_type.evaluate_template(event) == 'Changed value is foo.'
+
+
+def test_evaluate_event_type_templates(event_type):
+
+    events = [
+        EDXMLEvent({'p-string': ['foo'], 'p-float': ['1.5E+0']}),
+        EDXMLEvent({'p-string': ['bar']}),
+        EDXMLEvent({}),
+    ]
+
+    event_type.set_summary_template('Value is [[p-string]]{ and [[p-float]]}.')
+
+    evaluated = event_type.evaluate_templates(events, which='summary')
+
+    assert evaluated == [event_type.evaluate_template(event, which='summary') for event in events]
+    assert evaluated == ['Value is foo and 1.500000.', 'Value is bar.', '']
+
+    # The object values of the events must not be modified while rendering.
+    assert events[0]['p-float'] == {'1.5E+0'}
+
+
+def test_value_cache(event_type):
+
+    Template.set_value_cache_size(2)
+    template = Template('Time is [[date_time:p-time-start,second]].')
+    event_properties = {'p-time-start': {'2020-11-25T23:47:10.123456Z'}}
+
+    try:
+        assert template.evaluate(event_type, event_properties, {}) == \
+               'Time is Wednesday, November 25 2020 at 23:47:10h.'
+        assert template.evaluate(event_type, event_properties, {}) == \
+               'Time is Wednesday, November 25 2020 at 23:47:10h.'
+        assert Template.get_value_cache_info().hits == 1
+        assert Template.get_value_cache_info().misses == 1
+
+        for second in range(10):
+            template.evaluate(event_type, {'p-time-start': {f"2020-11-25T23:47:{second:02}.0Z"}}, {})
+        assert Template.get_value_cache_info().currsize == 2
+
+        # Invalid values are not cached.
+        with pytest.raises(ValueError):
+            template.evaluate(event_type, {'p-time-start': {'foo'}}, {})
+        assert template.evaluate(event_type, {'p-time-start': {'foo'}}, {}, ignore_value_errors=True) == 'Time is foo.'
+    finally:
+        Template.set_value_cache_size(Template.DEFAULT_VALUE_CACHE_SIZE)
+
+
 def test_get_properties(event_type):
     assert set(Template('Value is [[p-string]] or [[p-bool]].').get_property_names()) == {'p-string', 'p-bool'}
 
@@ -16,7 +16,7 @@ from glob import glob
 
 import pytest
 
-from edxml import EDXMLPullParser
+from edxml import EDXMLPullParser, EDXMLParallelPullParser
 from edxml.error import EDXMLValidationError, EDXMLOntologyValidationError, EDXMLEventValidationError
 from edxml_test_corpus import CORPUS_PATH
 
@@ -114,3 +114,15 @@ def test_parse_invalid_event(invalid_event_corpus_item):
 
     # Parser must have raised a validation error.
     assert e is not None
+
+
+def test_parse_invalid_event_parallel(invalid_event_corpus_item):
+    e = None
+    try:
+        with EDXMLParallelPullParser(workers=2) as parser:
+            parser.parse(invalid_event_corpus_item['path'])
+    except EDXMLEventValidationError as ex:
+        e = ex
+
+    # Parser must have raised a validation error.
+    assert e is not None
@@ -0,0 +1,92 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import os
+from glob import glob
+
+import pytest
+
+from edxml import EDXMLPullParser
+from edxml.event_validator import EventValidator
+from edxml_test_corpus import CORPUS_PATH
+
+# List of corpus directories corresponding to the EDXML
+# versions that we support.
+versions = ['3/3.0/3.0.0']
+
+
+def generate_corpus_fixture_params():
+    params = []
+    for version_dir in versions:
+        params.extend(sorted(glob(CORPUS_PATH + version_dir + '/valid/*/*.edxml')))
+        params.extend(sorted(glob(CORPUS_PATH + version_dir + '/invalid/event/*.edxml')))
+    return params
+
+
+class ValidatingParser(EDXMLPullParser):
+    """
+    Parser that checks each event using both the compiled validators
+    and the RelaxNG schemas, without validating events by itself.
+    """
+    def __init__(self):
+        super().__init__(validate=False)
+        self.results = []
+
+    def _parsed_event(self, event):
+        ontology = self.get_ontology()
+        event_type = ontology.get_event_type(event.get_type_name())
+        if event_type is None:
+            return
+        compiled = event_type.generate_validator(ontology, namespaced=True)
+        self.results.append(
+            (
+                compiled is not None and compiled(event),
+                EventValidator(ontology, compiled=True).is_valid(event),
+                EventValidator(ontology, compiled=False).is_valid(event)
+            )
+        )
+
+
+@pytest.fixture(params=generate_corpus_fixture_params(), ids=lambda path: os.path.relpath(path, CORPUS_PATH))
+def corpus_path(request):
+    return request.param
+
+
+def test_validation_engines_agree(corpus_path):
+    with ValidatingParser() as parser:
+        try:
+            parser.parse(corpus_path, ('{http://foreign/namespace}event',))
+        except Exception:
+            # Some invalid corpus items fail to parse
+            # for reasons other than invalid events.
+            pass
+
+    for compiled_valid, valid, schema_valid in parser.results:
+        # The compiled validator must never accept an
+        # event that is rejected by the RelaxNG schema.
+        assert schema_valid or not compiled_valid
+        assert valid == schema_valid
+
+
+def test_compiled_validators_accept_valid_corpus():
+    accepted = []
+    for path in generate_corpus_fixture_params():
+        if '/valid/' not in path:
+            continue
+        with ValidatingParser() as parser:
+            parser.parse(path, ('{http://foreign/namespace}event',))
+        accepted.extend(compiled_valid for compiled_valid, _, _ in parser.results)
+
+    # Nearly all events in the corpus should be
+    # accepted without resorting to RelaxNG.
+    assert sum(accepted) > 0.9 * len(accepted)
@@ -0,0 +1,100 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import os
+from io import BytesIO
+
+import pytest
+
+from edxml import EDXMLParallelPullParser, EDXMLWriter, EventElement
+from edxml.error import EDXMLEventValidationError
+from edxml.ontology import Ontology, DataType
+
+
+@pytest.fixture()
+def ontology():
+    edxml_ontology = Ontology()
+    edxml_ontology.create_object_type('int', data_type=DataType.int().type)
+    edxml_ontology.create_event_type('ea').create_property('a', object_type_name='int')
+    edxml_ontology.create_event_source('/test/')
+    return edxml_ontology
+
+
+def generate_edxml(ontology, values):
+    output = BytesIO()
+    with EDXMLWriter(output, validate=False) as writer:
+        writer.add_ontology(ontology)
+        for value in values:
+            writer.add_event(EventElement({'a': value}, event_type_name='ea', source_uri='/test/'))
+    output.seek(0)
+    return output
+
+
+def test_basic_parallel_parsing():
+    with EDXMLParallelPullParser(workers=2) as parser:
+        parser.parse(os.path.dirname(__file__) + '/input.edxml')
+        assert parser.get_event_counter() == 2
+        assert parser.get_event_type_counter('ea') == 1
+        assert parser.get_event_type_counter('eb') == 1
+
+
+@pytest.mark.parametrize('validate', [True, False])
+def test_parallel_parsing_preserves_event_order(ontology, validate):
+    parsed = []
+    with EDXMLParallelPullParser(validate=validate, workers=2, chunk_size=7) as parser:
+        parser.set_event_type_handler(['ea'], lambda event: parsed.append(event.get_any('a')))
+        parser.parse(generate_edxml(ontology, [str(value) for value in range(100)]))
+
+    assert parsed == [str(value) for value in range(100)]
+
+
+def test_unordered_parallel_parsing(ontology):
+    parsed = []
+    with EDXMLParallelPullParser(workers=2, chunk_size=7, ordered=False) as parser:
+        parser.set_event_type_handler(['ea'], lambda event: parsed.append(event.get_any('a')))
+        parser.parse(generate_edxml(ontology, [str(value) for value in range(100)]))
+
+    assert sorted(parsed) == sorted(str(value) for value in range(100))
+
+
+def test_parallel_parsing_invalid_event(ontology):
+    parsed = []
+    values = [str(value) for value in range(100)]
+    values[42] = 'invalid'
+    with pytest.raises(EDXMLEventValidationError, match='Event failed to validate'):
+        with EDXMLParallelPullParser(workers=2, chunk_size=7) as parser:
+            parser.set_event_type_handler(['ea'], lambda event: parsed.append(event.get_any('a')))
+            parser.parse(generate_edxml(ontology, values))
+
+    # All events preceding the invalid event must have been processed.
+    assert parsed == values[:42]
+
+
+def test_parallel_parsing_ontology_update(ontology):
+    # Below input contains a second ontology element that adds a
+    # new event type, followed by an event of that event type.
+    first = generate_edxml(ontology, ['1', '2']).getvalue()
+    ontology.create_event_type('eb').create_property('b', object_type_name='int')
+    second = BytesIO()
+    with EDXMLWriter(second, validate=False) as writer:
+        writer.add_ontology(ontology)
+        writer.add_event(EventElement({'b': '3'}, event_type_name='eb', source_uri='/test/'))
+    first_body = first[:first.rindex(b'</edxml>')]
+    second_body = second.getvalue()[second.getvalue().index(b'<ontology>'):]
+
+    parsed = []
+    with EDXMLParallelPullParser(workers=2, chunk_size=1) as parser:
+        parser.set_event_type_handler(['ea', 'eb'], lambda event: parsed.append(event.get_type_name()))
+        parser.parse(BytesIO(first_body + second_body))
+
+    assert parsed == ['ea', 'ea', 'eb']
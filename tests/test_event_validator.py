@@ -0,0 +1,100 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import pytest
+
+from edxml import EventElement
+from edxml.event_validator import EventValidator
+from edxml.ontology import Ontology
+
+
+@pytest.fixture()
+def ontology():
+    ontology = Ontology()
+    ontology.create_object_type('a')
+    ontology.create_object_type('b')
+    ontology.create_event_source('/a/')
+    ontology.create_event_type('ea').create_property('a', 'a')
+    ontology.create_event_type('eb').create_property('b', 'b')
+    return ontology
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_schema_cache_hits(ontology, compiled):
+    validator = EventValidator(ontology, compiled=compiled)
+
+    validator.validate(EventElement({'a': 'x'}, 'ea', '/a/'))
+    validator.validate(EventElement({'a': 'y'}, 'ea', '/a/'))
+
+    statistics = validator.get_cache_statistics()
+    assert statistics['misses'] == 1
+    assert statistics['hits'] == 1
+    assert statistics['compile_time'] > 0
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_unrelated_ontology_change_keeps_cache(ontology, compiled):
+    validator = EventValidator(ontology, compiled=compiled)
+    validator.validate(EventElement({'a': 'x'}, 'ea', '/a/'))
+
+    # Changes that do not affect event type 'ea'.
+    ontology.create_event_source('/b/')
+    ontology.get_object_type('b').set_data_type('string:10:mc')
+    ontology.get_event_type('eb').create_property('c', 'a')
+
+    validator.validate(EventElement({'a': 'x'}, 'ea', '/a/'))
+    assert validator.get_cache_statistics()['misses'] == 1
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_ontology_change_invalidates_cache(ontology, compiled):
+    validator = EventValidator(ontology, compiled=compiled)
+    assert validator.is_valid(EventElement({'a': 'abc'}, 'ea', '/a/'))
+
+    ontology.get_object_type('a').set_data_type('string:2:mc')
+    assert not validator.is_valid(EventElement({'a': 'abc'}, 'ea', '/a/'))
+
+    ontology.get_event_type('ea').create_property('c', 'b').make_mandatory()
+    assert not validator.is_valid(EventElement({'a': 'ab'}, 'ea', '/a/'))
+    assert validator.is_valid(EventElement({'a': 'ab', 'c': 'x'}, 'ea', '/a/'))
+
+
+def test_replaced_event_type_invalidates_cache(ontology):
+    validator = EventValidator(ontology)
+    assert validator.is_valid(EventElement({'a': 'x'}, 'ea', '/a/'))
+
+    ontology.delete_event_type('ea')
+    ontology.create_event_type('ea').create_property('b', 'b')
+
+    assert not validator.is_valid(EventElement({'a': 'x'}, 'ea', '/a/'))
+    assert validator.is_valid(EventElement({'b': 'x'}, 'ea', '/a/'))
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_find_invalid_events(ontology, compiled):
+    ontology.get_object_type('b').set_data_type('string:2:mc')
+    validator = EventValidator(ontology, compiled=compiled)
+
+    events = [
+        EventElement({'a': 'x'}, 'ea', '/a/'),
+        EventElement({'b': 'xyz'}, 'eb', '/a/'),
+        EventElement({'a': 'x', 'b': 'x'}, 'ea', '/a/'),
+        EventElement({'b': 'xy'}, 'eb', '/a/'),
+    ]
+
+    assert validator.find_invalid_events(events) == [1, 2]
+    assert validator.find_invalid_events([events[0], events[3]]) == []
+
+    # Validating the events must leave them intact.
+    assert all(event.get_element().getparent() is None for event in events)
+    assert validator.is_valid(events[0])
@@ -14,7 +14,7 @@
 import pytest
 
 from io import BytesIO
-from edxml import EDXMLWriter, EventCollection, EDXMLEvent
+from edxml import EDXMLWriter, EventCollection, EDXMLEvent, EDXMLPullParser
 from edxml.error import EDXMLEventValidationError, EDXMLOntologyValidationError
 from edxml.ontology import Ontology, DataType
 from lxml import etree
@@ -267,6 +267,37 @@ def test_write_invalid_event_repair_normalize_integer(ontology, event, caplog):
     assert '1 out of 1 events were automatically repaired' in ''.join(caplog.messages)
 
 
+def test_write_invalid_events_repair_normalize_bulk(ontology, event, caplog):
+    # Note: Property 'c' has data type 'int'
+    events = []
+    for value in ['1', 2.0, '3', 4.2]:
+        events.append(event.copy())
+        events[-1].properties['c'] = {value}
+
+    with EDXMLWriter(output=None) as writer:
+        writer.enable_auto_repair_normalize('ea', ['c'])
+        writer.add_ontology(ontology).add_events(events)
+
+    output = EventCollection.from_edxml(writer.flush())
+
+    # The writer should have normalized the invalid events only,
+    # leaving the original events unmodified.
+    assert [event['c'] for event in output] == [{'1'}, {'2'}, {'3'}, {'4'}]
+    assert [event['c'] for event in events] == [{'1'}, {2.0}, {'3'}, {4.2}]
+
+    assert '2 out of 4 events were automatically repaired' in ''.join(caplog.messages)
+
+
+def test_write_invalid_event_repair_keeps_original(ontology, event_invalid_object_beyond_repair):
+    with EDXMLWriter(output=None) as writer:
+        writer.enable_auto_repair_normalize('ea', ['b'])
+        writer.enable_auto_repair_drop('ea', ['b'])
+        writer.add_ontology(ontology).add_event(event_invalid_object_beyond_repair)
+
+    # Repairing the event should not have modified the original event.
+    assert event_invalid_object_beyond_repair['b'] == {'barr'}
+
+
 def test_write_invalid_event_repair_drop_fail(ontology, event_invalid_object):
     with EDXMLWriter(output=None) as writer:
         # Note: Property 'b' has the invalid object.
@@ -332,3 +363,182 @@ def test_write_event_repair_obscure_error(ontology, event_obscure_error):
         writer.enable_auto_repair_normalize('ea', ['b'])
         with pytest.raises(EDXMLEventValidationError, match='Expecting element event, got weird'):
             writer.add_ontology(ontology).add_event(event_obscure_error).close()
+
+
+def test_write_events(ontology, event, event_dropped_object):
+    with EDXMLWriter(output=None) as writer:
+        writer.add_ontology(ontology).add_events([event, event_dropped_object, event]).close()
+
+    events = list(EventCollection.from_edxml(writer.flush()))
+
+    assert events == [event, event_dropped_object, event]
+
+
+def test_write_events_repair(ontology, event, event_invalid_object, caplog):
+    with EDXMLWriter(output=None) as writer:
+        writer.enable_auto_repair_normalize('ea', ['b'])
+        writer.add_ontology(ontology).add_events(iter([event_invalid_object, event]))
+
+    events = list(EventCollection.from_edxml(writer.flush()))
+
+    # Writer should have normalized the invalid event object.
+    assert events == [event, event]
+
+    assert '1 out of 2 events were automatically repaired' in ''.join(caplog.messages)
+
+
+def test_write_events_invalid(ontology, event, event_invalid_object):
+    with EDXMLWriter(output=None) as writer:
+        with pytest.raises(EDXMLEventValidationError, match='Invalid value for property'):
+            writer.add_ontology(ontology).add_events([event, event_invalid_object])
+
+
+def test_write_events_invalid_ignore(ontology, event, event_invalid_object):
+    with EDXMLWriter(output=None) as writer:
+        writer.ignore_invalid_events()
+        writer.add_ontology(ontology).add_events([event_invalid_object, event])
+
+    # Writer should have swallowed the invalid event.
+    assert len(EventCollection.from_edxml(writer.flush())) == 1
+
+
+def test_write_events_unknown_type(ontology, event, event_unknown_type):
+    with EDXMLWriter(output=None) as writer:
+        with pytest.raises(EDXMLEventValidationError, match='unknown event type'):
+            writer.add_ontology(ontology).add_events([event, event_unknown_type])
+
+
+def test_write_events_background(ontology, event, event_invalid_object, foreign_element):
+    with EDXMLWriter(output=None) as writer:
+        writer.enable_auto_repair_normalize('ea', ['b'])
+        writer.add_ontology(ontology)
+        expected_output = writer.add_event(event).add_foreign_element(foreign_element).add_event(event).flush()
+
+    with EDXMLWriter(output=None).enable_background_writing(batch_size=2, queue_size=1) as writer:
+        writer.enable_auto_repair_normalize('ea', ['b'])
+        writer.add_ontology(ontology)
+        writer.add_event(event).add_foreign_element(foreign_element).add_events([event_invalid_object])
+
+        # Flushing waits for the background thread to write all events.
+        assert writer.flush() == expected_output
+
+
+def test_write_events_background_invalid(ontology, event, event_invalid_object):
+    writer = EDXMLWriter(output=None).enable_background_writing(batch_size=1)
+    writer.add_ontology(ontology).add_event(event_invalid_object)
+
+    # The error is raised by the background thread and
+    # propagated to the caller when closing the writer.
+    with pytest.raises(EDXMLEventValidationError, match='invalid event'):
+        writer.close()
+
+
+def test_write_events_background_invalid_discards_queued_events(ontology, event, event_invalid_object):
+    writer = EDXMLWriter(output=None).enable_background_writing(batch_size=1, queue_size=10)
+    writer.add_ontology(ontology).add_event(event_invalid_object)
+    for _ in range(3):
+        writer.add_event(event)
+
+    with pytest.raises(EDXMLEventValidationError, match='invalid event'):
+        writer.flush()
+
+    # The events added before raising the error must be
+    # discarded while the events added afterwards are written.
+    for _ in range(2):
+        writer.add_event(event)
+    writer.close()
+
+    assert writer.flush().count(b'<event ') == 2
+
+
+def test_write_events_background_copies_parsed_events(ontology, event):
+    writer = EDXMLWriter(output=None)
+    writer.add_ontology(ontology).add_event(event).add_event(event).close()
+    data = writer.flush()
+
+    background_writer = EDXMLWriter(output=None).enable_background_writing(batch_size=10)
+    background_writer.add_ontology(ontology)
+
+    class Parser(EDXMLPullParser):
+        def _parsed_event(self, parsed_event):
+            background_writer.add_event(parsed_event)
+            # Changing the event after adding it must not
+            # affect the event written by the background thread.
+            parsed_event['a'] = 'baz'
+
+    with Parser() as parser:
+        parser.parse(BytesIO(data))
+
+    background_writer.close()
+    output = EventCollection.from_edxml(background_writer.flush())
+    assert [event['a'] for event in output] == [{'foo'}, {'foo'}]
+
+
+class CountingOutput(BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.num_writes = 0
+
+    def write(self, data):
+        self.num_writes += 1
+        return super().write(data)
+
+
+def test_flush_policy_default(ontology, event):
+    output = CountingOutput()
+    writer = EDXMLWriter(output=output, pretty_print=False)
+    writer.add_ontology(ontology).add_event(event).add_event(event)
+
+    # Header, ontology and both events were written separately.
+    assert output.num_writes == 4
+    assert output.getvalue().count(b'<event ') == 2
+
+    writer.close()
+
+
+def test_flush_policy_max_elements(ontology, event):
+    output = CountingOutput()
+    writer = EDXMLWriter(output=output, pretty_print=False).set_flush_policy(max_elements=2)
+    writer.add_ontology(ontology).add_event(event)
+
+    # Ontology and event are written in a single write.
+    assert output.num_writes == 2
+
+    writer.add_event(event)
+    assert output.num_writes == 2
+    assert output.getvalue().count(b'<event ') == 1
+
+    writer.close()
+    assert output.getvalue().count(b'<event ') == 2
+
+
+def test_flush_policy_max_bytes(ontology, event):
+    output = CountingOutput()
+    writer = EDXMLWriter(output=output).set_flush_policy(max_elements=None, max_bytes=1000000)
+    writer.add_ontology(ontology)
+    for _ in range(10):
+        writer.add_event(event)
+
+    assert output.num_writes == 1
+
+    writer.set_flush_policy(max_elements=None, max_bytes=1)
+    writer.add_event(event)
+    assert output.num_writes == 2
+    assert output.getvalue().count(b'<event ') == 11
+
+    writer.close()
+
+
+def test_flush_policy_explicit(ontology, event):
+    output = CountingOutput()
+    writer = EDXMLWriter(output=output).set_flush_policy(max_elements=None)
+    writer.add_ontology(ontology).add_event(event)
+    assert b'<event ' not in output.getvalue()
+
+    writer.flush()
+    assert output.getvalue().count(b'<event ') == 1
+
+    writer.close()
+
+    # Writer output should be a valid EDXML document.
+    assert len(EventCollection.from_edxml(output.getvalue())) == 1
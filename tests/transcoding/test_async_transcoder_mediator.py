@@ -0,0 +1,144 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import asyncio
+import socket
+from io import BytesIO
+
+import pytest
+from lxml import etree
+from conftest import edxml_extract
+
+from edxml.transcode import AsyncTranscoderMediator
+from edxml.transcode.object import ObjectTranscoder
+
+
+class AsyncOutput(object):
+    # Mimics an asyncio StreamWriter, recording writes and drains.
+
+    def __init__(self):
+        self.writes = []
+        self.num_drains = 0
+
+    def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        self.num_drains += 1
+
+
+def run(coroutine):
+    # Note that asyncio.run() requires Python 3.7.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture()
+def transcoder():
+    class TestObjectTranscoder(ObjectTranscoder):
+        TYPES = ['test-event-type.a']
+        TYPE_MAP = {'test_record': 'test-event-type.a'}
+        TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+        TYPE_HASHED_PROPERTIES = {'test-event-type.a': ['property-a']}
+        PROPERTY_MAP = {'test-event-type.a': {'value': 'property-a'}}
+
+        def create_object_types(self, ontology):
+            ontology.create_object_type('object-type.string')
+
+    return TestObjectTranscoder
+
+
+def create_mediator(object_transcoder_mediator, transcoder, output=None):
+    mediator = object_transcoder_mediator(output)
+    mediator.register('test_record', transcoder())
+    mediator.add_event_source('/test/uri/')
+    mediator.set_event_source('/test/uri/')
+    return mediator
+
+
+def test_async_process(object_transcoder_mediator, transcoder):
+    records = [{'type': 'test_record', 'value': str(i)} for i in range(10)]
+
+    output = BytesIO()
+    with create_mediator(object_transcoder_mediator, transcoder, output) as mediator:
+        for record in records:
+            mediator.process(record)
+
+    async_output = AsyncOutput()
+
+    async def transcode():
+        async with AsyncTranscoderMediator(
+                create_mediator(object_transcoder_mediator, transcoder), async_output, buffer_size=1000
+        ) as async_mediator:
+            for record in records:
+                await async_mediator.process(record)
+
+    run(transcode())
+
+    # The output should be identical to the output of
+    # a regular mediator, written in multiple chunks.
+    assert b''.join(async_output.writes) == output.getvalue()
+    assert len(async_output.writes) > 1
+    assert async_output.num_drains == len(async_output.writes)
+
+
+def test_async_process_buffering(object_transcoder_mediator, transcoder):
+    async_output = AsyncOutput()
+
+    async def transcode():
+        async_mediator = AsyncTranscoderMediator(
+            create_mediator(object_transcoder_mediator, transcoder), async_output
+        )
+        await async_mediator.process({'type': 'test_record', 'value': 'a'})
+        # The output is still in the buffer.
+        assert async_output.writes == []
+        await async_mediator.flush()
+        assert len(async_output.writes) == 1
+        await async_mediator.close()
+        with pytest.raises(Exception, match='mediator has been closed'):
+            await async_mediator.process({'type': 'test_record', 'value': 'b'})
+
+    run(transcode())
+
+    edxml = etree.fromstring(b''.join(async_output.writes))
+    assert edxml_extract(edxml, '/edxml/event/properties/property-a/text()') == ['a']
+
+
+def test_async_process_stream_writer(object_transcoder_mediator, transcoder):
+    async def transcode():
+        reading_socket, writing_socket = socket.socketpair()
+        reader, reader_writer = await asyncio.open_connection(sock=reading_socket)
+        _, writer = await asyncio.open_connection(sock=writing_socket)
+
+        async def read():
+            return await reader.read()
+
+        reading = asyncio.ensure_future(read())
+
+        async with AsyncTranscoderMediator(
+                create_mediator(object_transcoder_mediator, transcoder), writer, buffer_size=100
+        ) as async_mediator:
+            for i in range(1000):
+                await async_mediator.process({'type': 'test_record', 'value': str(i)})
+
+        writer.write_eof()
+        data = await reading
+        writer.close()
+        reader_writer.close()
+        return data
+
+    edxml = etree.fromstring(run(transcode()))
+    assert len(edxml_extract(edxml, '/edxml/event')) == 1000
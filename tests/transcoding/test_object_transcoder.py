@@ -125,3 +125,32 @@ def test_transcode_nonexistent_item_in_list_in_dict(object_transcoder):
     record = {'a': []}
     events = list(object_transcoder.generate(record, 'test_record'))
     assert events[0]['property1'] == set()
+
+
+def test_transcode_changing_record_structure(object_transcoder, record):
+    type(object_transcoder).TYPE_MAP = {'test_record': 'test-event-type'}
+    type(object_transcoder).PROPERTY_MAP = {'test-event-type': {'a.1': 'property1'}}
+
+    record.a = ['x', 'y']
+    records = [{'a': ['a', 'b']}, {'a': {'1': 'c'}}, record, {'a': ['d']}, {'a': ['e', 'f']}]
+
+    # The transcoder learns how to access fields from the first record.
+    # Subsequent records have different structures.
+    values = [events[0]['property1'] for events in (
+        list(object_transcoder.generate(r, 'test_record')) for r in records
+    )]
+
+    assert values == [{'b'}, {'c'}, {'y'}, set(), {'f'}]
+
+
+def test_transcode_without_calling_parent_constructor(record):
+    class TestObjectTranscoder(ObjectTranscoder):
+        TYPE_MAP = {'test_record': 'test-event-type'}
+        PROPERTY_MAP = {'test-event-type': {'attr1': 'property1'}}
+
+        def __init__(self, cfg):
+            self.cfg = cfg
+
+    record.attr1 = 'string'
+    events = list(TestObjectTranscoder({}).generate(record, 'test_record'))
+    assert events[0]['property1'] == {'string'}
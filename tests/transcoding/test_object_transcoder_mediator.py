@@ -11,6 +11,8 @@
 #                                                                                        =
 # ========================================================================================
 
+import logging
+import multiprocessing.pool
 from io import BytesIO
 
 import pytest
@@ -233,3 +235,237 @@ def test_post_processor_invalid_event_exception(object_transcoder_mediator, obje
             mediator.set_event_source('/test/uri/')
             mediator.debug()
             mediator.process(record)
+
+
+def test_auto_repair_normalize(object_transcoder_mediator, object_transcoder, record, caplog):
+    caplog.set_level(logging.INFO)
+    record['records']['a'] = [1.2, '3']
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.integer'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'records.a': 'property-a'}}
+    object_transcoder.TYPE_AUTO_REPAIR_NORMALIZE = {'test-event-type.a': ['property-a']}
+
+    output = BytesIO()
+
+    with object_transcoder_mediator(output) as mediator:
+        mediator.register('test_record', object_transcoder())
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        mediator.debug()
+        mediator.process(record)
+
+    edxml = etree.fromstring(output.getvalue())
+
+    assert set(edxml_extract(edxml, '/edxml/event/properties/property-a/text()')) == {'1', '3'}
+
+    # The event failed to validate, so the writer repaired it.
+    assert 'Event validated after repairing it.' in caplog.messages
+
+
+def test_background_writing(object_transcoder_mediator, object_transcoder, record):
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'records.a': 'property-a'}}
+
+    output = BytesIO()
+
+    with object_transcoder_mediator(output) as mediator:
+        mediator.enable_background_writing(batch_size=1)
+        mediator.register('test_record', object_transcoder())
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        mediator.process(record)
+        mediator.process(record)
+
+    edxml = etree.fromstring(output.getvalue())
+
+    assert len(edxml_extract(edxml, '/edxml/event')) == 2
+
+
+def test_flush_policy(object_transcoder_mediator, object_transcoder, record):
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'records.a': 'property-a'}}
+
+    output = BytesIO()
+
+    with object_transcoder_mediator(output) as mediator:
+        mediator.set_flush_policy(max_elements=None)
+        mediator.register('test_record', object_transcoder())
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        mediator.process(record)
+        # Output is only flushed when closing the mediator.
+        assert b'<event' not in output.getvalue()
+
+    edxml = etree.fromstring(output.getvalue())
+
+    assert len(edxml_extract(edxml, '/edxml/event')) == 1
+
+
+def test_process_many(object_transcoder_mediator, object_transcoder):
+    class TranscoderA(object_transcoder):
+        TYPES = ['test-event-type.a']
+        TYPE_MAP = {'a': 'test-event-type.a'}
+        TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+        PROPERTY_MAP = {'test-event-type.a': {'value': 'property-a'}}
+
+    class TranscoderB(object_transcoder):
+        TYPES = ['test-event-type.b']
+        TYPE_MAP = {'b': 'test-event-type.b'}
+        TYPE_PROPERTIES = {'test-event-type.b': {'property-a': 'object-type.string'}}
+        PROPERTY_MAP = {'test-event-type.b': {'value': 'property-a'}}
+
+    records = [
+        {'type': 'a', 'value': 'a1'},
+        {'type': 'b', 'value': 'b1'},
+        {'type': 'unknown', 'value': 'c1'},
+        {'type': 'a', 'value': 'a2'},
+    ]
+
+    outputs = []
+    for batch in (False, True):
+        output = BytesIO()
+        with object_transcoder_mediator(output) as mediator:
+            mediator.register('a', TranscoderA())
+            mediator.register('b', TranscoderB())
+            mediator.add_event_source('/test/uri/')
+            mediator.set_event_source('/test/uri/')
+            if batch:
+                mediator.process_many(records)
+            else:
+                for record in records:
+                    mediator.process(record)
+        outputs.append(output.getvalue())
+
+    # Processing records in a batch should yield the same output,
+    # containing the events in the order of the input records.
+    assert outputs[0] == outputs[1]
+    edxml = etree.fromstring(outputs[1])
+    assert edxml_extract(edxml, '/edxml/event/properties/property-a/text()') == ['a1', 'b1', 'a2']
+
+
+def test_parallel_processing(object_transcoder_mediator, object_transcoder):
+    class TranscoderA(object_transcoder):
+        TYPES = ['test-event-type.a']
+        TYPE_MAP = {'a': 'test-event-type.a'}
+        TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+        PROPERTY_MAP = {'test-event-type.a': {'value': 'property-a'}}
+
+    class TranscoderB(object_transcoder):
+        TYPES = ['test-event-type.b']
+        TYPE_MAP = {'b': 'test-event-type.b'}
+        TYPE_PROPERTIES = {'test-event-type.b': {'property-a': 'object-type.string'}}
+        PROPERTY_MAP = {'test-event-type.b': {'value': 'property-a'}}
+
+    records = [{'type': 'ab'[i % 2], 'value': str(i)} for i in range(25)]
+
+    outputs = []
+    for parallel in (False, True):
+        output = BytesIO()
+        with object_transcoder_mediator(output) as mediator:
+            mediator.register('a', TranscoderA())
+            mediator.register('b', TranscoderB())
+            mediator.add_event_source('/test/uri/')
+            mediator.set_event_source('/test/uri/')
+            if parallel:
+                mediator.enable_parallel_processing(processes=2, batch_size=3)
+            for record in records[:10]:
+                mediator.process(record)
+            # Adding a source after the worker processes have been
+            # started requires updating the ontology of the workers.
+            mediator.add_event_source('/test/uri/other/')
+            mediator.set_event_source('/test/uri/other/')
+            mediator.process_many(records[10:])
+        outputs.append(output.getvalue())
+
+    # The parallel output should be identical to the output
+    # generated without using worker processes.
+    assert outputs[0] == outputs[1]
+    edxml = etree.fromstring(outputs[1])
+    assert edxml_extract(edxml, '/edxml/event/properties/property-a/text()') == [str(i) for i in range(25)]
+
+
+def test_parallel_processing_ontology_update(monkeypatch, object_transcoder_mediator, object_transcoder):
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'value': 'property-a'}}
+
+    # Record which batches are sent to the workers along with an ontology.
+    shipped = []
+
+    class RecordingPool(multiprocessing.pool.Pool):
+        def apply_async(self, func, args=(), *pos, **kwargs):
+            shipped.append(args[1] is not None)
+            return super().apply_async(func, args, *pos, **kwargs)
+
+    monkeypatch.setattr(multiprocessing, 'Pool', RecordingPool)
+
+    output = BytesIO()
+    with object_transcoder_mediator(output) as mediator:
+        mediator.register('test_record', object_transcoder())
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        mediator.enable_parallel_processing(processes=2, batch_size=2)
+        mediator.process_many({'type': 'test_record', 'value': str(i)} for i in range(10))
+        mediator.add_event_source('/test/uri/other/')
+        mediator.set_event_source('/test/uri/other/')
+        mediator.process_many({'type': 'test_record', 'value': str(i)} for i in range(10, 110))
+
+    # The workers received the ontology with the initial copy of the
+    # mediator. The updated ontology is sent until all workers have it.
+    assert shipped[:5] == [False] * 5
+    assert shipped[5]
+    assert shipped[-10:] == [False] * 10
+
+    edxml = etree.fromstring(output.getvalue())
+    assert edxml_extract(edxml, '/edxml/event/properties/property-a/text()') == [str(i) for i in range(110)]
+    assert edxml_extract(edxml, '/edxml/event/@source-uri')[-1] == '/test/uri/other/'
+
+
+def test_parallel_processing_invalid_event(object_transcoder_mediator, object_transcoder):
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.integer'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'value': 'property-a'}}
+
+    with pytest.raises(EDXMLEventValidationError):
+        with object_transcoder_mediator(BytesIO()) as mediator:
+            mediator.register('test_record', object_transcoder())
+            mediator.set_event_source('/test/uri/')
+            mediator.enable_parallel_processing(processes=2, batch_size=2)
+            for value in ['1', '2', 'three', '4']:
+                mediator.process({'type': 'test_record', 'value': value})
+
+
+def test_ontology_update_modified_source(object_transcoder_mediator, object_transcoder, record):
+    object_transcoder.TYPES = ['test-event-type.a']
+    object_transcoder.TYPE_MAP = {'test_record': 'test-event-type.a'}
+    object_transcoder.TYPE_PROPERTIES = {'test-event-type.a': {'property-a': 'object-type.string'}}
+    object_transcoder.PROPERTY_MAP = {'test-event-type.a': {'records.a': 'property-a'}}
+
+    output = BytesIO()
+
+    with object_transcoder_mediator(output) as mediator:
+        mediator.register('test_record', object_transcoder())
+        source = mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        mediator.process(record)
+        mediator.process(record)
+        # Modifying the event source should result in
+        # an ontology update before the next event.
+        source.set_description('changed')
+        mediator.process(record)
+
+    edxml = etree.fromstring(output.getvalue())
+
+    assert [element.tag for element in edxml] == ['{http://edxml.org/edxml}' + tag for tag in (
+        'ontology', 'event', 'event', 'ontology', 'event'
+    )]
+    assert edxml_extract(edxml, '/edxml/ontology/sources/source/@description') == [
+        'no description available', 'changed'
+    ]
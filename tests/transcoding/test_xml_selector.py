@@ -0,0 +1,86 @@
+# ========================================================================================
+#                                                                                        =
+#              Copyright (c) 2010 D.H.J. Takken (d.h.j.takken@xs4all.nl)                 =
+#                      Copyright (c) 2020 the EDXML Foundation                           =
+#                                                                                        =
+#                                   http://edxml.org                                     =
+#                                                                                        =
+#             This file is part of the EDXML Software Development Kit (SDK)              =
+#                       and is released under the MIT License:                           =
+#                         https://opensource.org/licenses/MIT                            =
+#                                                                                        =
+# ========================================================================================
+
+import pytest
+from lxml import etree
+
+from edxml.transcode.xml.selector import XPathSelector
+
+
+@pytest.fixture()
+def tree():
+    return etree.ElementTree(etree.fromstring(
+        '<root>'
+        '  <records>'
+        '    <a type="x"><p1>a1</p1></a>'
+        '    <b attr="b1"/>'
+        '    <a type="y"><a><p1>a2</p1></a></a>'
+        '    <b/>'
+        '  </records>'
+        '  <other><records><a/></records></other>'
+        '</root>'
+    ))
+
+
+@pytest.mark.parametrize('xpath', [
+    '/root',
+    'records',
+    'records/a',
+    '/root/records/a',
+    '/root/records/*',
+    '/root/*/a',
+    '//a',
+    '//records/a',
+    '//records//p1',
+    '/root//a/p1',
+    '//a[@type]',
+    '//a[@type="x"]',
+    "/root/records/a[@type='y']/a",
+    '//b[@attr]',
+    '/records',
+    'root/records',
+    '//*',
+])
+def test_compiled_selector_matches_xpath(tree, xpath):
+    selector = XPathSelector(xpath)
+    assert selector.compiled
+    expected = etree.XPath(xpath)(tree)
+    for element in tree.iter():
+        assert selector.matches(element, tree) == (element in expected), tree.getpath(element)
+
+
+@pytest.mark.parametrize('xpath', [
+    '//a[1]',
+    '//a[p1="a1"]',
+    '//a/..',
+    '/root/records/a | /root/records/b',
+    '//*[re:test(@type, "^x$")]',
+])
+def test_fallback_selector_matches_xpath(tree, xpath):
+    namespaces = {'re': 'http://exslt.org/regular-expressions'}
+    selector = XPathSelector(xpath, namespaces=namespaces)
+    assert not selector.compiled
+    expected = etree.XPath(xpath, namespaces=namespaces)(tree)
+    for element in tree.iter():
+        assert selector.matches(element, tree) == (element in expected), tree.getpath(element)
+
+
+def test_selector_tag():
+    assert XPathSelector('/root/records/a').tag == 'a'
+    assert XPathSelector('//records/*').tag is None
+    assert XPathSelector('//a[1]').tag is None
+
+
+def test_invalid_selector():
+    with pytest.raises(etree.XPathSyntaxError):
+        XPathSelector(']')
@@ -180,6 +180,41 @@ def test_large_tree_warning(xml_transcoder, xml3, caplog):
         assert 'Worst offenders are: c (100),b (50)' in caplog.text
 
 
+def test_max_retained_elements(xml_transcoder, xml3, caplog):
+    with XmlTranscoderMediator() as mediator:
+        mediator.register('/root/records/a', xml_transcoder())
+        mediator.set_max_retained_elements(10)
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        list(mediator.generate(BytesIO(xml3)))
+
+        assert 'contains many child elements' not in caplog.text
+
+    # Only the last transcoded element and the ten
+    # elements preceding it should remain.
+    assert len(mediator._root.xpath('records/a')) == 1
+    assert len(mediator._root.xpath('records/b')) == 0
+    assert len(mediator._root.xpath('records/c')) == 10
+
+
+def test_max_retained_elements_ancestors(xml_transcoder, xml2):
+    with XmlTranscoderMediator() as mediator:
+        mediator.register('/root/records/a', xml_transcoder())
+        mediator.set_max_retained_elements(1)
+        mediator.add_event_source('/test/uri/')
+        mediator.set_event_source('/test/uri/')
+        list(mediator.generate(BytesIO(xml2)))
+
+    # The first records element is the only element preceding the
+    # parent of the last transcoded element, so it is retained,
+    # including the elements following its last transcoded child.
+    # In the second records element, only the last transcoded
+    # element and the element preceding it remain.
+    assert len(mediator._root.xpath('records')) == 2
+    assert len(mediator._root.xpath('records[1]/*')) == 3
+    assert len(mediator._root.xpath('records[2]/*')) == 2
+
+
 def test_parse_nested_transcoders(xml):
 
     class InnerTranscoder(XmlTranscoder):